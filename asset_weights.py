@@ -0,0 +1,245 @@
+"""
+Per-asset weight report and size budgets for a production build.
+
+deploy.py builds the report from its zip pass. It records each file's raw
+size, its deflated size in the archive, and its brotli size. The brotli size
+comes from the precompress.py sibling when one exists; otherwise it is
+computed here. Files are grouped by type, and the budgets in
+deploy-budgets.json are enforced before anything is uploaded.
+
+The critical path is the set of files a phone must fetch before the first
+frame: index.html, the entry module(s) it references, and release.wasm. It
+has its own budget.
+
+Budget file format (sizes in KB; every limit is optional):
+
+  {
+    "critical_path": {"files": ["index.html", "@entry", "assets/release*.wasm"],
+                      "max_brotli_kb": 160},
+    "groups": [{"name": "js", "patterns": ["assets/*.js"], "max_deflate_kb": 200}, ...]
+  }
+
+"@entry" expands to the module scripts and modulepreload links in index.html.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import precompress
+
+DEFAULT_BUDGET_FILE = "deploy-budgets.json"
+ENTRY_TOKEN = "@entry"
+METRICS = ("raw", "deflate", "brotli")
+
+# Used when the budget file does not define groups. First matching pattern wins.
+DEFAULT_GROUPS = [
+    {"name": "js", "patterns": ["assets/*.js", "*.js", "*.mjs"]},
+    {"name": "wasm", "patterns": ["*.wasm"]},
+    {"name": "icons", "patterns": ["icons/*"]},
+    {"name": "background", "patterns": ["assets/background*"]},
+    {"name": "html", "patterns": ["*.html"]},
+    {"name": "other", "patterns": ["*"]},
+]
+DEFAULT_CRITICAL_PATH = ["index.html", ENTRY_TOKEN, "assets/release*.wasm"]
+
+_MODULE_SCRIPT = re.compile(r"<script\b[^>]*\btype=[\"']?module[\"']?[^>]*\bsrc=[\"']?([^\"'\s>]+)", re.I)
+_MODULE_PRELOAD = re.compile(r"<link\b[^>]*\brel=[\"']?modulepreload[\"']?[^>]*\bhref=[\"']?([^\"'\s>]+)", re.I)
+
+
+@dataclass
+class AssetWeight:
+    path: str
+    raw: int
+    deflate: int
+    # None when brotli is not installed and no .br sibling exists.
+    brotli: Optional[int]
+    group: str = "other"
+
+
+@dataclass
+class BudgetViolation:
+    scope: str
+    metric: str
+    actual: int
+    limit: int
+
+    def __str__(self) -> str:
+        return f"{self.scope}: {self.metric} {self.actual / 1024:.1f} KB > budget {self.limit / 1024:.1f} KB"
+
+
+def load_budgets(path: Path | str) -> Optional[dict[str, Any]]:
+    """Parse the budget file; returns None if it does not exist."""
+    path = Path(path)
+    if not path.is_file():
+        return None
+    budgets = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(budgets, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    return budgets
+
+
+def is_precompressed_sibling(rel: str, names: set[str]) -> bool:
+    return any(rel.endswith(suffix) and rel[: -len(suffix)] in names for _enc, suffix in precompress.ENCODINGS)
+
+
+def _brotli_size(path: Path, raw: bytes) -> Optional[int]:
+    if not precompress.is_compressible(path):
+        return len(raw)  # Served as-is.
+    sibling = precompress.sibling_path(path, "br")
+    if sibling.is_file():
+        return sibling.stat().st_size
+    if precompress.brotli is None:
+        return None
+    return min(len(raw), len(precompress.brotli.compress(raw, quality=11)))
+
+
+def _measure(file: Path, rel: str, zipped: Optional[int]) -> AssetWeight:
+    raw = file.read_bytes()
+    if zipped is None:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+        zipped = min(len(raw), len(compressor.compress(raw) + compressor.flush()))
+    return AssetWeight(rel, len(raw), zipped, _brotli_size(file, raw))
+
+
+def measure_assets(
+    files: Iterable[tuple[Path, Path]],
+    zipped: Optional[dict[str, int]] = None,
+    workers: int = 1,
+) -> list[AssetWeight]:
+    """Weigh every file; `zipped` supplies archive sizes already known from the zip pass."""
+    zipped = zipped or {}
+    files = [(file, rel.as_posix()) for file, rel in files]
+    names = {rel for _file, rel in files}
+    files = [(file, rel) for file, rel in files if not is_precompressed_sibling(rel, names)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda item: _measure(item[0], item[1], zipped.get(item[1])), files))
+
+
+def assign_groups(weights: list[AssetWeight], groups: list[dict[str, Any]]) -> None:
+    for weight in weights:
+        weight.group = next(
+            (g["name"] for g in groups if any(fnmatch.fnmatch(weight.path, p) for p in g["patterns"])),
+            "other",
+        )
+
+
+def entry_modules(build_path: Path) -> list[str]:
+    """Module scripts and modulepreloads referenced by index.html, relative to build_path."""
+    index = build_path / "index.html"
+    if not index.is_file():
+        return []
+    html = index.read_text(encoding="utf-8", errors="replace")
+    entries = []
+    for match in [*_MODULE_SCRIPT.finditer(html), *_MODULE_PRELOAD.finditer(html)]:
+        url = match.group(1).split("?", 1)[0].split("#", 1)[0]
+        if "://" in url:
+            continue
+        rel = url.removeprefix("./").lstrip("/")
+        if rel not in entries:
+            entries.append(rel)
+    return entries
+
+
+def critical_path(weights: list[AssetWeight], patterns: list[str], build_path: Path) -> list[AssetWeight]:
+    expanded = []
+    for pattern in patterns:
+        expanded.extend(entry_modules(build_path) if pattern == ENTRY_TOKEN else [pattern])
+    return [w for w in weights if any(fnmatch.fnmatch(w.path, p) for p in expanded)]
+
+
+def totals(weights: list[AssetWeight]) -> dict[str, Optional[int]]:
+    result: dict[str, Optional[int]] = {
+        "raw": sum(w.raw for w in weights),
+        "deflate": sum(w.deflate for w in weights),
+    }
+    result["brotli"] = None if any(w.brotli is None for w in weights) else sum(w.brotli for w in weights)
+    return result
+
+
+def check_limits(scope: str, sizes: dict[str, Optional[int]], spec: dict[str, Any]) -> list[BudgetViolation]:
+    violations = []
+    for metric in METRICS:
+        limit_kb = spec.get(f"max_{metric}_kb")
+        actual = sizes.get(metric)
+        if limit_kb is None or actual is None:
+            continue
+        limit = int(limit_kb * 1024)
+        if actual > limit:
+            violations.append(BudgetViolation(scope, metric, actual, limit))
+    return violations
+
+
+def evaluate(
+    build_path: Path,
+    weights: list[AssetWeight],
+    budgets: Optional[dict[str, Any]],
+) -> dict[str, Any]:
+    """Group the weights and check them against budgets; returns the report dict."""
+    budgets = budgets or {}
+    groups = budgets.get("groups") or DEFAULT_GROUPS
+    assign_groups(weights, groups)
+    critical_spec = budgets.get("critical_path") or {}
+    critical = critical_path(weights, critical_spec.get("files") or DEFAULT_CRITICAL_PATH, build_path)
+
+    group_totals = {}
+    violations: list[BudgetViolation] = []
+    for group in groups:
+        members = [w for w in weights if w.group == group["name"]]
+        if not members:
+            continue
+        group_totals[group["name"]] = {"files": len(members), **totals(members)}
+        violations += check_limits(f"group {group['name']}", group_totals[group["name"]], group)
+    critical_totals = totals(critical)
+    violations += check_limits("critical path", critical_totals, critical_spec)
+    violations += check_limits("total", totals(weights), budgets.get("total") or {})
+
+    return {
+        "files": [asdict(w) for w in sorted(weights, key=lambda w: (w.group, w.path))],
+        "groups": group_totals,
+        "critical_path": {"files": [w.path for w in critical], **critical_totals},
+        "total": totals(weights),
+        "violations": [asdict(v) for v in violations],
+        "brotli_available": all(w.brotli is not None for w in weights),
+    }
+
+
+def _kb(value: Optional[int]) -> str:
+    return f"{value / 1024:>9.1f} KB" if value is not None else f"{'-':>12}"
+
+
+def print_report(report: dict[str, Any], previous: Optional[dict[str, Any]] = None) -> None:
+    print(f"  {'asset':<52}{'raw':>12}{'deflate':>12}{'brotli':>12}")
+    by_group: dict[str, list[dict]] = {}
+    for entry in report["files"]:
+        by_group.setdefault(entry["group"], []).append(entry)
+    for name, sizes in report["groups"].items():
+        label = f"[{name}] {sizes['files']} file(s)"
+        print(f"  {label:<52}{_kb(sizes['raw'])}{_kb(sizes['deflate'])}{_kb(sizes['brotli'])}")
+        for entry in by_group.get(name, []):
+            print(f"    {entry['path']:<50}{_kb(entry['raw'])}{_kb(entry['deflate'])}{_kb(entry['brotli'])}")
+
+    critical = report["critical_path"]
+    print(f"  {'critical path':<52}{_kb(critical['raw'])}{_kb(critical['deflate'])}{_kb(critical['brotli'])}")
+    print(f"    {', '.join(critical['files']) or '(no files matched)'}")
+    if previous:
+        before = previous.get("critical_path", {})
+        changes = [
+            f"{metric} {(critical[metric] - before[metric]) / 1024:+.1f} KB"
+            for metric in METRICS
+            if critical.get(metric) is not None and before.get(metric) is not None
+        ]
+        if changes:
+            print(f"    since the previous report: {', '.join(changes)}")
+    if not report["brotli_available"]:
+        print("  (brotli sizes unavailable — pip install brotli or run precompress.py)")
+
+    for violation in report["violations"]:
+        print(f"  BUDGET EXCEEDED — {BudgetViolation(**violation)}")
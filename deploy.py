@@ -9,25 +9,66 @@ Usage:
 
 Credentials are read from environment variables or an optional local
 deploy.local.json file (gitignored). Nothing secret is printed to stdout.
+
+Set DEPLOY_STREAM=1 to stream the archive as a chunked upload with parallel
+compression instead of building it in memory, and DEPLOY_DELTA=1 to upload only
+files whose content hash changed since the previous deploy. DEPLOY_CHUNKED=1
+sends the bundle in retried, resumable parts, and DEPLOY_PRECOMPRESS=1 writes
+.br/.gz siblings (precompress.py) before zipping (see docs/DEPLOY.md).
+
+Every deploy prints a per-asset weight report and warns when a budget in
+deploy-budgets.json (DEPLOY_BUDGETS) is exceeded; DEPLOY_ENFORCE_BUDGETS=1 makes
+it refuse to upload instead (see asset_weights.py).
 """
 
 from __future__ import annotations
 
+import hashlib
 import io
 import json
 import os
+import random
+import struct
 import sys
+import time
+import uuid
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+import asset_weights
+import precompress
 
 DEFAULT_PROJECT_NAME = "cave-crystals"
 DEFAULT_BUILD_DIR = "dist"
 DEFAULT_CONTABO_BASE_URL = "https://storage.noahcohn.com"
 DEFAULT_DEPLOY_FOLDER = ""
 LOCAL_CONFIG_FILENAME = "deploy.local.json"
+DEFAULT_CACHE_DIR = ".deploy-cache"
+SKIP_DIRS = (".git", "node_modules", "__pycache__")
+MANIFEST_VERSION = 1
+
+# Already-compressed formats: deflating them again only burns CPU.
+# .wasm is deliberately absent; it still shrinks by roughly half under deflate.
+STORED_SUFFIXES = frozenset(
+    {".png", ".jpg", ".jpeg", ".webp", ".gif", ".br", ".gz", ".zip", ".woff", ".woff2", ".mp3", ".ogg"}
+)
+STREAM_CHUNK_SIZE = 256 * 1024
+
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+DEFAULT_UPLOAD_WORKERS = 4
+DEFAULT_RETRIES = 5
+DEFAULT_RETRY_BASE_DELAY = 0.5
+MAX_RETRY_DELAY = 30.0
+# Transient statuses. Only idempotent requests (part PUTs, status GETs) are
+# retried; creating and completing an upload are sent once.
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
 
 
 def _env(name: str, default: Optional[str] = None) -> Optional[str]:
@@ -45,6 +86,18 @@ def load_deploy_config() -> dict[str, Any]:
         "contabo_base_url": DEFAULT_CONTABO_BASE_URL,
         "deploy_folder": DEFAULT_DEPLOY_FOLDER,
         "deploy_token": None,
+        "stream": False,
+        "compress_workers": os.cpu_count() or 1,
+        "delta": False,
+        "cache_dir": DEFAULT_CACHE_DIR,
+        "chunked": False,
+        "part_size": DEFAULT_PART_SIZE,
+        "upload_workers": DEFAULT_UPLOAD_WORKERS,
+        "retries": DEFAULT_RETRIES,
+        "retry_base_delay": DEFAULT_RETRY_BASE_DELAY,
+        "precompress": False,
+        "budget_file": asset_weights.DEFAULT_BUDGET_FILE,
+        "enforce_budgets": False,
     }
 
     config_path = Path(_env("DEPLOY_CONFIG", LOCAL_CONFIG_FILENAME) or LOCAL_CONFIG_FILENAME)
@@ -63,30 +116,350 @@ def load_deploy_config() -> dict[str, Any]:
         "contabo_base_url": "DEPLOY_CONTABO_BASE_URL",
         "deploy_folder": "DEPLOY_FOLDER",
         "deploy_token": "DEPLOY_TOKEN",
+        "stream": "DEPLOY_STREAM",
+        "compress_workers": "DEPLOY_COMPRESS_WORKERS",
+        "delta": "DEPLOY_DELTA",
+        "chunked": "DEPLOY_CHUNKED",
+        "part_size": "DEPLOY_PART_SIZE",
+        "upload_workers": "DEPLOY_UPLOAD_WORKERS",
+        "retries": "DEPLOY_RETRIES",
+        "precompress": "DEPLOY_PRECOMPRESS",
+        "budget_file": "DEPLOY_BUDGETS",
+        "enforce_budgets": "DEPLOY_ENFORCE_BUDGETS",
     }
     for key, env_name in env_map.items():
         if env_name in os.environ:
             config[key] = os.environ[env_name]
 
+    config["stream"] = _truthy(config["stream"])
+    config["delta"] = _truthy(config["delta"])
+    config["chunked"] = _truthy(config["chunked"])
+    config["precompress"] = _truthy(config["precompress"])
+    config["enforce_budgets"] = _truthy(config["enforce_budgets"])
+    config["part_size"] = max(1, int(config["part_size"]))
+    config["upload_workers"] = max(1, int(config["upload_workers"]))
+    config["retries"] = max(0, int(config["retries"]))
+    config["retry_base_delay"] = float(config["retry_base_delay"])
+    config["compress_workers"] = max(1, int(config["compress_workers"]))
     return config
 
 
-def build_zip(build_path: Path) -> bytes:
-    """Zip the contents of build_path into an in-memory archive."""
+def _truthy(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+def iter_build_files(build_path: Path) -> Iterator[tuple[Path, Path]]:
+    """Yield (file, path relative to build_path) for every deployable file, sorted."""
+    for file in sorted(build_path.rglob("*")):
+        if file.is_dir():
+            continue
+        rel = file.relative_to(build_path)
+        if any(p in SKIP_DIRS for p in rel.parts):
+            continue
+        yield file, rel
+
+
+def compress_type_for(path: Path) -> int:
+    return zipfile.ZIP_STORED if path.suffix.lower() in STORED_SUFFIXES else zipfile.ZIP_DEFLATED
+
+
+def build_zip(
+    build_path: Path,
+    files: Optional[Iterable[tuple[Path, Path]]] = None,
+    sizes: Optional[dict[str, int]] = None,
+) -> bytes:
+    """Zip the contents of build_path (or just `files`) into an in-memory archive.
+
+    If `sizes` is given, it is filled with each entry's compressed size in the archive.
+    """
+    if files is None:
+        files = iter_build_files(build_path)
     buf = io.BytesIO()
     with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for file in sorted(build_path.rglob("*")):
-            if file.is_dir():
-                continue
-            rel = file.relative_to(build_path)
-            parts = rel.parts
-            if any(p in (".git", "node_modules", "__pycache__") for p in parts):
-                continue
-            zf.write(file, str(rel))
+        for file, rel in files:
+            zf.write(file, rel.as_posix(), compress_type=compress_type_for(file))
+            if sizes is not None:
+                sizes[rel.as_posix()] = zf.infolist()[-1].compress_size
             print(f"  + {rel}")
     return buf.getvalue()
 
 
+# --- Streaming archive -------------------------------------------------------
+#
+# Entries are compressed in parallel (zlib releases the GIL) and written as a
+# plain zip stream: because each entry is compressed before its header is
+# emitted, CRC and sizes go straight into the local header and no data
+# descriptors or seeking are needed.
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_UTF8_FLAG = 0x800
+_ZIP_VERSION = 20
+_ZIP32_LIMIT = 0xFFFFFFFF
+
+
+class _Entry:
+    __slots__ = (
+        "name", "method", "crc", "size", "payload", "compressed_size",
+        "dos_time", "dos_date", "mode", "offset",
+    )
+
+    def __init__(self, file: Path, rel: Path):
+        stat = file.stat()
+        raw = file.read_bytes()
+        self.name = rel.as_posix().encode("utf-8")
+        self.size = len(raw)
+        self.crc = zlib.crc32(raw)
+        self.method = compress_type_for(file)
+        self.payload = raw
+        if self.method == zipfile.ZIP_DEFLATED:
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+            deflated = compressor.compress(raw) + compressor.flush()
+            if len(deflated) < len(raw):
+                self.payload = deflated
+            else:
+                self.method = zipfile.ZIP_STORED
+        self.compressed_size = len(self.payload)
+        year, month, day, hour, minute, second = time.localtime(stat.st_mtime)[:6]
+        year = max(year, 1980)
+        self.dos_time = (hour << 11) | (minute << 5) | (second // 2)
+        self.dos_date = ((year - 1980) << 9) | (month << 5) | day
+        self.mode = stat.st_mode & 0xFFFF
+        self.offset = 0
+        if self.size > _ZIP32_LIMIT:
+            raise ValueError(f"{rel} is too large for a non-ZIP64 stream")
+
+    def local_header(self) -> bytes:
+        return _LOCAL_HEADER.pack(
+            0x04034B50, _ZIP_VERSION, _UTF8_FLAG, self.method, self.dos_time, self.dos_date,
+            self.crc, self.compressed_size, self.size, len(self.name), 0,
+        ) + self.name
+
+    def central_header(self) -> bytes:
+        return _CENTRAL_HEADER.pack(
+            0x02014B50, (3 << 8) | _ZIP_VERSION, _ZIP_VERSION, _UTF8_FLAG, self.method,
+            self.dos_time, self.dos_date, self.crc, self.compressed_size, self.size,
+            len(self.name), 0, 0, 0, 0, self.mode << 16, self.offset,
+        ) + self.name
+
+
+def _ordered_window(executor, fn, items: Iterable, window: int) -> Iterator:
+    """Like executor.map, but keeps at most `window` results in flight."""
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(fn, *item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def stream_zip(
+    build_path: Path,
+    workers: int = 1,
+    *,
+    files: Optional[Iterable[tuple[Path, Path]]] = None,
+    sizes: Optional[dict[str, int]] = None,
+    verbose: bool = True,
+) -> Iterator[bytes]:
+    """Yield a zip archive of build_path (or just `files`) chunk by chunk without buffering it whole.
+
+    Files are compressed across `workers` threads; memory stays bounded by the
+    few entries in flight rather than the full archive. `sizes`, if given, is
+    filled with each entry's compressed size.
+    """
+    if files is None:
+        files = iter_build_files(build_path)
+    offset = 0
+    entries: list[_Entry] = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for entry in _ordered_window(executor, _Entry, files, workers * 2):
+            entry.offset = offset
+            header = entry.local_header()
+            yield header
+            for start in range(0, len(entry.payload), STREAM_CHUNK_SIZE):
+                yield entry.payload[start:start + STREAM_CHUNK_SIZE]
+            offset += len(header) + entry.compressed_size
+            if offset > _ZIP32_LIMIT:
+                raise ValueError("Archive is too large for a non-ZIP64 stream")
+            entry.payload = b""  # Only the central-directory metadata is kept.
+            entries.append(entry)
+            if sizes is not None:
+                sizes[entry.name.decode("utf-8")] = entry.compressed_size
+            if verbose:
+                print(f"  + {entry.name.decode('utf-8')}")
+
+    directory = b"".join(entry.central_header() for entry in entries)
+    yield directory
+    yield _END_RECORD.pack(0x06054B50, 0, 0, len(entries), len(entries), len(directory), offset, 0)
+
+
+def stream_multipart(
+    fields: dict[str, str],
+    file_field: str,
+    filename: str,
+    content_type: str,
+    chunks: Iterable[bytes],
+    boundary: str,
+) -> Iterator[bytes]:
+    """Yield a multipart/form-data body with one streamed file part."""
+    for name, value in fields.items():
+        yield (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n"
+        ).encode("utf-8")
+    yield (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode("utf-8")
+    yield from chunks
+    yield f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+
+class _ByteCounter:
+    """Wraps a chunk iterator and counts the bytes it yields."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = chunks
+        self.total = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._chunks:
+            self.total += len(chunk)
+            yield chunk
+
+
+# --- Delta deploys -----------------------------------------------------------
+#
+# A manifest maps each deployed path to the SHA-256 of its contents. The
+# previous manifest comes from the deploy service; only new or changed files
+# are zipped, and paths that disappeared are sent as a deletion list. The local
+# cache copy is kept for reference, but a deploy that can only find that one
+# uploads the full bundle, since other machines may have deployed since.
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(files: Iterable[tuple[Path, Path]], workers: int = 1) -> dict[str, str]:
+    """Map each file's deployed path to its content hash."""
+    files = list(files)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        digests = executor.map(_file_sha256, [file for file, _rel in files])
+        return {rel.as_posix(): digest for (_file, rel), digest in zip(files, digests)}
+
+
+def diff_manifests(
+    previous: dict[str, str], current: dict[str, str]
+) -> tuple[list[str], list[str]]:
+    """Return (new or changed paths, deleted paths), both sorted."""
+    changed = sorted(path for path, digest in current.items() if previous.get(path) != digest)
+    deleted = sorted(path for path in previous if path not in current)
+    return changed, deleted
+
+
+def cache_path(config: dict[str, Any], target_folder: str, kind: str) -> Path:
+    """Per-project, per-target file under the local deploy cache (e.g. kind="manifest.json")."""
+    safe_target = target_folder.strip("/").replace("/", "_") or "_root"
+    return Path(config["cache_dir"]) / f"{config['project_name']}.{safe_target}.{kind}"
+
+
+def _manifest_files(data: Any) -> Optional[dict[str, str]]:
+    if isinstance(data, dict) and data.get("version") == MANIFEST_VERSION and isinstance(data.get("files"), dict):
+        return data["files"]
+    return None
+
+
+def fetch_previous_manifest(
+    base_url: str,
+    project_name: str,
+    target_folder: str,
+    headers: dict[str, str],
+    cached: Path,
+) -> tuple[Optional[dict[str, str]], str]:
+    """Return (manifest, source) for the last deploy, or (None, "none") if unknown.
+
+    The service's copy wins because it also reflects deploys made from other
+    machines. The local cache is only a fallback record, and deploy_bundle does
+    not send a delta against it.
+    """
+    try:
+        response = requests.get(
+            f"{base_url}/api/deploy/{project_name}/manifest",
+            params={"target_folder": target_folder},
+            headers=headers,
+            timeout=30,
+        )
+        if response.status_code == 200:
+            manifest = _manifest_files(response.json())
+            if manifest is not None:
+                return manifest, "server"
+    except (requests.RequestException, ValueError):
+        pass
+
+    try:
+        manifest = _manifest_files(json.loads(cached.read_text(encoding="utf-8")))
+    except (OSError, json.JSONDecodeError):
+        manifest = None
+    if manifest is not None:
+        return manifest, "local cache"
+    return None, "none"
+
+
+def save_manifest(path: Path, manifest: dict[str, str]) -> None:
+    _write_json(path, {"version": MANIFEST_VERSION, "files": manifest})
+
+
+def _write_json(path: Path, data: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def check_asset_budgets(
+    build_path: Path,
+    files: list[tuple[Path, Path]],
+    zipped: dict[str, int],
+    config: dict[str, Any],
+    target_folder: str,
+) -> bool:
+    """Print the per-asset weight report; False if an enforced size budget is exceeded.
+
+    Budgets only warn unless config["enforce_budgets"] is set.
+    """
+    budget_file = config.get("budget_file") or ""
+    try:
+        budgets = asset_weights.load_budgets(budget_file) if budget_file else None
+    except (OSError, ValueError) as exc:
+        print(f"ERROR: Could not read budget file '{budget_file}': {exc}")
+        return False
+
+    weights = asset_weights.measure_assets(files, zipped, config.get("compress_workers", 1))
+    report = asset_weights.evaluate(build_path, weights, budgets)
+    report_path = cache_path(config, target_folder, "weights.json")
+    print("Asset weights:")
+    asset_weights.print_report(report, _read_json(report_path))
+    print()
+    if report["violations"]:
+        if config.get("enforce_budgets"):
+            print(f"ERROR: Deploy blocked by size budget ({budget_file}).")
+            return False
+        print(f"WARNING: Size budget exceeded ({budget_file}); set DEPLOY_ENFORCE_BUDGETS=1 to block.\n")
+    _write_json(report_path, report)
+    return True
+
+
 def deploy_bundle(build_path: Path, config: dict[str, Any]) -> bool:
     """Zip the build and upload it as a single bundle."""
     project_name = config["project_name"]
@@ -99,41 +472,355 @@ def deploy_bundle(build_path: Path, config: dict[str, Any]) -> bool:
         print("Set it in the environment or in deploy.local.json (see .env.example / docs/DEPLOY.md).")
         return False
 
-    url = f"{base_url}/api/deploy/{project_name}/bundle"
-    headers = {"X-Deploy-Token": deploy_token}
+    streaming = config.get("stream") and not config.get("chunked")
+    if streaming and config.get("enforce_budgets") and config.get("budget_file"):
+        print("ERROR: A streamed upload is weighed while it is sent, so DEPLOY_ENFORCE_BUDGETS cannot stop it.")
+        print("Use DEPLOY_CHUNKED=1 or the default buffered mode to enforce size budgets.")
+        return False
 
-    print("Building zip archive...")
-    zip_bytes = build_zip(build_path)
-    print(f"Archive size: {len(zip_bytes) / 1024:.1f} KB\n")
+    if config.get("precompress"):
+        print("Precompressing assets...")
+        precompress.precompress(build_path, workers=config.get("compress_workers"), state_dir=config["cache_dir"])
+        print()
 
-    print("Uploading bundle...")
-    try:
-        response = requests.post(
-            url,
-            files={"bundle": ("build.zip", zip_bytes, "application/zip")},
-            data={"target_folder": target_folder},
-            headers=headers,
-            timeout=300,
+    url = f"{base_url}/api/deploy/{project_name}/bundle"
+    headers = {"X-Deploy-Token": deploy_token}
+    files = list(iter_build_files(build_path))
+    all_files = files
+    fields = {"target_folder": target_folder}
+
+    manifest = None
+    if config.get("delta"):
+        manifest = build_manifest(files, config.get("compress_workers", 1))
+        manifest_path = cache_path(config, target_folder, "manifest.json")
+        previous, source = fetch_previous_manifest(base_url, project_name, target_folder, headers, manifest_path)
+        if source != "server":
+            # Only the service's manifest describes what it is serving: a local cache
+            # misses deploys made from other machines, so a delta against it could
+            # leave stale files behind or skip files the target never received.
+            reason = "no previous manifest found" if previous is None else f"previous manifest is from the {source}"
+            print(f"Full upload: {reason}, not the deploy service.\n")
+            # Still send the manifest so the service can offer it to the next deploy.
+            fields.update(manifest=json.dumps(manifest))
+        else:
+            changed, deleted = diff_manifests(previous, manifest)
+            changed_set = set(changed)
+            skipped = [(f, rel) for f, rel in files if rel.as_posix() not in changed_set]
+            files = [(f, rel) for f, rel in files if rel.as_posix() in changed_set]
+            print(
+                f"Delta against {source} manifest: {len(changed)} new/changed, {len(deleted)} deleted, "
+                f"{len(skipped)} unchanged ({sum(f.stat().st_size for f, _rel in skipped) / 1024:.1f} KB skipped)\n"
+            )
+            if not changed and not deleted:
+                print("  Nothing to deploy — build matches the previous deploy.")
+                save_manifest(manifest_path, manifest)
+                return True
+            fields.update(mode="delta", deleted=json.dumps(deleted), manifest=json.dumps(manifest))
+
+    def within_budget(zipped: dict[str, int]) -> bool:
+        return check_asset_budgets(build_path, all_files, zipped, config, target_folder)
+
+    if config.get("chunked"):
+        response = _upload_chunked(
+            build_path, files, f"{base_url}/api/deploy/{project_name}", headers, fields, config, within_budget
         )
-    except Exception as exc:
-        print(f"  Upload failed: {exc}")
-        return False
+        if response is None:
+            return False
+    elif streaming:
+        zipped = {}
+        response = _upload_streaming(build_path, files, url, headers, fields, config["compress_workers"], zipped)
+        if response is None:
+            return False
+        # The archive only exists during the upload, so its weights are reported afterwards.
+        within_budget(zipped)
+    else:
+        print("Building zip archive...")
+        zipped: dict[str, int] = {}
+        zip_bytes = build_zip(build_path, files, zipped)
+        print(f"Archive size: {len(zip_bytes) / 1024:.1f} KB\n")
+        if not within_budget(zipped):
+            return False
+
+        print("Uploading bundle...")
+        try:
+            response = requests.post(
+                url,
+                files={"bundle": ("build.zip", zip_bytes, "application/zip")},
+                data=fields,
+                headers=headers,
+                timeout=300,
+            )
+        except Exception as exc:
+            print(f"  Upload failed: {exc}")
+            return False
 
     if response.status_code == 200:
         data = response.json()
         print(f"  OK — {data.get('uploaded', 0)} files uploaded")
+        if data.get("deleted"):
+            print(f"  {data['deleted']} files deleted")
         if data.get("failed"):
             print("  Failures:")
             for item in data["failed"]:
                 path = item.get("path", "<unknown>")
                 error = item.get("error", "unknown error")
                 print(f"    {path}: {error}")
-        return not data.get("failed")
+            return False
+        if manifest is not None:
+            save_manifest(manifest_path, manifest)
+        return True
 
     print(f"  Upload failed with HTTP {response.status_code}")
     return False
 
 
+def _upload_streaming(
+    build_path: Path,
+    files: list[tuple[Path, Path]],
+    url: str,
+    headers: dict[str, str],
+    fields: dict[str, str],
+    workers: int,
+    sizes: Optional[dict[str, int]] = None,
+) -> Optional[requests.Response]:
+    """Zip and upload in one pass as a chunked request body; reports throughput.
+
+    If `sizes` is given, it is filled with each entry's compressed size.
+    """
+    boundary = uuid.uuid4().hex
+    archive = _ByteCounter(stream_zip(build_path, workers, files=files, sizes=sizes))
+    body = stream_multipart(fields, "bundle", "build.zip", "application/zip", archive, boundary)
+
+    print(f"Streaming bundle ({workers} compression worker(s))...")
+    started = time.perf_counter()
+    try:
+        response = requests.post(
+            url,
+            data=body,
+            headers={**headers, "Content-Type": f"multipart/form-data; boundary={boundary}"},
+            timeout=300,
+        )
+    except Exception as exc:
+        print(f"  Upload failed: {exc}")
+        return None
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(
+        f"Archive size: {archive.total / 1024:.1f} KB streamed in {elapsed:.2f}s "
+        f"({archive.total / elapsed / 1024 / 1024:.2f} MB/s)\n"
+    )
+    return response
+
+
+# --- Resumable chunked uploads ----------------------------------------------
+#
+# The archive is spooled to the local cache, then sent as fixed-size parts:
+#   POST {api}/uploads                        -> {"upload_id": ...}
+#   GET  {api}/uploads/<id>                   -> {"received": [part indices]}
+#   PUT  {api}/uploads/<id>/parts/<n>         (X-Part-SHA256 header)
+#   POST {api}/uploads/<id>/complete          -> same body as the bundle endpoint
+# A resume file records the upload id and the archive hash, so a rerun over an
+# unchanged build asks the service which parts it already has and sends the rest.
+
+
+class UploadError(Exception):
+    """A chunked-upload request failed (after any retries) or returned an unusable answer."""
+
+
+def retry_delay(attempt: int, base_delay: float) -> float:
+    """Exponential backoff with jitter: base * 2**attempt, capped, scaled by 0.5-1.0."""
+    return min(MAX_RETRY_DELAY, base_delay * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
+def request_with_retries(
+    session: requests.Session,
+    method: str,
+    url: str,
+    *,
+    retries: int,
+    base_delay: float,
+    **kwargs: Any,
+) -> requests.Response:
+    """Send a request, retrying connection errors and RETRYABLE_STATUS responses.
+
+    Only use retries > 0 for idempotent requests.
+    """
+    attempt = 0
+    while True:
+        try:
+            response = session.request(method, url, **kwargs)
+        except requests.RequestException as exc:
+            error = type(exc).__name__
+        else:
+            if response.status_code not in RETRYABLE_STATUS:
+                return response
+            error = f"HTTP {response.status_code}"
+        if attempt >= retries:
+            raise UploadError(f"{method} {url} failed after {attempt + 1} attempt(s): {error}")
+        time.sleep(retry_delay(attempt, base_delay))
+        attempt += 1
+
+
+def spool_archive(
+    build_path: Path,
+    files: list[tuple[Path, Path]],
+    workers: int,
+    path: Path,
+    sizes: Optional[dict[str, int]] = None,
+) -> tuple[int, str]:
+    """Write the zip for `files` to path; returns (size, sha256)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as handle:
+        for chunk in stream_zip(build_path, workers, files=files, sizes=sizes, verbose=False):
+            handle.write(chunk)
+            digest.update(chunk)
+            size += len(chunk)
+    return size, digest.hexdigest()
+
+
+def _read_json(path: Path) -> Optional[dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _upload_id(response: requests.Response) -> str:
+    try:
+        upload_id = response.json()["upload_id"]
+    except (ValueError, KeyError, TypeError):
+        upload_id = None
+    if not isinstance(upload_id, str) or not upload_id:
+        raise UploadError(f"POST {response.url} answered without an upload_id: {response.text[:200]!r}")
+    return upload_id
+
+
+def _pooled_session(headers: dict[str, str], workers: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(headers)
+    return session
+
+
+def _upload_chunked(
+    build_path: Path,
+    files: list[tuple[Path, Path]],
+    api_url: str,
+    headers: dict[str, str],
+    fields: dict[str, str],
+    config: dict[str, Any],
+    within_budget: Callable[[dict[str, int]], bool] = lambda _zipped: True,
+) -> Optional[requests.Response]:
+    """Upload the bundle in checksummed parts, resuming a previous attempt when possible.
+
+    within_budget() sees the archive's per-entry sizes before any part is sent.
+    """
+    target_folder = fields["target_folder"]
+    archive_path = cache_path(config, target_folder, "upload.zip")
+    resume_path = cache_path(config, target_folder, "upload.json")
+    part_size = config["part_size"]
+    workers = config["upload_workers"]
+    retry = {"retries": config["retries"], "base_delay": config["retry_base_delay"]}
+
+    print("Building zip archive...")
+    zipped: dict[str, int] = {}
+    size, archive_sha = spool_archive(build_path, files, config["compress_workers"], archive_path, zipped)
+    part_count = max(1, -(-size // part_size))
+    print(f"Archive size: {size / 1024:.1f} KB in {part_count} part(s) of {part_size / 1024:.0f} KB\n")
+    if not within_budget(zipped):
+        return None
+
+    uploads_url = f"{api_url}/uploads"
+    with _pooled_session(headers, workers) as session:
+        try:
+            upload_id, received = None, set()
+            state = _read_json(resume_path)
+            if state and state.get("archive_sha256") == archive_sha and state.get("part_size") == part_size:
+                try:
+                    status = request_with_retries(
+                        session, "GET", f"{uploads_url}/{state['upload_id']}", timeout=30, **retry
+                    )
+                    if status.status_code == 200:
+                        parts = status.json().get("received", [])
+                        upload_id, received = state["upload_id"], set(parts)
+                        print(f"Resuming upload: {len(received)}/{part_count} part(s) already on the service")
+                except (requests.RequestException, ValueError, AttributeError, TypeError):
+                    # An unreadable status means nothing is known to be on the service; start over.
+                    upload_id, received = None, set()
+
+            if upload_id is None:
+                created = request_with_retries(
+                    session,
+                    "POST",
+                    uploads_url,
+                    json={**fields, "size": size, "sha256": archive_sha, "part_size": part_size, "parts": part_count},
+                    timeout=30,
+                    retries=0,
+                    base_delay=retry["base_delay"],
+                )
+                if created.status_code != 200:
+                    return created
+                upload_id = _upload_id(created)
+                _write_json(resume_path, {"upload_id": upload_id, "archive_sha256": archive_sha, "part_size": part_size})
+
+            pending = [index for index in range(part_count) if index not in received]
+            print(f"Uploading {len(pending)} part(s) over {workers} connection(s)...")
+            started = time.perf_counter()
+
+            def send_part(index: int) -> int:
+                with open(archive_path, "rb") as handle:
+                    handle.seek(index * part_size)
+                    data = handle.read(part_size)
+                response = request_with_retries(
+                    session,
+                    "PUT",
+                    f"{uploads_url}/{upload_id}/parts/{index}",
+                    data=data,
+                    headers={
+                        "Content-Type": "application/octet-stream",
+                        "X-Part-SHA256": hashlib.sha256(data).hexdigest(),
+                    },
+                    timeout=(10, 120),
+                    **retry,
+                )
+                if response.status_code != 200:
+                    raise UploadError(f"part {index} rejected with HTTP {response.status_code}")
+                return len(data)
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(send_part, index) for index in pending]
+                done, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in not_done:
+                    future.cancel()
+                sent = sum(future.result() for future in done)
+
+            elapsed = max(time.perf_counter() - started, 1e-9)
+            print(f"  {sent / 1024:.1f} KB sent in {elapsed:.2f}s ({sent / elapsed / 1024 / 1024:.2f} MB/s)")
+
+            response = request_with_retries(
+                session,
+                "POST",
+                f"{uploads_url}/{upload_id}/complete",
+                timeout=300,
+                retries=0,
+                base_delay=retry["base_delay"],
+            )
+        except UploadError as exc:
+            print(f"  Upload failed: {exc}")
+            print("  Rerun deploy.py to resume; parts already sent are kept.")
+            return None
+
+    if response.status_code == 200:
+        resume_path.unlink(missing_ok=True)
+        archive_path.unlink(missing_ok=True)
+    return response
+
+
 def main() -> None:
     config = load_deploy_config()
     project_name = config["project_name"]
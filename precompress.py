@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Write precompressed .br and .gz siblings for the compressible assets in a build.
+
+Usage:
+  python3 precompress.py [build_dir] [--workers N] [--report PATH]
+
+Files are compressed in parallel across a process pool (brotli quality 11 and
+gzip level 9 are CPU-bound and hold the GIL). A state file under .deploy-cache/
+remembers each source file's SHA-256, so a rerun only recompresses files whose
+contents changed. A sibling is only kept when it is smaller than the source.
+A JSON compression report is written next to the state file.
+
+deploy.py runs this before uploading when DEPLOY_PRECOMPRESS=1, and
+verification/server.DistServer(precompress=True) runs it before serving, so
+both exercise the same encoded bytes. Brotli needs `pip install brotli`;
+without it only .gz siblings are produced.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # optional: .gz siblings are still produced
+    brotli = None
+
+DEFAULT_BUILD_DIR = "dist"
+DEFAULT_STATE_DIR = Path(__file__).resolve().parent / ".deploy-cache"
+
+# Text-like formats plus .wasm, which roughly halves under brotli/gzip.
+COMPRESSIBLE_SUFFIXES = frozenset(
+    {".js", ".mjs", ".css", ".html", ".svg", ".json", ".webmanifest", ".wasm", ".txt", ".xml", ".ico"}
+)
+# Below this, the saving is smaller than a typical response header.
+MIN_SIZE = 512
+# (encoding name, sibling suffix); matches verification/static_server.PRECOMPRESSED.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+STATE_VERSION = 1
+
+
+@dataclass
+class CompressionResult:
+    path: str
+    size: int
+    # Encoding -> sibling size, only for siblings that were kept.
+    outputs: dict[str, int] = field(default_factory=dict)
+    skipped: bool = False
+
+
+def available_encodings() -> tuple[str, ...]:
+    return tuple(name for name, _suffix in ENCODINGS if name != "br" or brotli is not None)
+
+
+def sibling_path(path: Path, encoding: str) -> Path:
+    suffix = dict(ENCODINGS)[encoding]
+    return path.with_name(path.name + suffix)
+
+
+def is_compressible(path: Path) -> bool:
+    return path.suffix.lower() in COMPRESSIBLE_SUFFIXES
+
+
+def iter_sources(directory: Path):
+    """Yield compressible files under directory, sorted, excluding existing siblings."""
+    for path in sorted(directory.rglob("*")):
+        if path.is_file() and is_compressible(path) and path.stat().st_size >= MIN_SIZE:
+            yield path
+
+
+def state_path_for(directory: Path, state_dir: Path | str | None = None) -> Path:
+    """Per-build-directory state file, keyed by the directory's absolute path."""
+    directory = directory.resolve()
+    key = hashlib.sha1(str(directory).encode("utf-8")).hexdigest()[:10]
+    return Path(state_dir or DEFAULT_STATE_DIR) / f"precompress.{directory.name}.{key}.json"
+
+
+def _compress_bytes(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    # mtime=0 keeps the output byte-identical across runs for delta deploys.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _compress_file(path_str: str, encodings: tuple[str, ...]) -> tuple[str, str, dict[str, int]]:
+    """Worker: write the siblings for one file; returns (path, sha256, kept sizes)."""
+    path = Path(path_str)
+    data = path.read_bytes()
+    outputs = {}
+    for encoding in encodings:
+        sibling = sibling_path(path, encoding)
+        compressed = _compress_bytes(data, encoding)
+        if len(compressed) < len(data):
+            tmp = sibling.with_name(f"{sibling.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(compressed)
+            os.replace(tmp, sibling)
+            outputs[encoding] = len(compressed)
+        else:
+            sibling.unlink(missing_ok=True)
+    return path_str, hashlib.sha256(data).hexdigest(), outputs
+
+
+def _load_state(path: Path) -> dict:
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+        return {}
+    return state.get("files", {})
+
+
+def _write_json(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _up_to_date(path: Path, sha: str, entry: Optional[dict], encodings: tuple[str, ...]) -> bool:
+    if not entry or entry.get("sha256") != sha or entry.get("encodings") != list(encodings):
+        return False
+    outputs = entry.get("outputs", {})
+    for encoding in encodings:
+        sibling = sibling_path(path, encoding)
+        if encoding in outputs:
+            if not sibling.is_file() or sibling.stat().st_size != outputs[encoding]:
+                return False
+        elif sibling.exists():
+            return False
+    return True
+
+
+def _file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def precompress(
+    directory: Path | str = DEFAULT_BUILD_DIR,
+    *,
+    workers: Optional[int] = None,
+    state_dir: Path | str | None = None,
+    report_path: Path | str | None = None,
+    verbose: bool = True,
+) -> list[CompressionResult]:
+    """Write .br/.gz siblings under directory, skipping files unchanged since the last run."""
+    directory = Path(directory)
+    encodings = available_encodings()
+    state_path = state_path_for(directory, state_dir)
+    previous = _load_state(state_path)
+    started = time.perf_counter()
+
+    results: dict[str, CompressionResult] = {}
+    state: dict[str, dict] = {}
+    todo: list[Path] = []
+    for path in iter_sources(directory):
+        rel = path.relative_to(directory).as_posix()
+        sha = _file_sha256(path)
+        entry = previous.get(rel)
+        if _up_to_date(path, sha, entry, encodings):
+            results[rel] = CompressionResult(rel, path.stat().st_size, dict(entry["outputs"]), skipped=True)
+            state[rel] = entry
+        else:
+            todo.append(path)
+
+    if todo:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+        args = [(str(path), encodings) for path in todo]
+        if workers == 1:
+            done = [_compress_file(*arg) for arg in args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                done = list(executor.map(_compress_file, *zip(*args)))
+        for path_str, sha, outputs in done:
+            path = Path(path_str)
+            rel = path.relative_to(directory).as_posix()
+            results[rel] = CompressionResult(rel, path.stat().st_size, outputs)
+            state[rel] = {"sha256": sha, "encodings": list(encodings), "outputs": outputs}
+
+    ordered = [results[rel] for rel in sorted(results)]
+    elapsed = time.perf_counter() - started
+    _write_json(state_path, {"version": STATE_VERSION, "files": state})
+    report_path = Path(report_path) if report_path else state_path.with_name("precompress-report.json")
+    _write_json(report_path, build_report(directory, encodings, ordered, elapsed))
+    if verbose:
+        print_report(ordered, encodings, elapsed)
+    return ordered
+
+
+def build_report(
+    directory: Path, encodings: tuple[str, ...], results: list[CompressionResult], elapsed: float
+) -> dict:
+    totals = {"size": sum(r.size for r in results)}
+    for encoding in encodings:
+        # Files without a kept sibling are served raw, so count their raw size.
+        totals[encoding] = sum(r.outputs.get(encoding, r.size) for r in results)
+    return {
+        "directory": str(directory),
+        "encodings": list(encodings),
+        "elapsed_seconds": round(elapsed, 3),
+        "compressed": sum(not r.skipped for r in results),
+        "skipped": sum(r.skipped for r in results),
+        "totals": totals,
+        "files": [asdict(r) for r in results],
+    }
+
+
+def print_report(results: list[CompressionResult], encodings: tuple[str, ...], elapsed: float) -> None:
+    if brotli is None:
+        print("  (brotli not installed; writing .gz only — pip install brotli)")
+    header = "".join(f"{name:>12}" for name in encodings)
+    print(f"  {'file':<48}{'raw':>12}{header}")
+    for r in results:
+        cells = "".join(
+            f"{r.outputs[name] / 1024:>9.1f} KB" if name in r.outputs else f"{'-':>12}" for name in encodings
+        )
+        note = "  (unchanged)" if r.skipped else ""
+        print(f"  {r.path:<48}{r.size / 1024:>9.1f} KB{cells}{note}")
+    total = sum(r.size for r in results)
+    summary = ", ".join(
+        f"{name} {sum(r.outputs.get(name, r.size) for r in results) / 1024:.1f} KB" for name in encodings
+    )
+    compressed = sum(not r.skipped for r in results)
+    print(
+        f"  {len(results)} compressible file(s), {compressed} recompressed in {elapsed:.2f}s: "
+        f"raw {total / 1024:.1f} KB -> {summary}"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("build_dir", nargs="?", default=DEFAULT_BUILD_DIR)
+    parser.add_argument("--workers", "-j", type=int, default=None, help="compression processes (default: CPU count)")
+    parser.add_argument("--report", default=None, help="report path (default: .deploy-cache/precompress-report.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    build_path = Path(args.build_dir)
+    if not build_path.is_dir():
+        print(f"ERROR: Build directory '{args.build_dir}/' does not exist.")
+        return 1
+    precompress(build_path, workers=args.workers, report_path=args.report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,79 @@
 #!/usr/bin/env python3
-"""Generate PWA install icons (192, 512, apple-touch) for Crystal Cave Spore Hunter."""
+"""Generate PWA icons and splash screens for Crystal Cave Spore Hunter.
 
+The crystal emblem is drawn once as a high-resolution master. Every target is
+then derived from it by downsampling, which gives supersampled anti-aliasing
+for free, and the targets are spread across a process pool. This covers the
+"any", maskable and monochrome manifest icons, the apple-touch icon, and the
+iOS splash screens. A target is skipped when the hash of its inputs (target
+spec, output options and this script's source) matches the last run and its
+file still exists.
+
+Usage:
+  python3 scripts/generate-pwa-icons.py [--optimize] [--webp] [--force] [--workers N]
+
+--optimize palette-quantizes PNGs to PALETTE_COLORS colours. That makes them
+about 4x smaller than full-colour output (icon-512: 24.7 KB -> 6.1 KB), though
+the anti-aliased edges keep them a little larger than hard-edged icons would
+be. --webp also writes a .webp next to each PNG; without it, a .webp left by
+an earlier run is removed so the two never disagree.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
 
 from PIL import Image, ImageDraw
 
-OUT = Path(__file__).resolve().parent.parent / "public" / "icons"
+ROOT = Path(__file__).resolve().parent.parent
+OUT = ROOT / "public" / "icons"
+CACHE_FILE = ROOT / ".cache" / "pwa-icons.json"
 BG = (8, 12, 28)
 CRYSTAL = [(255, 0, 204), (51, 51, 255), (0, 204, 255)]
+MONOCHROME = (255, 255, 255)
+
+MASTER_SIZE = 2048
+# Maskable icons are cropped to a circle of 80% diameter; keep the emblem inside it.
+MASKABLE_SCALE = 0.8
+# Share of the splash screen's shorter side taken by the emblem.
+SPLASH_SCALE = 0.4
+# Fewer colours band the glow (max channel error ~50 at 32) for a few hundred bytes.
+PALETTE_COLORS = 128
+
+
+@dataclass(frozen=True)
+class IconTarget:
+    name: str
+    width: int
+    height: int
+    # "any" | "maskable" | "monochrome" | "splash"
+    variant: str
+
+
+TARGETS = [
+    IconTarget("icon-192.png", 192, 192, "any"),
+    IconTarget("icon-512.png", 512, 512, "any"),
+    IconTarget("apple-touch-icon.png", 180, 180, "any"),
+    IconTarget("maskable-192.png", 192, 192, "maskable"),
+    IconTarget("maskable-512.png", 512, 512, "maskable"),
+    IconTarget("monochrome-512.png", 512, 512, "monochrome"),
+    # Portrait iOS launch screens (see the apple-touch-startup-image links in index.html).
+    IconTarget("splash-750x1334.png", 750, 1334, "splash"),
+    IconTarget("splash-1170x2532.png", 1170, 2532, "splash"),
+    IconTarget("splash-1290x2796.png", 1290, 2796, "splash"),
+]
 
 
-def draw_icon(size: int) -> Image.Image:
-    img = Image.new("RGBA", (size, size), BG + (255,))
-    draw = ImageDraw.Draw(img)
+def draw_emblem(size: int) -> Image.Image:
+    """The crystal on a transparent square, laid out as on the full icon."""
+    img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
     margin = size * 0.12
     cx, cy = size / 2, size / 2
     points = [
@@ -22,23 +83,160 @@ def draw_icon(size: int) -> Image.Image:
         (margin, cy),
     ]
     for i, color in enumerate(CRYSTAL):
+        layer = Image.new("RGBA", img.size, (0, 0, 0, 0))
         offset = i * 0.04 * size
         shifted = [(x + (offset if j % 2 else -offset * 0.5), y) for j, (x, y) in enumerate(points)]
-        draw.polygon(shifted, fill=color + (220,))
+        ImageDraw.Draw(layer).polygon(shifted, fill=color + (220,))
+        img = Image.alpha_composite(img, layer)
     glow_r = size * 0.08
-    draw.ellipse(
+    glow = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    ImageDraw.Draw(glow).ellipse(
         (cx - glow_r, cy - glow_r, cx + glow_r, cy + glow_r),
         fill=(255, 255, 255, 180),
     )
-    return img
+    return Image.alpha_composite(img, glow)
+
+
+def render_target(master: Image.Image, target: IconTarget) -> Image.Image:
+    """Derive one target from the emblem master by downsampling."""
+    width, height = target.width, target.height
+    if target.variant == "splash":
+        emblem_size = round(min(width, height) * SPLASH_SCALE)
+    elif target.variant in ("maskable", "monochrome"):
+        emblem_size = round(width * MASKABLE_SCALE)
+    else:
+        emblem_size = width
+    emblem = master.resize((emblem_size, emblem_size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    if target.variant == "monochrome":
+        # Only the alpha channel matters to the platform; paint it white.
+        canvas = Image.new("RGBA", (width, height), MONOCHROME + (0,))
+        solid = Image.new("RGBA", emblem.size, MONOCHROME + (255,))
+        solid.putalpha(emblem.getchannel("A"))
+        emblem = solid
+    else:
+        canvas = Image.new("RGBA", (width, height), BG + (255,))
+    canvas.alpha_composite(emblem, ((width - emblem_size) // 2, (height - emblem_size) // 2))
+    return canvas
+
+
+def save(img: Image.Image, path: Path, optimize: bool, webp: bool) -> list[Path]:
+    opaque = img.getchannel("A").getextrema() == (255, 255)
+    if opaque:
+        img = img.convert("RGB")  # iOS renders transparent apple-touch pixels black.
+    png = img
+    if optimize:
+        png = img.quantize(PALETTE_COLORS, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+    png.save(path, "PNG", optimize=optimize)
+    written = [path]
+    webp_path = path.with_suffix(".webp")
+    if webp:
+        img.save(webp_path, "WEBP", quality=90, method=6, lossless=False)
+        written.append(webp_path)
+    else:
+        webp_path.unlink(missing_ok=True)
+    return written
+
+
+def target_hash(target: IconTarget, optimize: bool, webp: bool, source_digest: str) -> str:
+    payload = json.dumps(
+        {"target": asdict(target), "optimize": optimize, "webp": webp, "master": MASTER_SIZE, "source": source_digest},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_cache() -> dict[str, str]:
+    try:
+        data = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_cache(cache: dict[str, str]) -> None:
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    CACHE_FILE.write_text(json.dumps(cache, indent=2, sort_keys=True), encoding="utf-8")
+
+
+# Each pool worker receives the master once (via the initializer), not per task.
+_worker_master: Image.Image | None = None
+
+
+def _init_worker(mode: str, size: tuple[int, int], data: bytes) -> None:
+    global _worker_master
+    _worker_master = Image.frombytes(mode, size, data)
+
+
+def _render_and_save(target: IconTarget, out_dir: str, optimize: bool, webp: bool) -> list[str]:
+    img = render_target(_worker_master, target)
+    return [str(p) for p in save(img, Path(out_dir) / target.name, optimize, webp)]
+
+
+def generate(
+    targets: list[IconTarget] = TARGETS,
+    out_dir: Path = OUT,
+    *,
+    optimize: bool = False,
+    webp: bool = False,
+    force: bool = False,
+    workers: int | None = None,
+) -> tuple[list[str], list[str]]:
+    """Render stale targets; returns (written paths, skipped target names)."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    source_digest = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+    cache = load_cache()
+    hashes = {t.name: target_hash(t, optimize, webp, source_digest) for t in targets}
+
+    def fresh(target: IconTarget) -> bool:
+        key = str(out_dir / target.name)
+        outputs = [out_dir / target.name] + ([(out_dir / target.name).with_suffix(".webp")] if webp else [])
+        return cache.get(key) == hashes[target.name] and all(p.is_file() for p in outputs)
+
+    stale = [t for t in targets if force or not fresh(t)]
+    skipped = [t.name for t in targets if t not in stale]
+    if not stale:
+        return [], skipped
+
+    master = draw_emblem(MASTER_SIZE)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(stale)))
+    args = (stale, [str(out_dir)] * len(stale), [optimize] * len(stale), [webp] * len(stale))
+    if workers == 1:
+        _init_worker(master.mode, master.size, master.tobytes())
+        results = list(map(_render_and_save, *args))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(master.mode, master.size, master.tobytes()),
+        ) as executor:
+            results = list(executor.map(_render_and_save, *args))
+
+    written = [path for paths in results for path in paths]
+    for target in stale:
+        cache[str(out_dir / target.name)] = hashes[target.name]
+    save_cache(cache)
+    return written, skipped
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--optimize", action="store_true", help="palette-quantize PNG output")
+    parser.add_argument("--webp", action="store_true", help="also write a .webp next to each PNG")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and re-render every target")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="render processes (default: CPU count)")
+    return parser.parse_args(argv)
 
 
-def main():
-    OUT.mkdir(parents=True, exist_ok=True)
-    for name, size in [("icon-192.png", 192), ("icon-512.png", 512), ("apple-touch-icon.png", 180)]:
-        draw_icon(size).save(OUT / name, "PNG")
-        print(f"Wrote {OUT / name}")
+def main(argv=None):
+    args = parse_args(argv)
+    written, skipped = generate(optimize=args.optimize, webp=args.webp, force=args.force, workers=args.workers)
+    for path in written:
+        print(f"Wrote {path} ({Path(path).stat().st_size / 1024:.1f} KB)")
+    if skipped:
+        print(f"Unchanged: {', '.join(skipped)}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
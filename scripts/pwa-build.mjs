@@ -9,6 +9,8 @@ const distDir = path.join(root, 'dist');
 const pkg = JSON.parse(fs.readFileSync(path.join(root, 'package.json'), 'utf8'));
 
 const SKIP_NAMES = new Set(['sw.js', 'precache-manifest.json']);
+// Precompressed siblings (precompress.py) are negotiated via Content-Encoding, never fetched directly.
+const SKIP_SUFFIXES = ['.map', '.br', '.gz'];
 
 function walkFiles(dir, base = '') {
     const urls = [];
@@ -19,7 +21,7 @@ function walkFiles(dir, base = '') {
         const stat = fs.statSync(full);
         if (stat.isDirectory()) {
             urls.push(...walkFiles(full, rel));
-        } else if (!name.endsWith('.map')) {
+        } else if (!SKIP_SUFFIXES.some((suffix) => name.endsWith(suffix))) {
             urls.push(`./${rel}`);
         }
     }
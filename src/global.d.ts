@@ -33,6 +33,7 @@ interface HTMLElement {
 interface Window {
     __DEV_PERF__?: boolean;
     __PARTICLE_WORKER__?: boolean;
+    __PARTICLE_INTEGRATOR__?: 'worker' | 'wasm' | 'js';
     __WASM_VERBOSE__?: boolean;
     __FORCE_WEBGL_POSTFX__?: boolean;
     __FORCE_CANVAS_POSTFX__?: boolean;
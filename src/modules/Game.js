@@ -150,6 +150,7 @@ export class Game {
                 particleIntegratorPath: 'idle',
                 particleWorkerMs: 0,
                 particleWorkerBacklog: 0,
+                particleMainWasm: false,
             },
             adaptiveOverrides: {
                 particleStrideBoost: 0,
@@ -397,6 +398,11 @@ export class Game {
         this.state.slowMoTimer = 0;
         this.state.crystals = [];
         this.state.spores = [];
+        // Return the previous session's particles, or the pools keep them in inUse forever.
+        // A worker result still queued for them would scatter into released (or reused) objects.
+        particleWorkerBridge.discardPending();
+        this.particlePool.releaseAll();
+        this.trailPool.releaseAll();
         this.state.particles = [];
         this.state.shockwaves = [];
         this.state.floatingTexts = [];
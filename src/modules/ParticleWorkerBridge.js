@@ -24,6 +24,8 @@ import {
 
 /** @typedef {'worker' | 'main' | 'idle'} IntegratorPath */
 
+/** @typedef {'worker' | 'wasm' | 'js'} ForcedIntegratorPath */
+
 /**
  * @typedef {Object} ParticleWorkerStatus
  * @property {IntegratorPath} path
@@ -31,6 +33,7 @@ import {
  * @property {number} backlog
  * @property {boolean} enabled
  * @property {boolean} ready
+ * @property {boolean} mainWasm whether the last main-thread integration used a WASM batch
  */
 
 /**
@@ -64,6 +67,17 @@ import {
  * @property {Float64Array} [ambientBuffer]
  */
 
+/**
+ * Integrator path forced by globalThis.__PARTICLE_INTEGRATOR__, or null.
+ * Forced paths skip the batch-size thresholds so benchmarks can measure their crossover points.
+ * @returns {ForcedIntegratorPath | null}
+ */
+export function getForcedIntegratorPath() {
+    const root = typeof globalThis !== 'undefined' ? globalThis : undefined;
+    const forced = root ? root.__PARTICLE_INTEGRATOR__ : undefined;
+    return forced === 'worker' || forced === 'wasm' || forced === 'js' ? forced : null;
+}
+
 export class ParticleWorkerBridge {
     constructor() {
         /** @type {Worker | null} */
@@ -76,6 +90,7 @@ export class ParticleWorkerBridge {
         this.lastPath = 'idle';
         this.lastWorkerMs = 0;
         this.backlog = 0;
+        this.lastMainWasm = false;
 
         /** @type {PendingApply | null} */
         this._pendingApply = null;
@@ -142,6 +157,7 @@ export class ParticleWorkerBridge {
             backlog: this.backlog,
             enabled: this.enabled,
             ready: this.ready,
+            mainWasm: this.lastMainWasm,
         };
     }
 
@@ -168,7 +184,10 @@ export class ParticleWorkerBridge {
 
         const dustCount = dustParticles.length;
         const totalVisual = trailCount + dustCount + ambientCount;
-        const canUseWorker = this._canUseWorker(totalVisual, renderQuality);
+        const forced = getForcedIntegratorPath();
+        const canUseWorker = forced === null
+            ? this._canUseWorker(totalVisual, renderQuality)
+            : forced === 'worker' && this._canUseWorker(totalVisual, renderQuality, 0);
 
         if (canUseWorker) {
             const posted = this._postToWorker({
@@ -184,6 +203,7 @@ export class ParticleWorkerBridge {
             });
             if (posted) {
                 this.lastPath = 'worker';
+                this.lastMainWasm = false;
                 return { usedWorker: true, appliedResult: hadReady };
             }
         }
@@ -198,7 +218,7 @@ export class ParticleWorkerBridge {
             rw,
             rh,
             wasmManager,
-        });
+        }, forced);
         this.lastPath = 'main';
         return { usedWorker: false, appliedResult: hadReady };
     }
@@ -210,15 +230,26 @@ export class ParticleWorkerBridge {
         this._applyReadyResult();
     }
 
+    /**
+     * Drop in-flight and ready worker results without applying them (call when the
+     * particles they would scatter into are released, e.g. on a session restart).
+     * A reply that still arrives no longer matches a pending frame and is ignored.
+     */
+    discardPending() {
+        this._pendingApply = null;
+        this._readyApply = null;
+    }
+
     /**
      * @param {number} totalVisual
      * @param {string} renderQuality
+     * @param {number} [minParticles]
      * @returns {boolean}
      */
-    _canUseWorker(totalVisual, renderQuality) {
+    _canUseWorker(totalVisual, renderQuality, minParticles = WORKER_MIN_PARTICLES) {
         if (!this.enabled || !this.ready || !this.worker) return false;
         if (renderQuality === 'low') return false;
-        if (totalVisual < WORKER_MIN_PARTICLES) return false;
+        if (totalVisual < minParticles) return false;
         if (this.inFlight > 1) return false;
         return true;
     }
@@ -371,8 +402,9 @@ export class ParticleWorkerBridge {
 
     /**
      * @param {Omit<VisualIntegrationParams, 'renderQuality'>} params
+     * @param {ForcedIntegratorPath | null} [forced] 'js' skips WASM; 'wasm' uses it at any batch size
      */
-    _integrateOnMainThread(params) {
+    _integrateOnMainThread(params, forced = null) {
         const {
             trailBatch,
             trailCount,
@@ -384,11 +416,15 @@ export class ParticleWorkerBridge {
             rh,
             wasmManager,
         } = params;
+        const useWasm = forced !== 'js';
+        const minBatch = forced === 'wasm' ? 1 : undefined;
+        this.lastMainWasm = false;
 
         if (trailCount > 0) {
-            const usedWasm = wasmManager.batchIntegrateTrailParticles(
-                trailBatch, trailCount, timeScale, rw, rh
+            const usedWasm = useWasm && wasmManager.batchIntegrateTrailParticles(
+                trailBatch, trailCount, timeScale, rw, rh, minBatch
             );
+            this.lastMainWasm = usedWasm;
             if (!usedWasm) {
                 for (let j = 0; j < trailCount; j++) {
                     trailBatch[j].update(timeScale, rw, rh);
@@ -401,9 +437,10 @@ export class ParticleWorkerBridge {
         }
 
         if (ambientCount > 0) {
-            const usedWasm = wasmManager.batchIntegrateAmbientParticles(
-                ambientBatch, ambientCount, timeScale, rw, rh
+            const usedWasm = useWasm && wasmManager.batchIntegrateAmbientParticles(
+                ambientBatch, ambientCount, timeScale, rw, rh, minBatch
             );
+            this.lastMainWasm = this.lastMainWasm || usedWasm;
             if (!usedWasm) {
                 for (let j = 0; j < ambientCount; j++) {
                     ambientBatch[j].updateAmbient(rw, rh, timeScale);
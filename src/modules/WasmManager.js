@@ -343,11 +343,14 @@ export class WasmManager {
      * @param {number} timeScale
      * @param {number} rendererWidth
      * @param {number} rendererHeight
+     * @param {number} [minBatch] smallest count worth the pack/scatter round trip
      * @returns {boolean}
      */
-    batchIntegrateAmbientParticles(ambientParticles, count, timeScale, rendererWidth, rendererHeight) {
+    batchIntegrateAmbientParticles(
+        ambientParticles, count, timeScale, rendererWidth, rendererHeight, minBatch = AMBIENT_MIN_BATCH
+    ) {
         const wasm = this.exports;
-        if (!this.ready || !wasm || count < AMBIENT_MIN_BATCH) {
+        if (!this.ready || !wasm || count < minBatch) {
             return false;
         }
 
@@ -383,11 +386,14 @@ export class WasmManager {
      * @param {number} timeScale
      * @param {number} rendererWidth
      * @param {number} rendererHeight
+     * @param {number} [minBatch] smallest count worth the pack/scatter round trip
      * @returns {boolean}
      */
-    batchIntegrateTrailParticles(trailParticles, count, timeScale, rendererWidth, rendererHeight) {
+    batchIntegrateTrailParticles(
+        trailParticles, count, timeScale, rendererWidth, rendererHeight, minBatch = TRAIL_MIN_BATCH
+    ) {
         const wasm = this.exports;
-        if (!this.ready || !wasm || count < TRAIL_MIN_BATCH) {
+        if (!this.ready || !wasm || count < minBatch) {
             return false;
         }
 
@@ -386,6 +386,7 @@ export class GameLoop {
             game.state.perfMetrics.particleIntegratorPath = workerStatus.path;
             game.state.perfMetrics.particleWorkerMs = workerStatus.workerMs;
             game.state.perfMetrics.particleWorkerBacklog = workerStatus.backlog;
+            game.state.perfMetrics.particleMainWasm = workerStatus.mainWasm;
         }
 
         const profile = game.renderer.getQualityProfile(game.state.renderQuality);
@@ -67,6 +67,7 @@
  * @property {'worker' | 'main' | 'idle'} [particleIntegratorPath]
  * @property {number} [particleWorkerMs]
  * @property {number} [particleWorkerBacklog]
+ * @property {boolean} [particleMainWasm]
  */
 
 /**
@@ -609,8 +610,8 @@
  * @property {(seed: number, phase: number, lanes: number) => Float64Array} generateBossHeights
  * @property {(phase: number, lanes: number) => number} getBossVulnerableMask
  * @property {(elapsedMs: number, telegraphMs: number) => number} getBossTelegraphProgress
- * @property {(ambientParticles: InstanceType<typeof import('./Entities.js').Particle>[], count: number, timeScale: number, rendererWidth: number, rendererHeight: number) => boolean} batchIntegrateAmbientParticles
- * @property {(trailParticles: InstanceType<typeof import('./Entities.js').TrailParticle>[], count: number, timeScale: number, rendererWidth: number, rendererHeight: number) => boolean} batchIntegrateTrailParticles
+ * @property {(ambientParticles: InstanceType<typeof import('./Entities.js').Particle>[], count: number, timeScale: number, rendererWidth: number, rendererHeight: number, minBatch?: number) => boolean} batchIntegrateAmbientParticles
+ * @property {(trailParticles: InstanceType<typeof import('./Entities.js').TrailParticle>[], count: number, timeScale: number, rendererWidth: number, rendererHeight: number, minBatch?: number) => boolean} batchIntegrateTrailParticles
  */
 
 /**
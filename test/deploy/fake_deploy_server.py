@@ -0,0 +1,228 @@
+"""Local stand-in for the Contabo deploy service used by the deploy.py tests."""
+from __future__ import annotations
+
+import hashlib
+import io
+import itertools
+import json
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+def _read_body(handler: BaseHTTPRequestHandler) -> bytes:
+    if handler.headers.get("Transfer-Encoding", "").lower() == "chunked":
+        body = bytearray()
+        while True:
+            size = int(handler.rfile.readline().split(b";")[0].strip(), 16)
+            if size == 0:
+                handler.rfile.readline()
+                return bytes(body)
+            body += handler.rfile.read(size)
+            handler.rfile.readline()
+    return handler.rfile.read(int(handler.headers.get("Content-Length", 0)))
+
+
+def parse_multipart(body: bytes, content_type: str) -> dict[str, bytes]:
+    boundary = content_type.split("boundary=", 1)[1].strip().strip('"').encode()
+    parts = {}
+    for chunk in body.split(b"--" + boundary)[1:-1]:
+        head, _, value = chunk.strip(b"\r\n").partition(b"\r\n\r\n")
+        disposition = head.split(b"\r\n")[0].decode()
+        name = disposition.split('name="', 1)[1].split('"', 1)[0]
+        parts[name] = value
+    return parts
+
+
+class FakeDeployServer(ThreadingHTTPServer):
+    """Accepts bundle uploads and records the extracted files per target folder.
+
+    Delta uploads (mode=delta) apply their deletion list. Any upload that
+    carries a manifest stores it, and GET /api/deploy/<project>/manifest
+    returns it unless serve_manifest is False.
+
+    Chunked uploads go through /uploads. Faults can be queued per part index in
+    part_faults: "503" answers with that status, "drop" closes the connection
+    without a response, and "corrupt" acts as if the part checksum did not
+    match (422). A fault listed as "down" is never consumed, so the part keeps
+    failing until it is removed. complete_faults queues statuses for
+    POST .../complete the same way, create_reply replaces the body of a
+    successful POST .../uploads, and status_reply replaces the raw bytes of a
+    successful GET .../uploads/<id>.
+    """
+
+    def __init__(self, token: str = "test-token", serve_manifest: bool = True):
+        self.token = token
+        self.serve_manifest = serve_manifest
+        self.uploads: list[dict] = []
+        self.files: dict[str, dict[str, bytes]] = {}
+        self.manifests: dict[str, dict[str, str]] = {}
+        self.chunked_uploads = 0
+        self.sessions: dict[str, dict] = {}
+        self.part_faults: dict[int, list[str]] = {}
+        self.part_requests: list[int] = []
+        self.complete_faults: list[int] = []
+        self.create_reply: dict | None = None
+        self.status_reply: bytes | None = None
+        self.post_requests: list[str] = []
+        self._ids = itertools.count(1)
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
+
+    def _json(self, status: int, payload: dict) -> None:
+        self._reply(status, json.dumps(payload).encode())
+
+    def _reply(self, status: int, data: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self) -> bool:
+        if self.headers.get("X-Deploy-Token") != self.server.token:
+            self._json(401, {"error": "bad token"})
+            return False
+        return True
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/api/deploy/health":
+            self._json(200, {"status": "ok"})
+            return
+        if "/uploads/" in parts.path:
+            if not self._authorized():
+                return
+            session = self.server.sessions.get(parts.path.rsplit("/", 1)[1])
+            if session is None:
+                self._json(404, {"error": "unknown upload"})
+            elif self.server.status_reply is not None:
+                self._reply(200, self.server.status_reply)
+            else:
+                self._json(200, {"received": sorted(session["parts"])})
+            return
+        if parts.path.endswith("/manifest") and self.server.serve_manifest:
+            if self.headers.get("X-Deploy-Token") != self.server.token:
+                self._json(401, {"error": "bad token"})
+                return
+            target = parse_qs(parts.query).get("target_folder", [""])[0]
+            if target in self.server.manifests:
+                self._json(200, {"version": 1, "files": self.server.manifests[target]})
+                return
+        self._json(404, {"error": "not found"})
+
+    def do_PUT(self):
+        body = _read_body(self)
+        if not self._authorized():
+            return
+        upload_id, _, index = self.path.split("/uploads/", 1)[1].partition("/parts/")
+        session = self.server.sessions.get(upload_id)
+        if session is None:
+            self._json(404, {"error": "unknown upload"})
+            return
+        index = int(index)
+        with self.server.lock:
+            self.server.part_requests.append(index)
+            faults = self.server.part_faults.get(index) or []
+            fault = faults[0] if faults else None
+            if fault is not None and fault != "down":
+                faults.pop(0)
+        if fault == "drop":
+            self.close_connection = True
+            return
+        if fault in ("503", "down"):
+            self._json(503, {"error": "unavailable"})
+            return
+        if fault == "corrupt" or hashlib.sha256(body).hexdigest() != self.headers.get("X-Part-SHA256"):
+            self._json(422, {"error": "checksum mismatch"})
+            return
+        with self.server.lock:
+            session["parts"][index] = body
+        self._json(200, {"received": index})
+
+    def do_POST(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            self.server.chunked_uploads += 1
+        body = _read_body(self)
+        if not self._authorized():
+            return
+        path = urlsplit(self.path).path
+        with self.server.lock:
+            self.server.post_requests.append(path.rsplit("/", 1)[1])
+        if path.endswith("/uploads"):
+            upload_id = f"up-{next(self.server._ids)}"
+            self.server.sessions[upload_id] = {"meta": json.loads(body), "parts": {}}
+            self._json(200, self.server.create_reply or {"upload_id": upload_id})
+            return
+        if path.endswith("/complete"):
+            if self.server.complete_faults:
+                self._json(self.server.complete_faults.pop(0), {"error": "unavailable"})
+                return
+            upload_id = path.split("/uploads/", 1)[1].split("/", 1)[0]
+            session = self.server.sessions.get(upload_id)
+            if session is None:
+                self._json(404, {"error": "unknown upload"})
+                return
+            meta = session["meta"]
+            if sorted(session["parts"]) != list(range(meta["parts"])):
+                self._json(400, {"error": "missing parts"})
+                return
+            archive = b"".join(session["parts"][i] for i in range(meta["parts"]))
+            if hashlib.sha256(archive).hexdigest() != meta["sha256"]:
+                self._json(400, {"error": "archive checksum mismatch"})
+                return
+            del self.server.sessions[upload_id]
+            form = {k: str(v).encode() for k, v in meta.items()}
+            form["bundle"] = archive
+            self._apply_bundle(form)
+            return
+        if not path.endswith("/bundle"):
+            self._json(404, {"error": "not found"})
+            return
+        self._apply_bundle(parse_multipart(body, self.headers["Content-Type"]))
+
+    def _apply_bundle(self, form: dict[str, bytes]) -> None:
+        target = form["target_folder"].decode()
+        with zipfile.ZipFile(io.BytesIO(form["bundle"])) as zf:
+            extracted = {name: zf.read(name) for name in zf.namelist()}
+            methods = {info.filename: info.compress_type for info in zf.infolist()}
+        stored = self.server.files.setdefault(target, {})
+        stored.update(extracted)
+        deleted = []
+        if form.get("mode") == b"delta":
+            deleted = json.loads(form["deleted"])
+            for name in deleted:
+                stored.pop(name, None)
+        if "manifest" in form:
+            self.server.manifests[target] = json.loads(form["manifest"])
+        self.server.uploads.append(
+            {
+                "target": target,
+                "names": sorted(extracted),
+                "methods": methods,
+                "deleted": deleted,
+                "mode": form.get("mode", b"full").decode(),
+            }
+        )
+        self._json(200, {"uploaded": len(extracted), "deleted": len(deleted), "failed": []})
@@ -0,0 +1,159 @@
+"""Tests for the deploy weight report and size budgets (run: npm run test:deploy)."""
+import io
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import asset_weights  # noqa: E402
+import deploy  # noqa: E402
+from fake_deploy_server import FakeDeployServer  # noqa: E402
+
+INDEX_HTML = b"""<!doctype html><html><head>
+<script type="module" crossorigin src="./assets/index-abc123.js"></script>
+<link rel="modulepreload" crossorigin href="./assets/vendor-def456.js">
+</head><body><canvas id="gameCanvas"></canvas></body></html>"""
+
+
+class AssetWeightsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.build = Path(self.tmp.name) / "dist"
+        self.cache_dir = Path(self.tmp.name) / "cache"
+        files = {
+            "index.html": INDEX_HTML,
+            "assets/index-abc123.js": b"export const lanes = [0, 1, 2, 3];\n" * 1000,
+            "assets/vendor-def456.js": b"export const v = 1;\n" * 200,
+            "assets/lazy-999.js": b"export const later = true;\n" * 500,
+            "assets/release-777.wasm": bytes(range(128)) * 100,
+            "assets/background-111.png": bytes((i * 7919) % 256 for i in range(20000)),
+            "icons/icon-192.png": b"\x89PNG" + b"\0" * 100,
+        }
+        for rel, data in files.items():
+            path = self.build / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        self.files = list(deploy.iter_build_files(self.build))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _report(self, budgets=None, zipped=None):
+        weights = asset_weights.measure_assets(self.files, zipped, workers=2)
+        return asset_weights.evaluate(self.build, weights, budgets)
+
+    def test_entry_modules_come_from_index_html(self):
+        self.assertEqual(
+            asset_weights.entry_modules(self.build), ["assets/index-abc123.js", "assets/vendor-def456.js"]
+        )
+
+    def test_groups_and_critical_path(self):
+        report = self._report()
+        self.assertEqual(report["groups"]["js"]["files"], 3)
+        self.assertEqual(report["groups"]["icons"]["files"], 1)
+        self.assertEqual(report["groups"]["background"]["files"], 1)
+        self.assertEqual(
+            sorted(report["critical_path"]["files"]),
+            ["assets/index-abc123.js", "assets/release-777.wasm", "assets/vendor-def456.js", "index.html"],
+        )
+        entry = next(f for f in report["files"] if f["path"] == "assets/index-abc123.js")
+        self.assertLess(entry["deflate"], entry["raw"])
+        self.assertEqual(report["violations"], [])
+
+    def test_zip_pass_sizes_are_reused(self):
+        report = self._report(zipped={"assets/index-abc123.js": 1234})
+        entry = next(f for f in report["files"] if f["path"] == "assets/index-abc123.js")
+        self.assertEqual(entry["deflate"], 1234)
+
+    def test_precompressed_siblings_are_not_weighed_separately(self):
+        sibling = self.build / "assets" / "index-abc123.js.br"
+        sibling.write_bytes(b"b" * 321)
+        files = list(deploy.iter_build_files(self.build))
+        weights = {w.path: w for w in asset_weights.measure_assets(files)}
+        self.assertNotIn("assets/index-abc123.js.br", weights)
+        self.assertEqual(weights["assets/index-abc123.js"].brotli, 321)
+
+    def test_critical_path_budget_violation(self):
+        budgets = {"critical_path": {"max_deflate_kb": 0.5}, "groups": asset_weights.DEFAULT_GROUPS}
+        (violation,) = self._report(budgets)["violations"]
+        self.assertEqual((violation["scope"], violation["metric"]), ("critical path", "deflate"))
+
+    def _config(self, server, **overrides):
+        return {
+            "project_name": "cave-crystals",
+            "deploy_folder": "",
+            "contabo_base_url": server.url,
+            "deploy_token": server.token,
+            "compress_workers": 2,
+            "cache_dir": str(self.cache_dir),
+            **overrides,
+        }
+
+    def _tight_budget(self):
+        budget_file = Path(self.tmp.name) / "budgets.json"
+        budget_file.write_text(json.dumps({"critical_path": {"max_raw_kb": 1}}))
+        return str(budget_file)
+
+    def test_deploy_is_blocked_before_upload_when_enforced(self):
+        budget_file = self._tight_budget()
+        with FakeDeployServer() as server:
+            for mode in ({}, {"chunked": True, "part_size": 4096, "upload_workers": 2,
+                              "retries": 0, "retry_base_delay": 0}):
+                with self.subTest(mode=mode):
+                    config = self._config(server, budget_file=budget_file, enforce_budgets=True, **mode)
+                    with redirect_stdout(io.StringIO()) as out:
+                        self.assertFalse(deploy.deploy_bundle(self.build, config))
+                    self.assertIn("BUDGET EXCEEDED — critical path: raw", out.getvalue())
+            config = self._config(server, budget_file=budget_file, enforce_budgets=True, stream=True)
+            with redirect_stdout(io.StringIO()) as out:
+                self.assertFalse(deploy.deploy_bundle(self.build, config))
+            self.assertIn("cannot stop it", out.getvalue())
+            self.assertEqual(server.uploads, [])
+            self.assertEqual(server.sessions, {})
+
+    def test_budgets_only_warn_by_default(self):
+        with FakeDeployServer() as server:
+            config = self._config(server, budget_file=self._tight_budget())
+            with redirect_stdout(io.StringIO()) as out:
+                self.assertTrue(deploy.deploy_bundle(self.build, config))
+        self.assertIn("BUDGET EXCEEDED — critical path: raw", out.getvalue())
+        self.assertIn("WARNING: Size budget exceeded", out.getvalue())
+        self.assertEqual(len(server.uploads), 1)
+
+    def test_stream_mode_reports_sizes_from_the_zip_pass(self):
+        seen = []
+        original = asset_weights.measure_assets
+
+        def measure(files, zipped=None, workers=1):
+            seen.append(dict(zipped or {}))
+            return original(files, zipped, workers)
+
+        with FakeDeployServer() as server, mock.patch.object(asset_weights, "measure_assets", measure):
+            config = self._config(server, budget_file=str(REPO_ROOT / "deploy-budgets.json"), stream=True)
+            with redirect_stdout(io.StringIO()) as out:
+                self.assertTrue(deploy.deploy_bundle(self.build, config))
+        (zipped,) = seen
+        self.assertEqual(set(zipped), {rel.as_posix() for _file, rel in self.files})
+        self.assertLess(out.getvalue().index("streamed in"), out.getvalue().index("Asset weights:"))
+
+    def test_deploy_prints_report_and_change_since_previous(self):
+        with FakeDeployServer() as server:
+            config = self._config(server, budget_file=str(REPO_ROOT / "deploy-budgets.json"))
+            with redirect_stdout(io.StringIO()):
+                self.assertTrue(deploy.deploy_bundle(self.build, config))
+            (self.build / "assets" / "index-abc123.js").write_bytes(b"export const lanes = [];\n" * 3000)
+            with redirect_stdout(io.StringIO()) as out:
+                self.assertTrue(deploy.deploy_bundle(self.build, config))
+        self.assertIn("[js] 3 file(s)", out.getvalue())
+        self.assertIn("since the previous report: raw +", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""Tests for deploy.py's resumable chunked uploads (run: npm run test:deploy)."""
+import io
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import deploy  # noqa: E402
+from fake_deploy_server import FakeDeployServer  # noqa: E402
+from test_stream import make_build  # noqa: E402
+
+
+class RetryDelayTest(unittest.TestCase):
+    def test_grows_exponentially_with_jitter_and_cap(self):
+        for attempt in range(12):
+            delay = deploy.retry_delay(attempt, 0.5)
+            ceiling = min(deploy.MAX_RETRY_DELAY, 0.5 * 2 ** attempt)
+            self.assertGreaterEqual(delay, ceiling / 2)
+            self.assertLessEqual(delay, ceiling)
+
+
+class ChunkedUploadTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.build = root / "dist"
+        self.build.mkdir()
+        self.files = make_build(self.build)
+        self.cache_dir = root / "cache"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _deploy(self, server, **overrides):
+        config = {
+            "project_name": "cave-crystals",
+            "deploy_folder": "",
+            "contabo_base_url": server.url,
+            "deploy_token": server.token,
+            "compress_workers": 2,
+            "cache_dir": str(self.cache_dir),
+            "chunked": True,
+            "part_size": 4096,
+            "upload_workers": 3,
+            "retries": 3,
+            "retry_base_delay": 0.001,
+            **overrides,
+        }
+        with redirect_stdout(io.StringIO()) as out:
+            ok = deploy.deploy_bundle(self.build, config)
+        return ok, out.getvalue()
+
+    def test_transient_part_failures_are_retried(self):
+        with FakeDeployServer() as server:
+            server.part_faults = {1: ["503", "drop"]}
+            ok, out = self._deploy(server)
+        self.assertTrue(ok, out)
+        self.assertEqual(server.files["cave-crystals"], self.files)
+        self.assertEqual(server.part_requests.count(1), 3)
+        self.assertEqual(server.post_requests, ["uploads", "complete"])
+        self.assertFalse(list(self.cache_dir.glob("*.upload.*")))
+
+    def test_checksum_mismatch_is_not_retried(self):
+        with FakeDeployServer() as server:
+            server.part_faults = {2: ["corrupt"]}
+            ok, out = self._deploy(server)
+            self.assertFalse(ok)
+            self.assertIn("part 2 rejected with HTTP 422", out)
+            self.assertEqual(server.part_requests.count(2), 1)
+            ok, out = self._deploy(server)
+        self.assertTrue(ok, out)
+        self.assertEqual(server.files["cave-crystals"], self.files)
+
+    def test_complete_is_sent_once(self):
+        with FakeDeployServer() as server:
+            server.complete_faults = [503]
+            ok, out = self._deploy(server)
+            self.assertFalse(ok)
+            self.assertEqual(server.post_requests, ["uploads", "complete"])
+            server.part_requests.clear()
+            ok, out = self._deploy(server)
+        self.assertTrue(ok, out)
+        self.assertIn("Resuming upload", out)
+        self.assertEqual(server.part_requests, [])
+        self.assertEqual(server.files["cave-crystals"], self.files)
+
+    def test_malformed_create_response_is_a_clear_error(self):
+        with FakeDeployServer() as server:
+            server.create_reply = {"id": "up-1"}
+            ok, out = self._deploy(server)
+        self.assertFalse(ok)
+        self.assertIn("answered without an upload_id", out)
+        self.assertEqual(server.post_requests, ["uploads"])
+        self.assertEqual(server.part_requests, [])
+
+    def test_rerun_resumes_missing_parts_only(self):
+        with FakeDeployServer() as server:
+            server.part_faults = {3: ["down"]}
+            ok, out = self._deploy(server, retries=1)
+            self.assertFalse(ok)
+            self.assertIn("Rerun deploy.py to resume", out)
+            self.assertTrue(list(self.cache_dir.glob("*.upload.json")))
+            (session,) = server.sessions.values()
+            already_sent = set(session["parts"])
+            self.assertNotIn(3, already_sent)
+
+            server.part_faults = {}
+            server.part_requests.clear()
+            ok, out = self._deploy(server)
+        self.assertTrue(ok, out)
+        self.assertIn("Resuming upload", out)
+        self.assertIn(3, server.part_requests)
+        self.assertFalse(already_sent & set(server.part_requests))
+        self.assertEqual(server.files["cave-crystals"], self.files)
+
+    def test_unreadable_resume_status_starts_a_new_upload(self):
+        with FakeDeployServer() as server:
+            server.part_faults = {0: ["down"]}
+            self.assertFalse(self._deploy(server, retries=0)[0])
+            server.part_faults = {}
+            server.status_reply = b"<html>502 Bad Gateway</html>"
+            ok, out = self._deploy(server)
+        self.assertTrue(ok, out)
+        self.assertNotIn("Resuming upload", out)
+        self.assertEqual(server.post_requests, ["uploads", "uploads", "complete"])
+        self.assertEqual(server.files["cave-crystals"], self.files)
+
+    def test_changed_build_starts_a_new_upload(self):
+        with FakeDeployServer() as server:
+            server.part_faults = {0: ["down"]}
+            self.assertFalse(self._deploy(server, retries=0)[0])
+            server.part_faults = {}
+            (self.build / "index.html").write_bytes(b"<!doctype html>changed")
+            self.files["index.html"] = b"<!doctype html>changed"
+            ok, out = self._deploy(server)
+        self.assertTrue(ok, out)
+        self.assertNotIn("Resuming upload", out)
+        self.assertEqual(server.files["cave-crystals"], self.files)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Tests for deploy.py's content-addressed delta mode (run: npm run test:deploy)."""
+import io
+import json
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import deploy  # noqa: E402
+from fake_deploy_server import FakeDeployServer  # noqa: E402
+from test_stream import make_build  # noqa: E402
+
+
+class DiffManifestsTest(unittest.TestCase):
+    def test_reports_new_changed_and_deleted_paths(self):
+        previous = {"a.js": "1", "b.wasm": "2", "gone.png": "3"}
+        current = {"a.js": "1", "b.wasm": "9", "new.js": "4"}
+        self.assertEqual(deploy.diff_manifests(previous, current), (["b.wasm", "new.js"], ["gone.png"]))
+
+    def test_empty_previous_uploads_everything(self):
+        self.assertEqual(deploy.diff_manifests({}, {"x": "1", "a": "2"}), (["a", "x"], []))
+
+
+class DeltaDeployTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self._use_workspace("default")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _use_workspace(self, name):
+        root = Path(self.tmp.name) / name
+        self.build = root / "dist"
+        self.build.mkdir(parents=True)
+        self.files = make_build(self.build)
+        self.cache_dir = root / "cache"
+
+    def _deploy(self, server, **overrides):
+        config = {
+            "project_name": "cave-crystals",
+            "deploy_folder": "",
+            "contabo_base_url": server.url,
+            "deploy_token": server.token,
+            "stream": False,
+            "compress_workers": 2,
+            "delta": True,
+            "cache_dir": str(self.cache_dir),
+            **overrides,
+        }
+        with redirect_stdout(io.StringIO()) as out:
+            ok = deploy.deploy_bundle(self.build, config)
+        self.assertTrue(ok, out.getvalue())
+        return out.getvalue()
+
+    def _change_build(self):
+        (self.build / "assets" / "index-abc123.js").unlink()
+        (self.build / "assets" / "index-def456.js").write_bytes(b"export const crystals = [1];\n")
+        (self.build / "index.html").write_bytes(b"<!doctype html><script src=assets/index-def456.js>")
+        expected = dict(self.files)
+        del expected["assets/index-abc123.js"]
+        expected["assets/index-def456.js"] = b"export const crystals = [1];\n"
+        expected["index.html"] = b"<!doctype html><script src=assets/index-def456.js>"
+        return expected
+
+    def test_second_deploy_ships_only_changes(self):
+        for stream in (False, True):
+            with self.subTest(stream=stream), FakeDeployServer() as server:
+                self._use_workspace(f"stream-{stream}")
+                self._deploy(server, stream=stream)
+                self.assertEqual(server.uploads[0]["names"], sorted(self.files))
+
+                expected = self._change_build()
+                out = self._deploy(server, stream=stream)
+                self.assertIn("server manifest", out)
+                self.assertEqual(server.uploads[1]["mode"], "delta")
+                self.assertEqual(server.uploads[1]["names"], ["assets/index-def456.js", "index.html"])
+                self.assertEqual(server.uploads[1]["deleted"], ["assets/index-abc123.js"])
+                self.assertEqual(server.files["cave-crystals"], expected)
+
+    def test_unchanged_build_skips_upload(self):
+        with FakeDeployServer() as server:
+            self._deploy(server)
+            out = self._deploy(server)
+        self.assertEqual(len(server.uploads), 1)
+        self.assertIn("Nothing to deploy", out)
+
+    def test_local_manifest_cache_forces_a_full_upload(self):
+        with FakeDeployServer(serve_manifest=False) as server:
+            self._deploy(server)
+            cached = json.loads(next(self.cache_dir.glob("*.manifest.json")).read_text())
+            self.assertEqual(set(cached["files"]), set(self.files))
+
+            expected = self._change_build()
+            out = self._deploy(server)
+        self.assertIn("previous manifest is from the local cache", out)
+        self.assertEqual(server.uploads[1]["mode"], "full")
+        self.assertEqual(server.uploads[1]["names"], sorted(expected))
+        self.assertEqual(server.uploads[1]["deleted"], [])
+
+    def test_unchanged_build_with_only_a_local_cache_still_uploads(self):
+        with FakeDeployServer(serve_manifest=False) as server:
+            self._deploy(server)
+            self._deploy(server)
+        self.assertEqual(len(server.uploads), 2)
+        self.assertEqual(server.uploads[1]["mode"], "full")
+
+
+if __name__ == "__main__":
+    unittest.main()
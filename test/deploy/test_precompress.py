@@ -0,0 +1,105 @@
+"""Tests for precompress.py (run: npm run test:deploy)."""
+import gzip
+import io
+import json
+import random
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import deploy  # noqa: E402
+import precompress  # noqa: E402
+from fake_deploy_server import FakeDeployServer  # noqa: E402
+
+
+class PrecompressTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        self.build = root / "dist"
+        self.state_dir = root / "state"
+        (self.build / "assets").mkdir(parents=True)
+        self.js = b"export function spawnCrystal(lane) { return lane * 2; }\n" * 300
+        self.sources = {
+            "index.html": b"<!doctype html><canvas id=gameCanvas></canvas>\n" * 40,
+            "assets/index-abc123.js": self.js,
+            "assets/release.wasm": bytes(range(64)) * 200,
+            "assets/noise.js": random.Random(7).randbytes(4096),
+        }
+        for rel, data in self.sources.items():
+            (self.build / rel).write_bytes(data)
+        (self.build / "tiny.js").write_bytes(b"x=1")
+        (self.build / "icon.png").write_bytes(b"\x89PNG" + b"\0" * 4096)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, **kwargs):
+        return precompress.precompress(self.build, state_dir=self.state_dir, verbose=False, **kwargs)
+
+    def test_writes_smaller_siblings_for_compressible_files(self):
+        results = {r.path: r for r in self._run(workers=2)}
+        self.assertEqual(set(results), set(self.sources))
+        gz = self.build / "assets" / "index-abc123.js.gz"
+        self.assertEqual(gzip.decompress(gz.read_bytes()), self.js)
+        self.assertEqual(results["assets/index-abc123.js"].outputs["gzip"], gz.stat().st_size)
+        # Random bytes do not compress, so no sibling is kept for them.
+        self.assertEqual(results["assets/noise.js"].outputs, {})
+        self.assertFalse((self.build / "assets" / "noise.js.gz").exists())
+        self.assertFalse((self.build / "tiny.js.gz").exists())
+        self.assertFalse((self.build / "icon.png.gz").exists())
+        if precompress.brotli is not None:
+            br = self.build / "assets" / "index-abc123.js.br"
+            self.assertEqual(precompress.brotli.decompress(br.read_bytes()), self.js)
+
+    def test_parallel_output_matches_serial(self):
+        self._run(workers=1)
+        serial = (self.build / "assets" / "release.wasm.gz").read_bytes()
+        (self.build / "assets" / "release.wasm.gz").unlink()
+        self._run(workers=3)
+        self.assertEqual((self.build / "assets" / "release.wasm.gz").read_bytes(), serial)
+
+    def test_rerun_skips_unchanged_files_and_writes_report(self):
+        self._run()
+        (self.build / "index.html").write_bytes(b"<!doctype html><p>changed</p>\n" * 40)
+        results = {r.path: r for r in self._run()}
+        self.assertFalse(results["index.html"].skipped)
+        self.assertTrue(all(r.skipped for path, r in results.items() if path != "index.html"))
+
+        report = json.loads((self.state_dir / "precompress-report.json").read_text())
+        self.assertEqual(report["compressed"], 1)
+        self.assertEqual(report["skipped"], len(self.sources) - 1)
+        self.assertLess(report["totals"]["gzip"], report["totals"]["size"])
+
+    def test_missing_sibling_is_regenerated(self):
+        self._run()
+        (self.build / "assets" / "index-abc123.js.gz").unlink()
+        results = {r.path: r for r in self._run()}
+        self.assertFalse(results["assets/index-abc123.js"].skipped)
+        self.assertTrue((self.build / "assets" / "index-abc123.js.gz").is_file())
+
+    def test_deploy_uploads_siblings_when_enabled(self):
+        with FakeDeployServer() as server:
+            config = {
+                "project_name": "cave-crystals",
+                "deploy_folder": "",
+                "contabo_base_url": server.url,
+                "deploy_token": server.token,
+                "compress_workers": 2,
+                "cache_dir": str(self.state_dir),
+                "precompress": True,
+            }
+            with redirect_stdout(io.StringIO()):
+                self.assertTrue(deploy.deploy_bundle(self.build, config))
+        uploaded = server.files["cave-crystals"]
+        self.assertEqual(gzip.decompress(uploaded["assets/index-abc123.js.gz"]), self.js)
+
+
+if __name__ == "__main__":
+    unittest.main()
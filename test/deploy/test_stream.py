@@ -0,0 +1,83 @@
+"""Tests for deploy.py's streaming archive mode (run: npm run test:deploy)."""
+import io
+import sys
+import tempfile
+import unittest
+import zipfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+import deploy  # noqa: E402
+from fake_deploy_server import FakeDeployServer  # noqa: E402
+
+
+def make_build(root: Path) -> dict[str, bytes]:
+    files = {
+        "index.html": b"<!doctype html><canvas id=gameCanvas></canvas>" * 50,
+        "assets/index-abc123.js": b"export const crystals = [];\n" * 2000,
+        "assets/release.wasm": bytes(range(256)) * 64,
+        "assets/background.png": bytes((i * 7919) % 256 for i in range(40000)),
+        "icons/icon-192.png": b"\x89PNG" + b"\x00" * 10,
+        "empty.txt": b"",
+    }
+    for rel, data in files.items():
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "skip.js").write_bytes(b"skip")
+    return files
+
+
+class StreamZipTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.build = Path(self.tmp.name) / "dist"
+        self.build.mkdir()
+        self.files = make_build(self.build)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _stream(self, workers):
+        with redirect_stdout(io.StringIO()):
+            return b"".join(deploy.stream_zip(self.build, workers))
+
+    def test_streamed_archive_round_trips(self):
+        for workers in (1, 4):
+            with self.subTest(workers=workers):
+                with zipfile.ZipFile(io.BytesIO(self._stream(workers))) as zf:
+                    self.assertIsNone(zf.testzip())
+                    self.assertEqual({n: zf.read(n) for n in zf.namelist()}, self.files)
+
+    def test_incompressible_types_are_stored(self):
+        with zipfile.ZipFile(io.BytesIO(self._stream(2))) as zf:
+            methods = {info.filename: info.compress_type for info in zf.infolist()}
+        self.assertEqual(methods["assets/background.png"], zipfile.ZIP_STORED)
+        self.assertEqual(methods["assets/index-abc123.js"], zipfile.ZIP_DEFLATED)
+        self.assertEqual(methods["assets/release.wasm"], zipfile.ZIP_DEFLATED)
+
+    def test_streaming_upload_to_stub(self):
+        with FakeDeployServer() as server:
+            config = {
+                "project_name": "cave-crystals",
+                "deploy_folder": "",
+                "contabo_base_url": server.url,
+                "deploy_token": server.token,
+                "stream": True,
+                "compress_workers": 3,
+                "cache_dir": str(Path(self.tmp.name) / "cache"),
+            }
+            with redirect_stdout(io.StringIO()) as out:
+                self.assertTrue(deploy.deploy_bundle(self.build, config))
+        self.assertEqual(server.chunked_uploads, 1)
+        self.assertEqual(server.files["cave-crystals"], self.files)
+        self.assertIn("MB/s", out.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
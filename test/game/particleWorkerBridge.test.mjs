@@ -1,7 +1,7 @@
 import assert from 'node:assert/strict';
 import { describe, it } from 'node:test';
 
-import { ParticleWorkerBridge } from '../../src/modules/ParticleWorkerBridge.js';
+import { ParticleWorkerBridge, getForcedIntegratorPath } from '../../src/modules/ParticleWorkerBridge.js';
 import { WORKER_MIN_PARTICLES } from '../../src/modules/particleBatchCodec.js';
 
 describe('ParticleWorkerBridge', () => {
@@ -63,6 +63,105 @@ describe('ParticleWorkerBridge', () => {
         assert.equal(canUseLow, false);
     });
 
+    it('honours a forced integrator path regardless of batch thresholds', () => {
+        const bridge = new ParticleWorkerBridge();
+        bridge.enabled = true;
+        bridge.ready = true;
+        let posted = 0;
+        bridge.worker = { postMessage() { posted++; } };
+
+        /** @type {number[]} */
+        const minBatches = [];
+        const trail = { update() {} };
+        const params = {
+            trailBatch: [trail],
+            trailCount: 1,
+            dustParticles: [],
+            ambientBatch: [],
+            ambientCount: 0,
+            timeScale: 1,
+            rw: 800,
+            rh: 600,
+            renderQuality: 'high',
+            wasmManager: {
+                batchIntegrateTrailParticles(_batch, _count, _ts, _rw, _rh, minBatch) {
+                    minBatches.push(minBatch);
+                    return true;
+                },
+                batchIntegrateAmbientParticles() {
+                    return false;
+                },
+            },
+        };
+
+        const hadKey = Object.prototype.hasOwnProperty.call(globalThis, '__PARTICLE_INTEGRATOR__');
+        const prev = globalThis.__PARTICLE_INTEGRATOR__;
+        try {
+            globalThis.__PARTICLE_INTEGRATOR__ = 'worker';
+            assert.equal(getForcedIntegratorPath(), 'worker');
+            assert.equal(bridge.scheduleVisualIntegration(params).usedWorker, true);
+            assert.equal(posted, 1);
+
+            globalThis.__PARTICLE_INTEGRATOR__ = 'wasm';
+            assert.equal(bridge.scheduleVisualIntegration(params).usedWorker, false);
+            assert.deepEqual(minBatches, [1]);
+            assert.equal(bridge.getStatus().mainWasm, true);
+
+            globalThis.__PARTICLE_INTEGRATOR__ = 'js';
+            bridge.scheduleVisualIntegration(params);
+            assert.deepEqual(minBatches, [1]);
+            assert.equal(bridge.getStatus().mainWasm, false);
+
+            globalThis.__PARTICLE_INTEGRATOR__ = 'gpu';
+            assert.equal(getForcedIntegratorPath(), null);
+        } finally {
+            if (hadKey) {
+                globalThis.__PARTICLE_INTEGRATOR__ = prev;
+            } else {
+                delete globalThis.__PARTICLE_INTEGRATOR__;
+            }
+        }
+    });
+
+    it('drops worker results discarded before they are applied', () => {
+        const bridge = new ParticleWorkerBridge();
+        bridge.worker = { postMessage() {} };
+        const trail = { x: 10, y: 20, vx: 1, vy: 0, life: 1, size: 3 };
+        const payload = {
+            trailBatch: [trail],
+            trailCount: 1,
+            dustParticles: [],
+            dustCount: 0,
+            ambientBatch: [],
+            ambientCount: 0,
+            timeScale: 1,
+            rw: 800,
+            rh: 600,
+        };
+        const reply = (frameId) => ({
+            data: {
+                type: 'integrated',
+                frameId,
+                trail: { buffer: new Float64Array([99, 99, 1, 0, 0.5, 3]).buffer, count: 1 },
+            },
+        });
+
+        // Discarded while in flight: the late reply matches no pending frame.
+        assert.equal(bridge._postToWorker(payload), true);
+        bridge.discardPending();
+        bridge._onWorkerMessage(reply(bridge.frameId));
+        bridge.flush();
+        assert.equal(trail.x, 10);
+        assert.equal(bridge.inFlight, 0);
+
+        // Discarded after the reply arrived but before the next frame applied it.
+        assert.equal(bridge._postToWorker(payload), true);
+        bridge._onWorkerMessage(reply(bridge.frameId));
+        bridge.discardPending();
+        bridge.flush();
+        assert.equal(trail.x, 10);
+    });
+
     it('is disabled when __PARTICLE_WORKER__ is false', () => {
         const bridge = new ParticleWorkerBridge();
         const hadKey = Object.prototype.hasOwnProperty.call(globalThis, '__PARTICLE_WORKER__');
@@ -0,0 +1,100 @@
+"""Tests for scripts/generate-pwa-icons.py (run: npm run test:scripts)."""
+import importlib.util
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from PIL import Image
+
+SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "generate-pwa-icons.py"
+spec = importlib.util.spec_from_file_location("generate_pwa_icons", SCRIPT)
+icons = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = icons
+spec.loader.exec_module(icons)
+
+TARGETS = [
+    icons.IconTarget("icon-64.png", 64, 64, "any"),
+    icons.IconTarget("maskable-64.png", 64, 64, "maskable"),
+    icons.IconTarget("monochrome-64.png", 64, 64, "monochrome"),
+    icons.IconTarget("splash-60x120.png", 60, 120, "splash"),
+]
+
+
+class GenerateIconsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = Path(self.tmp.name) / "icons"
+        patcher = mock.patch.object(icons, "CACHE_FILE", Path(self.tmp.name) / "cache.json")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # A small master keeps the test fast; downsampling still applies.
+        master = mock.patch.object(icons, "MASTER_SIZE", 256)
+        master.start()
+        self.addCleanup(master.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_renders_every_variant_at_its_size(self):
+        written, skipped = icons.generate(TARGETS, self.out, workers=2)
+        self.assertEqual(skipped, [])
+        self.assertEqual(len(written), len(TARGETS))
+        for target in TARGETS:
+            with Image.open(self.out / target.name) as img:
+                self.assertEqual(img.size, (target.width, target.height))
+                corner = img.convert("RGBA").getpixel((0, 0))
+            if target.variant == "monochrome":
+                self.assertEqual(corner[3], 0)
+            else:
+                self.assertEqual(corner, icons.BG + (255,))
+
+    def test_monochrome_is_white_with_alpha(self):
+        icons.generate(TARGETS[2:3], self.out, workers=1)
+        with Image.open(self.out / "monochrome-64.png") as img:
+            colors = {(r, g, b) for r, g, b, a in img.convert("RGBA").getdata() if a}
+        self.assertEqual(colors, {(255, 255, 255)})
+
+    def test_downsampled_edges_are_antialiased(self):
+        icons.generate(TARGETS[:1], self.out, workers=1)
+        with Image.open(self.out / "icon-64.png") as img:
+            colors = len(set(img.convert("RGB").getdata()))
+        # Hard-edged polygons would give only a handful of colours.
+        self.assertGreater(colors, 20)
+
+    def test_unchanged_targets_are_skipped(self):
+        icons.generate(TARGETS, self.out, workers=1)
+        written, skipped = icons.generate(TARGETS, self.out, workers=1)
+        self.assertEqual((written, skipped), ([], [t.name for t in TARGETS]))
+
+        (self.out / "icon-64.png").unlink()
+        written, _skipped = icons.generate(TARGETS, self.out, workers=1)
+        self.assertEqual(written, [str(self.out / "icon-64.png")])
+
+        written, _skipped = icons.generate(TARGETS, self.out, optimize=True, workers=1)
+        self.assertEqual(len(written), len(TARGETS))
+
+    def test_optimize_quantizes_and_webp_is_written(self):
+        icons.generate(TARGETS[:1], self.out, optimize=True, webp=True, workers=1)
+        with Image.open(self.out / "icon-64.png") as img:
+            self.assertEqual(img.mode, "P")
+        with Image.open(self.out / "icon-64.webp") as img:
+            self.assertEqual(img.size, (64, 64))
+
+    def test_stale_webp_is_removed_without_webp(self):
+        icons.generate(TARGETS[:1], self.out, webp=True, workers=1)
+        icons.generate(TARGETS[:1], self.out, workers=1)
+        self.assertTrue((self.out / "icon-64.png").is_file())
+        self.assertFalse((self.out / "icon-64.webp").exists())
+
+    def test_optimize_shrinks_png_output(self):
+        target = icons.IconTarget("icon-256.png", 256, 256, "any")
+        plain, optimized = self.out / "plain", self.out / "optimized"
+        icons.generate([target], plain, workers=1)
+        icons.generate([target], optimized, optimize=True, workers=1)
+        self.assertLess((optimized / target.name).stat().st_size, (plain / target.name).stat().st_size / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
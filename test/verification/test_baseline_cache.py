@@ -0,0 +1,80 @@
+"""Tests for the decoded-baseline cache (run: npm run test:verification)."""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import baseline_cache  # noqa: E402
+from visual_diff import compare_images  # noqa: E402
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # pragma: no cover
+    np = None
+    Image = None
+
+
+@unittest.skipUnless(baseline_cache.cache_available(), "Pillow and NumPy are required")
+class BaselineCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.cache_dir = self.dir / "cache"
+        self.baseline = self.dir / "shot.png"
+        Image.effect_noise((40, 30), 50).convert("RGB").save(self.baseline)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cached_pixels_match_decode(self):
+        cached = baseline_cache.load_baseline_array(self.baseline, self.cache_dir)
+        with Image.open(self.baseline) as img:
+            decoded = np.asarray(img.convert("RGB"))
+        self.assertIsInstance(cached, np.memmap)
+        self.assertTrue(np.array_equal(cached, decoded))
+
+    def test_hit_skips_png_decode(self):
+        baseline_cache.load_baseline_array(self.baseline, self.cache_dir)
+        original = baseline_cache.Image.open
+        baseline_cache.Image.open = lambda *a, **k: self.fail("cache hit decoded the PNG")
+        try:
+            baseline_cache.load_baseline_array(self.baseline, self.cache_dir)
+        finally:
+            baseline_cache.Image.open = original
+
+    def test_changed_baseline_evicts_stale_entry(self):
+        baseline_cache.load_baseline_array(self.baseline, self.cache_dir)
+        Image.new("RGB", (40, 30), (255, 0, 0)).save(self.baseline)
+        refreshed = baseline_cache.load_baseline_array(self.baseline, self.cache_dir)
+        self.assertEqual(len(list(self.cache_dir.glob("*.npy"))), 1)
+        self.assertEqual(tuple(refreshed[0, 0]), (255, 0, 0))
+
+    def test_prune_drops_deleted_baselines(self):
+        other = self.dir / "other.png"
+        Image.new("RGB", (8, 8)).save(other)
+        baseline_cache.load_baseline_array(self.baseline, self.cache_dir)
+        baseline_cache.load_baseline_array(other, self.cache_dir)
+        removed = baseline_cache.prune([self.baseline], self.cache_dir)
+        self.assertEqual(removed, 1)
+        self.assertEqual(len(list(self.cache_dir.glob("shot.png.*.npy"))), 1)
+
+    def test_compare_with_cache_matches_uncached(self):
+        actual = self.dir / "actual.png"
+        Image.effect_noise((40, 30), 50).convert("RGB").save(actual)
+        original_dir = baseline_cache.BASELINE_CACHE_DIR
+        baseline_cache.BASELINE_CACHE_DIR = self.cache_dir
+        try:
+            uncached = compare_images(self.baseline, actual)
+            cached = compare_images(self.baseline, actual, baseline_cache=True)
+        finally:
+            baseline_cache.BASELINE_CACHE_DIR = original_dir
+        self.assertEqual(uncached.diff_ratio, cached.diff_ratio)
+        self.assertEqual(len(list(self.cache_dir.glob("*.npy"))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
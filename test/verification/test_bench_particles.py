@@ -0,0 +1,81 @@
+"""Tests for the particle integration benchmark's analysis (run: npm run test:verification)."""
+import sys
+import unittest
+from pathlib import Path
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import bench_particles  # noqa: E402
+
+
+def point(ms, hit=1.0):
+    return {"hit": hit, "main_p50_ms": ms}
+
+
+class PopulationTest(unittest.TestCase):
+    def test_split_keeps_the_total(self):
+        self.assertEqual(bench_particles.split_population("trail", 48), (48, 0, 0))
+        self.assertEqual(bench_particles.split_population("dust", 30), (0, 0, 30))
+        for count in (8, 33, 101, 1024):
+            with self.subTest(count=count):
+                self.assertEqual(sum(bench_particles.split_population("mixed", count)), count)
+
+    def test_sweeps_go_past_each_batch_capacity(self):
+        counts = list(bench_particles.DEFAULT_COUNTS)
+        self.assertGreater(max(bench_particles.counts_for("trail", counts)), bench_particles.TRAIL_BATCH_MAX)
+        self.assertGreater(max(bench_particles.counts_for("ambient", counts)), bench_particles.SIMPLE_BATCH_MAX)
+        self.assertGreater(max(bench_particles.counts_for("dust", counts)), bench_particles.DUST_BATCH_MAX)
+        self.assertNotIn("wasm", bench_particles.paths_for("dust"))
+
+
+class SummaryTest(unittest.TestCase):
+    def test_frames_on_another_route_are_excluded(self):
+        outcome = {
+            "rows": [[0.2, "main", True, 0], [0.4, "main", True, 0], [0.1, "main", False, 0], [0.3, "worker", False, 0.5]],
+            "elapsed": 2000,
+            "blocking": 30,
+        }
+        wasm = bench_particles.summarize_point("wasm", outcome)
+        self.assertEqual(wasm["hit"], 0.5)
+        self.assertAlmostEqual(wasm["main_p50_ms"], 0.3)
+        self.assertEqual(wasm["blocking_ms"], 15.0)
+        worker = bench_particles.summarize_point("worker", outcome)
+        self.assertEqual(worker["main_p50_ms"], 0.3)
+        self.assertEqual(worker["worker_p50_ms"], 0.5)
+        self.assertIsNone(bench_particles.summarize_point("js", {"rows": []})["main_p50_ms"])
+
+
+class RecommendationTest(unittest.TestCase):
+    def test_crossover_needs_every_larger_count_to_agree(self):
+        wasm = {8: point(0.5), 16: point(0.3), 32: point(0.2), 64: point(0.3), 128: point(0.4)}
+        js = {8: point(0.2), 16: point(0.25), 32: point(0.3), 64: point(0.6), 128: point(1.2)}
+        self.assertEqual(bench_particles.crossover(wasm, js), 32)
+        # A noisy dip below the crossover does not count.
+        js[16] = point(0.35)
+        self.assertEqual(bench_particles.crossover(wasm, js), 16)
+        self.assertEqual(bench_particles.crossover(wasm, js, limit=64), 16)
+        self.assertIsNone(bench_particles.crossover(js, wasm))
+
+    def test_unreliable_points_are_skipped(self):
+        wasm = {16: point(0.1), 32: point(0.9, hit=0.5), 64: point(0.2)}
+        js = {16: point(0.2), 32: point(0.3), 64: point(0.4)}
+        self.assertEqual(bench_particles.crossover(wasm, js), 16)
+
+    def test_recommend_compares_the_worker_with_the_best_main_route(self):
+        results = {
+            "trail": {"js": {16: point(0.1), 32: point(0.3)}, "wasm": {16: point(0.2), 32: point(0.2)}},
+            "mixed": {
+                "js": {32: point(0.3), 64: point(0.6), 128: point(1.2)},
+                "wasm": {32: point(0.1), 64: point(0.5), 128: point(0.9)},
+                "worker": {32: point(0.2), 64: point(0.4), 128: point(0.5)},
+            },
+        }
+        recommendations = bench_particles.recommend(results)
+        self.assertEqual(recommendations["TRAIL_MIN_BATCH"], {"current": 24, "recommended": 32})
+        self.assertEqual(recommendations["WORKER_MIN_PARTICLES"], {"current": 64, "recommended": 64})
+        self.assertNotIn("AMBIENT_MIN_BATCH", recommendations)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Tests for the adaptive-quality convergence analysis (run: npm run test:verification)."""
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import bench_quality  # noqa: E402
+import telemetry  # noqa: E402
+
+HIGH, MEDIUM, LOW = 2, 1, 0
+
+
+def scene(frames):
+    """Telemetry table from (frameMs, quality, strideBoost, effectScale) tuples, 16 ms apart."""
+    table = {column: [] for column in telemetry.COLUMNS}
+    for index, (frame_ms, quality, stride, effect) in enumerate(frames):
+        row = {"t": 1000 + index * 16, "frameMs": frame_ms, "quality": quality,
+               "particleStrideBoost": stride, "effectScale": effect}
+        for column in telemetry.COLUMNS:
+            table[column].append(row.get(column))
+    return table
+
+
+class AnalyzeTest(unittest.TestCase):
+    def test_converging_scene(self):
+        frames = [(30.0, HIGH, 1.0, 0.94)] * 10 + [(25.0, MEDIUM, 2.0, 0.88)] * 10
+        frames += [(16.0, MEDIUM, 3.0, 0.82)] * 100
+        result = bench_quality.analyze(scene(frames))
+        self.assertEqual(result["frames"], 120)
+        self.assertEqual(result["quality_flips"], 1)
+        self.assertEqual(result["quality_settle_ms"], 160)
+        self.assertEqual(result["override_reversals"], 0)
+        self.assertEqual(result["override_settle_ms"], 320)
+        self.assertEqual(result["final_quality"], "medium")
+        self.assertEqual(result["steady_p95_ms"], 16.0)
+        self.assertTrue(result["settled"])
+
+    def test_oscillating_scene(self):
+        frames = []
+        for cycle in range(30):
+            quality = HIGH if cycle % 2 else MEDIUM
+            frames += [(20.0, quality, 1.0, 0.94), (15.0, quality, 0.85, 0.97)]
+        result = bench_quality.analyze(scene(frames))
+        self.assertEqual(result["quality_flips"], 29)
+        self.assertGreater(result["override_reversals"], 50)
+        self.assertFalse(result["settled"])
+
+    def test_empty_table(self):
+        self.assertEqual(bench_quality.analyze(scene([])), {"frames": 0})
+
+
+class ThresholdTest(unittest.TestCase):
+    def test_throttle_entries_override_the_default(self):
+        thresholds = {"default": {"max_quality_flips": 3}, "throttle": {"4": {"max_quality_flips": 6}}}
+        self.assertEqual(bench_quality.thresholds_for(thresholds, 1), {"max_quality_flips": 3})
+        self.assertEqual(bench_quality.thresholds_for(thresholds, 4.0), {"max_quality_flips": 6})
+
+    def test_check_reports_each_exceeded_limit(self):
+        result = {"quality_flips": 5, "steady_p95_ms": 18.0, "settled": False}
+        limits = {"max_quality_flips": 3, "max_steady_p95_ms": 20, "require_settled": True}
+        failures = bench_quality.check(result, limits)
+        self.assertEqual(failures, ["quality_flips 5 > 3", "knobs were still moving in the steady window"])
+
+    def test_committed_thresholds_parse(self):
+        thresholds = bench_quality.load_thresholds(bench_quality.DEFAULT_THRESHOLDS)
+        for rate in bench_quality.DEFAULT_RATES:
+            self.assertIn("max_steady_p95_ms", bench_quality.thresholds_for(thresholds, rate))
+
+    def test_missing_file_gates_nothing(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(bench_quality.load_thresholds(Path(tmp) / "none.json"), {})
+            bad = Path(tmp) / "bad.json"
+            bad.write_text(json.dumps([1]), encoding="utf-8")
+            with self.assertRaises(ValueError):
+                bench_quality.load_thresholds(bad)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""Tests for the replay throughput benchmark's bookkeeping (run: npm run test:verification)."""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import bench_replay  # noqa: E402
+
+
+def sample(sim_per_wall, heap=0, js_heap=None, ended_early=False):
+    return {
+        "wall_ms": 1000 / sim_per_wall,
+        "sim_ms": 1000,
+        "ticks": 63,
+        "score": 50,
+        "ended_early": ended_early,
+        "sim_per_wall": sim_per_wall,
+        "ticks_per_second": 63 * sim_per_wall,
+        "retained_heap_growth": heap,
+        "js_heap_growth": js_heap,
+    }
+
+
+class SyntheticReplayTest(unittest.TestCase):
+    def test_endless_replay_is_deterministic_and_covers_duration(self):
+        replay = bench_replay.synthetic_endless_replay(1, seed=7)
+        self.assertEqual(replay, bench_replay.synthetic_endless_replay(1, seed=7))
+        self.assertEqual(replay["config"]["gameMode"], "endless")
+        times = [e["t"] for e in replay["events"]]
+        self.assertEqual(times, sorted(times))
+        self.assertLess(times[-1], 60_000)
+        self.assertGreater(times[-1], 60_000 - 2 * bench_replay.SYNTHETIC_FIRE_EVERY_MS)
+        lanes = {e["lane"] for e in replay["events"] if e["type"] == "aim"}
+        self.assertTrue(lanes <= set(range(bench_replay.ENDLESS_LANES)))
+
+    def test_workloads_include_golden_and_each_synthetic_length(self):
+        self.assertEqual(
+            list(bench_replay.workloads([2, 0.5])), ["golden_campaign_l1", "endless_2min", "endless_0.5min"]
+        )
+
+
+class SummaryTest(unittest.TestCase):
+    def test_summarize_takes_medians(self):
+        summary = bench_replay.summarize([sample(10, heap=300), sample(30, heap=100), sample(20, heap=200)])
+        self.assertEqual(summary["sim_per_wall"], 20)
+        self.assertEqual((summary["sim_per_wall_min"], summary["sim_per_wall_max"]), (10, 30))
+        self.assertEqual(summary["retained_heap_growth"], 200)
+        self.assertIsNone(summary["js_heap_growth"])
+        self.assertFalse(summary["ended_early"])
+        self.assertEqual(summary["repeats"], 3)
+
+    def test_regression_beyond_threshold_is_reported(self):
+        previous = {"commit": "abc1234", "results": {"golden": {"sim_per_wall": 100.0}, "gone": {"sim_per_wall": 5}}}
+        current = {"golden": {"sim_per_wall": 80.0}, "new": {"sim_per_wall": 1.0}}
+        regressions = bench_replay.find_regressions(current, previous, 0.15)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("abc1234", regressions[0])
+        self.assertEqual(bench_replay.find_regressions(current, previous, 0.25), [])
+        self.assertEqual(bench_replay.find_regressions(current, None, 0.15), [])
+
+    def test_history_round_trip_is_trimmed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "bench" / "history.json"
+            self.assertEqual(bench_replay.load_history(path), [])
+            runs = [{"commit": str(i), "results": {}} for i in range(bench_replay.MAX_HISTORY + 5)]
+            bench_replay.save_history(path, runs)
+            loaded = bench_replay.load_history(path)
+            self.assertEqual(len(loaded), bench_replay.MAX_HISTORY)
+            self.assertEqual(loaded[-1]["commit"], runs[-1]["commit"])
+
+    def test_history_path_can_come_from_the_environment(self):
+        with mock.patch.dict("os.environ", {bench_replay.HISTORY_ENV: "/ci/bench/history.json"}):
+            self.assertEqual(bench_replay.parse_args([]).history, Path("/ci/bench/history.json"))
+        with mock.patch.dict("os.environ", {bench_replay.HISTORY_ENV: ""}):
+            self.assertEqual(bench_replay.parse_args([]).history, bench_replay.DEFAULT_HISTORY)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,172 @@
+"""Tests for the warm browser pool and run_all --jobs (run: npm run test:verification)."""
+import io
+import sys
+import tempfile
+import threading
+import unittest
+from contextlib import contextmanager, redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import browser_pool  # noqa: E402
+import run_all  # noqa: E402
+
+
+class FakeBrowser:
+    """Stands in for PooledBrowser: no Chromium, just a numbered endpoint."""
+
+    started = 0
+    fail_starts = False
+
+    def __init__(self, executable, ready_timeout):
+        self.endpoint = None
+        self.running = False
+
+    def start(self):
+        if FakeBrowser.fail_starts:
+            raise RuntimeError("Chromium did not expose a DevTools endpoint")
+        FakeBrowser.started += 1
+        self.endpoint = f"ws://fake/{FakeBrowser.started}"
+        self.running = True
+        return self
+
+    def alive(self):
+        return self.running
+
+    def stop(self):
+        self.running = False
+        self.endpoint = None
+
+
+class PoolTestCase(unittest.TestCase):
+    def setUp(self):
+        FakeBrowser.started = 0
+        FakeBrowser.fail_starts = False
+        patches = [
+            mock.patch.object(browser_pool, "PooledBrowser", FakeBrowser),
+            mock.patch.object(browser_pool, "chromium_executable", lambda: "chromium"),
+            mock.patch.object(browser_pool.BrowserPool, "poll_interval", 0.01),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+
+class BrowserPoolTest(PoolTestCase):
+    def test_lease_and_release_reuse_warm_browsers(self):
+        with browser_pool.BrowserPool(2) as pool:
+            with pool.lease() as first, pool.lease() as second:
+                self.assertEqual({first, second}, {"ws://fake/1", "ws://fake/2"})
+            with pool.lease() as again:
+                self.assertIn(again, {"ws://fake/1", "ws://fake/2"})
+            self.assertEqual(FakeBrowser.started, 2)
+
+    def test_lease_waits_for_a_release(self):
+        with browser_pool.BrowserPool(1) as pool:
+            leased = []
+            with pool.lease() as endpoint:
+                waiter = threading.Thread(target=lambda: leased.append(pool.lease().__enter__()))
+                waiter.start()
+                waiter.join(0.05)
+                self.assertEqual(leased, [])
+            waiter.join(1)
+            self.assertEqual(leased, [endpoint])
+
+    def test_dead_browser_is_restarted(self):
+        with browser_pool.BrowserPool(1) as pool:
+            with pool.lease():
+                pool._browsers[0].running = False
+            with pool.lease() as endpoint:
+                self.assertEqual(endpoint, "ws://fake/2")
+            self.assertEqual(len(pool), 1)
+
+    def test_failed_restart_drops_the_slot(self):
+        with browser_pool.BrowserPool(2) as pool:
+            with pool.lease():
+                pass
+            for browser in pool._browsers:
+                browser.running = False
+            FakeBrowser.fail_starts = True
+            with self.assertRaises(RuntimeError):
+                with pool.lease():
+                    self.fail("a dead browser was handed out")
+            self.assertEqual(len(pool), 1)
+            with self.assertRaises(RuntimeError):
+                with pool.lease():
+                    pass
+            self.assertEqual(len(pool), 0)
+            with self.assertRaisesRegex(RuntimeError, "No browsers left"):
+                with pool.lease():
+                    pass
+
+
+class RunAllJobsTest(PoolTestCase):
+    def setUp(self):
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = Path(self._tmp.name)
+
+    def script(self, name, body):
+        path = self.dir / name
+        path.write_text(f"import os, sys, time\n{body}\n", encoding="utf-8")
+        return path
+
+    def test_results_keep_script_order_and_exit_codes(self):
+        scripts = [
+            self.script("verify_slow.py", "time.sleep(0.3)"),
+            self.script("verify_fails.py", "sys.exit(3)"),
+            self.script("verify_endpoint.py", f"sys.exit(0 if os.environ['{run_all.SHARED_CDP_ENV}'] else 1)"),
+        ]
+        with redirect_stdout(io.StringIO()) as out:
+            results = run_all.run_parallel(scripts, 3)
+        self.assertEqual(
+            [(name, passed) for name, passed, _elapsed in results],
+            [("verify_slow.py", True), ("verify_fails.py", False), ("verify_endpoint.py", True)],
+        )
+        # Output is printed as each script finishes, not in submission order.
+        self.assertLess(out.getvalue().index("verify_fails.py"), out.getvalue().index("verify_slow.py"))
+
+    def test_unrestartable_browser_fails_only_its_script(self):
+        scripts = [
+            self.script("verify_kills_browser.py", "sys.exit(0)"),
+            self.script("verify_after.py", "sys.exit(0)"),
+        ]
+        original_lease = browser_pool.BrowserPool.lease
+        calls = []
+
+        @contextmanager
+        def lease(pool):
+            calls.append(1)
+            if len(calls) == 2:
+                pool._browsers[0].running = False
+                FakeBrowser.fail_starts = True
+            with original_lease(pool) as endpoint:
+                yield endpoint
+
+        with mock.patch.object(browser_pool.BrowserPool, "lease", lease), redirect_stdout(io.StringIO()):
+            results = run_all.run_parallel(scripts, 1)
+        self.assertEqual([passed for _name, passed, _elapsed in results], [True, False])
+
+    def test_exit_code_reflects_failures(self):
+        @contextmanager
+        def fake_server(*_args, **_kwargs):
+            yield SimpleNamespace(url="http://localhost:0")
+
+        for scripts, expected in (
+            ([self.script("verify_a.py", "pass"), self.script("verify_b.py", "pass")], 0),
+            ([self.script("verify_c.py", "pass"), self.script("verify_d.py", "sys.exit(1)")], 1),
+        ):
+            with self.subTest(expected=expected):
+                with mock.patch.object(run_all, "discover_scripts", lambda s=scripts: s), \
+                        mock.patch.object(run_all, "shared_dist_server", fake_server), \
+                        redirect_stdout(io.StringIO()):
+                    self.assertEqual(run_all.run(["--jobs", "2"]), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+"""Tests for the CPU profile summary and sourcemap mapping (run: npm run test:verification)."""
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import profiling  # noqa: E402
+
+_B64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+def encode_vlq(values):
+    out = ""
+    for value in values:
+        value = (-value << 1) | 1 if value < 0 else value << 1
+        while True:
+            digit, value = value & 31, value >> 5
+            out += _B64[digit | (32 if value else 0)]
+            if not value:
+                break
+    return out
+
+
+def build_map(segments_by_line, sources, names):
+    """v3 sourcemap from absolute (generated col, source, line, col[, name]) tuples."""
+    groups, state = [], [0, 0, 0, 0]
+    for segments in segments_by_line:
+        generated, encoded = 0, []
+        for segment in segments:
+            deltas = [segment[0] - generated]
+            generated = segment[0]
+            for slot, value in enumerate(segment[1:]):
+                deltas.append(value - state[slot])
+                state[slot] = value
+            encoded.append(encode_vlq(deltas))
+        groups.append(",".join(encoded))
+    return {"version": 3, "sources": sources, "names": names, "mappings": ";".join(groups)}
+
+
+def frame(name, url="", line=-1, column=-1):
+    return {"functionName": name, "url": url, "lineNumber": line, "columnNumber": column, "scriptId": "1"}
+
+
+def profile(nodes, samples, deltas):
+    return {
+        "nodes": [{"id": i, "callFrame": f, "children": []} for i, f in nodes],
+        "samples": samples,
+        "timeDeltas": deltas,
+        "startTime": 0,
+        "endTime": sum(deltas),
+    }
+
+
+class VlqTest(unittest.TestCase):
+    def test_decode(self):
+        self.assertEqual(profiling.decode_vlq("AAAA"), [0, 0, 0, 0])
+        self.assertEqual(profiling.decode_vlq("gBAAD"), [16, 0, 0, -1])
+        for values in ([0], [1, -1, 15, -16, 16, 1000, -123456]):
+            self.assertEqual(profiling.decode_vlq(encode_vlq(values)), values)
+
+
+class SourceMapTest(unittest.TestCase):
+    def setUp(self):
+        data = build_map(
+            [[(0, 0, 0, 0), (10, 1, 805, 4, 0)], [(3, 0, 41, 2, 1)]],
+            ["../../src/main.js", "../../src/modules/renderers/CrystalRenderer.js"],
+            ["drawComplexCrystal", "loop"],
+        )
+        self.map = profiling.SourceMap(data, base=profiling.REPO_ROOT / "dist" / "assets")
+
+    def test_lookup_uses_the_nearest_segment_at_or_before_the_column(self):
+        position = self.map.lookup(0, 25)
+        self.assertEqual(position.source, "src/modules/renderers/CrystalRenderer.js")
+        self.assertEqual(position.line, 806)
+        self.assertEqual(position.name, "drawComplexCrystal")
+        self.assertEqual(self.map.lookup(0, 9).source, "src/main.js")
+        self.assertIsNone(self.map.lookup(1, 2))
+        self.assertIsNone(self.map.lookup(5, 0))
+
+    def test_frames_are_named_after_their_module(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dist = Path(tmp)
+            (dist / "assets").mkdir()
+            data = build_map(
+                [[(10, 0, 805, 4, 0), (50, 0, 900, 2)]],
+                ["../../src/modules/renderers/CrystalRenderer.js"],
+                ["drawComplexCrystal"],
+            )
+            (dist / "assets" / "index-abc.js.map").write_text(json.dumps(data))
+            resolver = profiling.SourceMapResolver(dist)
+            url = "http://127.0.0.1:4173/assets/index-abc.js"
+
+            name, location = profiling.describe_frame(frame("a", url, 0, 10), resolver)
+            self.assertEqual(name, "CrystalRenderer.drawComplexCrystal")
+            self.assertEqual(location, "src/modules/renderers/CrystalRenderer.js:806")
+            # Unnamed segments fall back to the profiler's (minified) function name.
+            self.assertEqual(profiling.describe_frame(frame("xy", url, 0, 60), resolver)[0], "CrystalRenderer.xy")
+            # Bundles without a map keep their generated position.
+            other = "http://127.0.0.1:4173/assets/worker-1.js"
+            self.assertEqual(profiling.describe_frame(frame("w", other, 2, 4), resolver), ("w", "assets/worker-1.js:3:5"))
+            self.assertEqual(profiling.describe_frame(frame("(garbage collector)"), resolver), ("(garbage collector)", ""))
+
+
+class SummaryTest(unittest.TestCase):
+    def test_self_time_follows_the_sample_timeline(self):
+        data = profile(
+            [(1, frame("(root)")), (2, frame("update", "http://x/a.js", 0, 0)), (3, frame("(idle)"))],
+            [2, 2, 3, 2],
+            [0, 500, 1000, 250],
+        )
+        self.assertEqual(dict(profiling.self_times(data)), {2: 1.5, 3: 0.25})
+
+    def test_summary_ranks_busy_time_and_drops_idle(self):
+        data = profile(
+            [(1, frame("update", "http://x/a.js", 0, 0)), (2, frame("draw", "http://x/a.js", 0, 9)), (3, frame("(idle)"))],
+            [1, 2, 2, 2, 3, 3],
+            [0, 1000, 1000, 1000, 1000, 1000],
+        )
+        rows = profiling.summarize_profile(data)
+        self.assertEqual([r["function"] for r in rows], ["draw", "update"])
+        self.assertEqual(rows[0]["self_ms"], 3.0)
+        self.assertAlmostEqual(rows[0]["share"], 0.75, places=3)
+        self.assertIn("draw", profiling.format_summary(rows, "verify_x"))
+
+    def test_merged_profiles_keep_separate_node_ids(self):
+        one = profile([(1, frame("a", "http://x/a.js", 0, 0))], [1, 1], [0, 1000])
+        two = profile([(1, frame("b", "http://x/a.js", 0, 5))], [1, 1], [0, 3000])
+        rows = profiling.summarize_profile(profiling.merge_profiles([one, two]))
+        self.assertEqual({r["function"]: r["self_ms"] for r in rows}, {"b": 3.0, "a": 1.0})
+
+
+class MaybeProfileTest(unittest.TestCase):
+    def test_only_wraps_when_enabled(self):
+        class Browser:
+            def new_context(self):
+                return None
+
+        browser = Browser()
+        saved = profiling.os.environ.pop(profiling.PROFILE_ENV, None)
+        try:
+            self.assertIs(profiling.maybe_profile(browser), browser)
+            profiling.os.environ[profiling.PROFILE_ENV] = tempfile.gettempdir()
+            self.assertIsInstance(profiling.maybe_profile(browser), profiling.ProfiledBrowser)
+        finally:
+            profiling.os.environ.pop(profiling.PROFILE_ENV, None)
+            if saved is not None:
+                profiling.os.environ[profiling.PROFILE_ENV] = saved
+
+
+if __name__ == "__main__":
+    unittest.main()
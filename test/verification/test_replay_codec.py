@@ -0,0 +1,149 @@
+"""Tests for the .ccreplay JSON/binary codec (run: npm run test:verification)."""
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import replay_codec  # noqa: E402
+
+GOLDEN = VERIFICATION_DIR / "fixtures" / "golden_campaign_l1.ccreplay"
+
+
+def load_golden():
+    return json.loads(GOLDEN.read_text(encoding="utf-8"))
+
+
+class CodecTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+
+class RoundTripTest(CodecTestCase):
+    def test_golden_json_to_binary_and_back_is_byte_identical(self):
+        binary = self.tmp / "golden.ccreplayb"
+        restored = self.tmp / "golden.ccreplay"
+        count = replay_codec.convert(GOLDEN, binary)
+        replay_codec.convert(binary, restored)
+        self.assertEqual(count, len(load_golden()["events"]))
+        self.assertEqual(restored.read_text(encoding="utf-8"), GOLDEN.read_text(encoding="utf-8"))
+
+    def test_binary_is_much_smaller(self):
+        binary = self.tmp / "golden.ccreplayb"
+        replay_codec.convert(GOLDEN, binary)
+        self.assertLess(binary.stat().st_size, GOLDEN.stat().st_size / 3)
+
+    def test_load_replay_matches_json_load_for_both_forms(self):
+        binary = self.tmp / "golden.ccreplayb"
+        replay_codec.convert(GOLDEN, binary)
+        self.assertEqual(replay_codec.load_replay(GOLDEN), load_golden())
+        self.assertEqual(replay_codec.load_replay(binary), load_golden())
+
+    def test_unusual_fields_survive_binary(self):
+        replay = load_golden()
+        replay["events"] = [
+            {"t": 0, "type": "start"},
+            {"t": 10.5, "type": "aim", "lane": 2},
+            {"t": 11, "type": "powerUp", "colorIdx": 3, "id": "slow"},
+            {"t": 12, "type": "milestone", "kind": "score", "score": -40},
+            {"t": 12, "type": "milestone", "kind": "bossDown", "lane": -1},
+            {"t": 13, "type": "customTap", "x": 0.25},
+        ]
+        binary = self.tmp / "odd.ccreplayb"
+        replay_codec.dump_replay(replay, binary)
+        self.assertEqual(replay_codec.load_replay(binary)["events"], replay["events"])
+
+
+class OrderingTest(CodecTestCase):
+    def test_same_timestamp_events_follow_load_order(self):
+        events = [
+            {"t": 5, "type": "milestone", "kind": "match", "lane": 0, "score": 10},
+            {"t": 5, "type": "fire"},
+            {"t": 5, "type": "aim", "lane": 0},
+            {"t": 0, "type": "start"},
+        ]
+        ordered = [e["type"] for e in replay_codec.canonical_events(events)]
+        self.assertEqual(ordered, ["start", "aim", "fire", "milestone"])
+
+    def test_out_of_order_json_is_sorted_on_read(self):
+        replay = load_golden()
+        replay["events"] = list(reversed(replay["events"]))
+        shuffled = self.tmp / "shuffled.ccreplay"
+        shuffled.write_text(json.dumps(replay), encoding="utf-8")
+        self.assertEqual(replay_codec.load_replay(shuffled)["events"], load_golden()["events"])
+
+    def test_writers_reject_unsorted_streams(self):
+        header = load_golden()
+        events = list(reversed(header["events"]))
+        with self.assertRaises(replay_codec.ReplayFormatError):
+            replay_codec.write_binary(self.tmp / "bad.ccreplayb", header, events)
+        with self.assertRaises(replay_codec.ReplayFormatError):
+            replay_codec.write_json(self.tmp / "bad.ccreplay", header, events)
+        self.assertEqual(list(self.tmp.iterdir()), [])
+
+
+class StreamingTest(CodecTestCase):
+    def test_events_are_yielded_lazily(self):
+        binary = self.tmp / "golden.ccreplayb"
+        replay_codec.convert(GOLDEN, binary)
+        for path in (GOLDEN, binary):
+            stream = replay_codec.open_replay(path)
+            self.assertIsNone(stream.header["events"])
+            self.assertEqual(next(stream.events()), {"t": 0, "type": "start"})
+
+    def test_large_json_spans_read_chunks(self):
+        replay = load_golden()
+        replay["events"] = [{"t": 0, "type": "start"}] + [
+            {"t": 1000 + i * 16, "type": "aim", "lane": i % 5} for i in range(20_000)
+        ]
+        big = self.tmp / "big.ccreplay"
+        big.write_text(json.dumps(replay, indent=2), encoding="utf-8")
+        self.assertEqual(list(replay_codec.open_replay(big).events()), replay["events"])
+
+
+class ValidationTest(CodecTestCase):
+    def write(self, replay):
+        path = self.tmp / "case.ccreplay"
+        path.write_text(json.dumps(replay), encoding="utf-8")
+        return path
+
+    def test_rejects_unknown_version(self):
+        replay = load_golden()
+        replay["version"] = 2
+        with self.assertRaisesRegex(replay_codec.ReplayFormatError, "version"):
+            replay_codec.load_replay(self.write(replay))
+
+    def test_rejects_aim_without_lane(self):
+        replay = load_golden()
+        replay["events"].append({"t": 99_999, "type": "aim"})
+        with self.assertRaisesRegex(replay_codec.ReplayFormatError, "missing lane"):
+            replay_codec.load_replay(self.write(replay))
+
+    def test_rejects_empty_events(self):
+        replay = load_golden()
+        replay["events"] = []
+        with self.assertRaisesRegex(replay_codec.ReplayFormatError, "missing events"):
+            replay_codec.load_replay(self.write(replay))
+
+    def test_rejects_truncated_binary(self):
+        binary = self.tmp / "golden.ccreplayb"
+        replay_codec.convert(GOLDEN, binary)
+        binary.write_bytes(binary.read_bytes()[:-2])
+        with self.assertRaises(replay_codec.ReplayFormatError):
+            replay_codec.load_replay(binary)
+
+    def test_varint_zigzag_round_trip(self):
+        for value in (0, 1, -1, 63, -64, 300, -12_345_678):
+            self.assertEqual(replay_codec.unzigzag(replay_codec.zigzag(value)), value)
+        self.assertEqual(replay_codec.encode_varint(300), b"\xac\x02")
+
+
+if __name__ == "__main__":
+    unittest.main()
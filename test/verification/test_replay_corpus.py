@@ -0,0 +1,129 @@
+"""Tests for the replay corpus runner's reporting (run: npm run test:verification)."""
+import json
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import replay_corpus  # noqa: E402
+
+GOLDEN = VERIFICATION_DIR / "fixtures" / "golden_campaign_l1.ccreplay"
+
+
+def load_golden():
+    return json.loads(GOLDEN.read_text(encoding="utf-8"))
+
+
+def outcome_for(replay, score=None, complete=True, milestones=None):
+    """What RUN_REPLAY_JS returns when the simulation reproduces the file exactly."""
+    if milestones is None:
+        milestones = [dict(m) for m in replay_corpus.recorded_milestones(replay)]
+    return {
+        "score": replay["expect"]["finalScore"] if score is None else score,
+        "complete": complete,
+        "simMs": 61_000,
+        "milestones": milestones,
+    }
+
+
+class EvaluateResultTest(unittest.TestCase):
+    def setUp(self):
+        self.replay = load_golden()
+
+    def test_faithful_replay_passes(self):
+        result = replay_corpus.evaluate_result("golden", self.replay, outcome_for(self.replay), 12.5)
+        self.assertEqual(result.status, "pass")
+        self.assertEqual(result.score_delta, 0)
+        self.assertEqual(result.milestones_expected, result.milestones_observed)
+        self.assertEqual(result.milestone_mismatches, [])
+
+    def test_score_outside_tolerance_fails(self):
+        expected = self.replay["expect"]["finalScore"]
+        result = replay_corpus.evaluate_result(
+            "golden", self.replay, outcome_for(self.replay, score=expected - 10), 1.0
+        )
+        self.assertEqual(result.status, "fail")
+        self.assertEqual(result.score_delta, -10)
+
+        self.replay["expect"]["tolerance"] = 10
+        result = replay_corpus.evaluate_result(
+            "golden", self.replay, outcome_for(self.replay, score=expected - 10), 1.0
+        )
+        self.assertEqual(result.status, "pass")
+
+    def test_incomplete_replay_fails(self):
+        result = replay_corpus.evaluate_result("golden", self.replay, outcome_for(self.replay, complete=False), 1.0)
+        self.assertEqual(result.status, "fail")
+
+    def test_replay_without_expect_checks_milestones_only(self):
+        del self.replay["expect"]
+        outcome = outcome_for(self.replay, score=0)
+        result = replay_corpus.evaluate_result("golden", self.replay, outcome, 1.0)
+        self.assertEqual(result.status, "pass")
+        self.assertIsNone(result.score_delta)
+
+    def test_milestone_mismatch_is_reported_with_index(self):
+        observed = [dict(m) for m in replay_corpus.recorded_milestones(self.replay)]
+        observed[2]["lane"] = 4
+        del observed[-1]
+        result = replay_corpus.evaluate_result(
+            "golden", self.replay, outcome_for(self.replay, milestones=observed), 1.0
+        )
+        self.assertEqual(result.status, "fail")
+        self.assertEqual([m["index"] for m in result.milestone_mismatches], [2, len(observed)])
+        self.assertIsNone(result.milestone_mismatches[-1]["observed"])
+
+    def test_milestone_time_is_not_compared(self):
+        observed = [dict(m, t=m["t"] + 16) for m in replay_corpus.recorded_milestones(self.replay)]
+        self.assertEqual(replay_corpus.compare_milestones(replay_corpus.recorded_milestones(self.replay), observed), [])
+
+
+class ReportTest(unittest.TestCase):
+    def setUp(self):
+        replay = load_golden()
+        self.results = [
+            replay_corpus.evaluate_result("a.ccreplay", replay, outcome_for(replay), 10.0),
+            replay_corpus.evaluate_result("b.ccreplay", replay, outcome_for(replay, score=0), 30.0),
+            replay_corpus.ReplayResult("c.ccreplay", "error", error="Error: boom\n  at line 1"),
+        ]
+
+    def test_build_report_counts_and_speedup(self):
+        report = replay_corpus.build_report(self.results, 1.5, jobs=2)
+        self.assertEqual((report["replays"], report["passed"], report["failed"], report["errors"]), (3, 1, 1, 1))
+        self.assertEqual(report["simulated_ms"], 122_000)
+        self.assertEqual(report["speedup"], round(122_000 / 40.0, 1))
+        json.dumps(report)
+
+    def test_junit_has_one_case_per_replay(self):
+        suite = ET.fromstring(replay_corpus.junit_xml(self.results, 1.5))
+        self.assertEqual(suite.get("tests"), "3")
+        self.assertEqual(suite.get("failures"), "1")
+        self.assertEqual(suite.get("errors"), "1")
+        cases = {case.get("name"): case for case in suite.iter("testcase")}
+        self.assertIsNone(cases["a.ccreplay"].find("failure"))
+        self.assertIn("score 0", cases["b.ccreplay"].find("failure").get("message"))
+        self.assertEqual(cases["c.ccreplay"].find("error").get("message"), "Error: boom")
+
+
+class DiscoveryTest(unittest.TestCase):
+    def test_discovers_recursively_and_sorted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "day2").mkdir()
+            for rel in ("day2/b.ccreplay", "a.ccreplay", "notes.json"):
+                (root / rel).write_text("{}", encoding="utf-8")
+            found = replay_corpus.discover_replays([root])
+            self.assertEqual([p.relative_to(root).as_posix() for p in found], ["a.ccreplay", "day2/b.ccreplay"])
+
+    def test_simulation_budget_covers_last_event(self):
+        replay = load_golden()
+        last = max(e["t"] for e in replay["events"])
+        self.assertEqual(replay_corpus.simulation_budget(replay), last + replay_corpus.DRAIN_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
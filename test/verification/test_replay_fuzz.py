@@ -0,0 +1,98 @@
+"""Tests for the replay fuzzer's generators and reporting (run: npm run test:verification)."""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import replay_codec  # noqa: E402
+import replay_fuzz  # noqa: E402
+import replay_index  # noqa: E402
+
+
+class GeneratorTest(unittest.TestCase):
+    def test_same_seed_same_replay(self):
+        for scenario in replay_fuzz.SCENARIOS:
+            with self.subTest(scenario=scenario):
+                self.assertEqual(replay_fuzz.generate(scenario, 7, 10), replay_fuzz.generate(scenario, 7, 10))
+                self.assertNotEqual(replay_fuzz.generate(scenario, 7, 10), replay_fuzz.generate(scenario, 8, 10))
+
+    def test_generated_replays_are_plausible_recordings(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for scenario in replay_fuzz.SCENARIOS:
+                with self.subTest(scenario=scenario):
+                    path = Path(tmp) / f"{scenario}.ccreplay"
+                    replay_codec.dump_replay(replay_fuzz.generate(scenario, 1, 10), path)
+                    entry = replay_index.index_replay(path)
+                    self.assertEqual(entry.status, "ok", entry.problems)
+
+    def test_events_are_in_load_order(self):
+        replay = replay_fuzz.generate("chaos", 3, 20)
+        self.assertEqual(replay["events"], replay_codec.canonical_events(replay["events"]))
+        self.assertEqual(replay["events"][0], {"t": 0, "type": "start"})
+
+    def test_every_pause_is_resumed_in_the_same_tick(self):
+        for scenario in ("pause_spam", "chaos"):
+            events = replay_fuzz.generate(scenario, 2, 30)["events"]
+            pauses = [e["t"] for e in events if e["type"] == "pause"]
+            resumes = [e["t"] for e in events if e["type"] == "resume"]
+            self.assertTrue(pauses, scenario)
+            self.assertEqual(pauses, resumes)
+
+    def test_fire_storm_is_high_apm(self):
+        events = replay_fuzz.generate("fire_storm", 1, 60)["events"]
+        fires = sum(e["type"] == "fire" for e in events)
+        self.assertGreater(fires, 900)
+
+    def test_marathon_has_a_minimum_length(self):
+        replay = replay_fuzz.generate("marathon", 1, 10)
+        self.assertEqual(replay["config"]["gameMode"], "endless")
+        self.assertGreaterEqual(replay["events"][-1]["t"], replay_fuzz.MARATHON_MINUTES * 60_000 - 600)
+
+
+class ReportTest(unittest.TestCase):
+    def outcome(self, durations, outliers=()):
+        return {
+            "durations": durations,
+            "outliers": list(outliers),
+            "complete": True,
+            "active": True,
+            "score": 30,
+            "simMs": len(durations) * 16,
+            "final": {"spores": 0, "particles": 12},
+        }
+
+    def test_tick_statistics(self):
+        result = replay_fuzz.FuzzResult("storm-1", "fire_storm", 1)
+        durations = [1.0] * 98 + [5.0, 20.0]
+        replay_fuzz.apply_outcome(result, self.outcome(durations, [{"tick": 99, "t": 1600, "ms": 20.0, "counts": {}}]))
+        self.assertEqual(result.status, "ok")
+        self.assertEqual(result.ticks, 100)
+        self.assertEqual(result.tick_p50_ms, 1.0)
+        # Nearest rank, as in telemetry.percentile: p99 of 100 ticks is the 99th, not the max.
+        self.assertEqual(result.tick_p99_ms, 5.0)
+        self.assertEqual(result.tick_max_ms, 20.0)
+        self.assertEqual(result.outliers[0]["t"], 1600)
+
+    def test_page_errors_mark_the_replay_as_errored(self):
+        result = replay_fuzz.FuzzResult("chaos-1", "chaos", 1, page_errors=["pageerror: boom"])
+        replay_fuzz.apply_outcome(result, self.outcome([1.0]))
+        self.assertEqual(result.status, "error")
+
+    def test_only_interesting_replays_are_saved(self):
+        replays = {name: replay_fuzz.generate("lane_sweep", seed, 5) for seed, name in enumerate(("a", "b", "c"))}
+        results = [
+            replay_fuzz.FuzzResult("a", "lane_sweep", 0),
+            replay_fuzz.FuzzResult("b", "lane_sweep", 1, status="crash"),
+            replay_fuzz.FuzzResult("c", "lane_sweep", 2, outliers=[{"ms": 12.0}]),
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            written = replay_fuzz.write_artifacts(results, replays, Path(tmp))
+            self.assertEqual([p.name for p in written], ["b.ccreplay", "c.ccreplay"])
+            self.assertEqual(replay_codec.load_replay(written[0]), replays["b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
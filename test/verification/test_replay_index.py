@@ -0,0 +1,196 @@
+"""Tests for the replay indexer and plausibility checks (run: npm run test:verification)."""
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import replay_codec  # noqa: E402
+import replay_corpus  # noqa: E402
+import replay_index  # noqa: E402
+
+GOLDEN = VERIFICATION_DIR / "fixtures" / "golden_campaign_l1.ccreplay"
+
+
+def load_golden():
+    return json.loads(GOLDEN.read_text(encoding="utf-8"))
+
+
+class IndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, replay, name="case.ccreplay"):
+        path = self.tmp / name
+        path.write_text(json.dumps(replay), encoding="utf-8")
+        return path
+
+    def assertRejected(self, replay, fragment):
+        entry = replay_index.index_replay(self.write(replay))
+        self.assertEqual(entry.status, "rejected")
+        self.assertTrue(any(fragment in p for p in entry.problems), entry.problems)
+
+
+class SummaryTest(IndexTestCase):
+    def test_golden_fixture_summary(self):
+        entry = replay_index.index_replay(GOLDEN)
+        self.assertEqual(entry.status, "ok", entry.problems)
+        self.assertEqual(entry.counts, {"aim": 5, "fire": 6, "milestone": 5, "start": 1})
+        self.assertEqual(entry.events, 17)
+        self.assertEqual(entry.matches, 5)
+        self.assertEqual(entry.lanes_used, [0, 1, 3])
+        self.assertEqual([point[3] for point in entry.score_curve], [0, 10, 20, 30, 40])
+        self.assertEqual(entry.duration_ms, load_golden()["events"][-1]["t"])
+        self.assertEqual(entry.expected_score, 50)
+
+    def test_binary_form_indexes_the_same(self):
+        binary = self.tmp / "golden.ccreplayb"
+        replay_codec.convert(GOLDEN, binary)
+        entry = replay_index.index_replay(binary)
+        self.assertEqual(entry.format, "binary")
+        self.assertEqual(entry.score_curve, replay_index.index_replay(GOLDEN).score_curve)
+
+
+def build_replay(shots, final_score, extra=()):
+    """Campaign replay with one aim+fire per shot, followed by its match milestones.
+
+    shots: (lane, [score recorded on each match milestone]) per fire.
+    extra: milestones appended after the last shot, as (kind, score).
+    """
+    events = [{"t": 0, "type": "start"}]
+    t = 0
+    for lane, scores in shots:
+        t += 1000
+        events += [{"t": t, "type": "aim", "lane": lane}, {"t": t, "type": "fire"}]
+        for score in scores:
+            t += 100
+            events.append({"t": t, "type": "milestone", "kind": "match", "lane": lane, "score": score})
+    for kind, score in extra:
+        t += 100
+        events.append({"t": t, "type": "milestone", "kind": kind, "score": score})
+    header = {key: value for key, value in load_golden().items() if key not in ("events", "expect")}
+    return {**header, "events": events, "expect": {"finalScore": final_score}}
+
+
+class ScoringRulesTest(IndexTestCase):
+    def index(self, replay):
+        return replay_index.index_replay(self.write(replay))
+
+    def test_one_spore_can_match_both_crystals(self):
+        # CollisionSystem scores the top and bottom crystal independently.
+        entry = self.index(build_replay([(3, [0, 0]), (1, [20])], 30))
+        self.assertEqual(entry.status, "ok", entry.problems)
+        self.assertEqual(entry.matches, 3)
+
+    def test_three_matches_from_one_spore_are_rejected(self):
+        self.assertRejected(build_replay([(3, [0, 0, 0])], 30), "match #3 but only 1 spore(s) fired")
+
+    def test_boss_defeat_bonus_is_accepted(self):
+        # Six matches defeat "convergence" (hp 6), which pays rewards.scoreBonus
+        # (500) with no milestone of its own.
+        shots = [(lane, [lane * 10]) for lane in range(6)]
+        entry = self.index(build_replay(shots, 560, extra=[("levelComplete", 560)]))
+        self.assertEqual(entry.status, "ok", entry.problems)
+        self.assertEqual(replay_index.score_ceiling(6), 560)
+
+    def test_forged_score_jump_is_rejected(self):
+        shots = [(lane, [lane * 10]) for lane in range(6)]
+        self.assertRejected(build_replay(shots, 5000, extra=[("levelComplete", 5000)]), "score jumps from 50 to 5000")
+        self.assertRejected(build_replay(shots, 5000), "expect.finalScore 5000 exceeds")
+
+    def test_bonus_before_a_boss_could_fall_is_rejected(self):
+        shots = [(lane, [lane * 10]) for lane in range(5)]
+        self.assertRejected(build_replay(shots, 550, extra=[("score", 550)]), "5 earlier match(es) can pay at most 50")
+
+
+class RejectionTest(IndexTestCase):
+    def setUp(self):
+        super().setUp()
+        self.replay = load_golden()
+
+    def test_non_monotonic_t(self):
+        self.replay["events"][3]["t"] = 100
+        self.assertRejected(self.replay, "goes back")
+
+    def test_must_open_with_start(self):
+        self.replay["events"][0] = {"t": 0, "type": "fire"}
+        self.assertRejected(self.replay, "expected start")
+
+    def test_lane_out_of_range(self):
+        self.replay["events"][1]["lane"] = replay_index.LANES
+        self.assertRejected(self.replay, "outside 0..6")
+
+    def test_score_drop(self):
+        milestones = [e for e in self.replay["events"] if e["type"] == "milestone"]
+        milestones[3]["score"] = 0
+        self.assertRejected(self.replay, "score drops")
+
+    def test_final_score_below_last_milestone(self):
+        self.replay["expect"]["finalScore"] = 30
+        self.assertRejected(self.replay, "below the last milestone score 40")
+
+    def test_more_matches_than_fires(self):
+        self.replay["events"] = [e for e in self.replay["events"] if e["type"] != "fire"]
+        self.assertRejected(self.replay, "spore(s) fired")
+
+    def test_malformed_file(self):
+        path = self.tmp / "broken.ccreplay"
+        path.write_text('{"version": 1, "events": [', encoding="utf-8")
+        entry = replay_index.index_replay(path)
+        self.assertEqual(entry.status, "rejected")
+        self.assertIn("ReplayFormatError", entry.problems[0])
+
+
+class StoreTest(IndexTestCase):
+    def test_round_trip_and_incremental_update(self):
+        corpus = self.tmp / "corpus"
+        corpus.mkdir()
+        good = corpus / "good.ccreplay"
+        good.write_bytes(GOLDEN.read_bytes())
+        bad = load_golden()
+        bad["events"][1]["lane"] = 99
+        (corpus / "bad.ccreplay").write_text(json.dumps(bad), encoding="utf-8")
+
+        paths = replay_index.discover_replays([corpus])
+        labels = [replay_index.label_for(p, [corpus]) for p in paths]
+        with replay_index.ReplayIndex(self.tmp / "index.sqlite") as index:
+            first, read = replay_index.update_index(index, paths, labels)
+            self.assertEqual(read, 2)
+            self.assertEqual([e.status for e in first], ["rejected", "ok"])
+
+            second, read = replay_index.update_index(index, paths, labels)
+            self.assertEqual(read, 0)
+            self.assertEqual(second, first)
+
+            (corpus / "bad.ccreplay").unlink()
+            self.assertEqual(index.prune({"good.ccreplay"}), 1)
+            self.assertIsNone(index.get("bad.ccreplay"))
+
+
+class CorpusScreeningTest(IndexTestCase):
+    def test_implausible_replays_are_warnings(self):
+        bad = load_golden()
+        bad["events"][2]["t"] = 99_999
+        paths = [GOLDEN, self.write(bad, "bad.ccreplay")]
+        warnings = replay_corpus.screen_replays(paths, [self.tmp])
+        self.assertEqual(list(warnings), [1])
+        self.assertTrue(warnings[1][0].startswith("implausible: "))
+
+    def test_warnings_do_not_fail_a_passing_replay(self):
+        result = replay_corpus.ReplayResult("bad.ccreplay", "pass", warnings=["implausible: t goes backwards"])
+        report = replay_corpus.build_report([result], 1.0, 1)
+        self.assertEqual((report["passed"], report["failed"], report["warned"]), (1, 0, 1))
+        xml = replay_corpus.junit_xml([result], 1.0)
+        self.assertIn('failures="0"', xml)
+        self.assertIn("warning: implausible: t goes backwards", xml)
+
+
+if __name__ == "__main__":
+    unittest.main()
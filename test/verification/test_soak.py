@@ -0,0 +1,68 @@
+"""Tests for the soak test's growth analysis (run: npm run test:verification)."""
+import sys
+import unittest
+from pathlib import Path
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import soak  # noqa: E402
+
+
+def sample(minute, heap_mb=40.0, particles=100, orphans=0, restarts=0):
+    counts = {name: 5 for name in soak.ENTITY_ARRAYS}
+    counts["particles"] = particles
+    pool = {"inUse": particles, "available": 50, "orphans": orphans}
+    return soak.Sample(
+        sim_ms=int(minute * 60_000),
+        restarts=restarts,
+        score=0,
+        retained_heap=int(heap_mb * soak.MB),
+        js_heap=None,
+        pools={"particlePool": dict(pool), "trailPool": {"inUse": 0, "available": 10, "orphans": 0}},
+        counts=counts,
+    )
+
+
+class GrowthTest(unittest.TestCase):
+    def test_sustained_growth_ignores_noise(self):
+        self.assertTrue(soak.sustained_growth([1, 2, 3, 4, 5, 6]))
+        self.assertFalse(soak.sustained_growth([1, 5, 2, 4, 3, 5]))
+        self.assertFalse(soak.sustained_growth([3, 3, 3, 3, 3, 3]))
+        self.assertFalse(soak.sustained_growth([1, 2]))
+
+    def test_slope_per_minute(self):
+        self.assertAlmostEqual(soak.slope_per_minute([0, 60_000, 120_000], [10, 11, 12]), 1.0)
+        self.assertIsNone(soak.slope_per_minute([0], [1]))
+
+
+class AnalyzeTest(unittest.TestCase):
+    def test_flat_run_passes(self):
+        samples = [sample(m, heap_mb=40 + (m % 2) * 0.1, particles=100 + (m % 3) * 20) for m in range(1, 31)]
+        report = soak.analyze(samples)
+        self.assertEqual(report.failures, [])
+        self.assertEqual(report.samples, 30)
+        self.assertEqual(report.minutes, 30)
+
+    def test_heap_leak_fails_above_the_allowed_trend(self):
+        samples = [sample(m, heap_mb=40 + m * 0.5) for m in range(1, 31)]
+        report = soak.analyze(samples, max_heap_mb_per_min=0.25)
+        self.assertIn("retained_heap_mb", report.growth)
+        self.assertAlmostEqual(report.heap_mb_per_min, 0.5, places=3)
+        self.assertTrue(any("retained heap" in f for f in report.failures))
+        self.assertEqual(soak.analyze(samples, max_heap_mb_per_min=1.0).failures, [])
+
+    def test_warmup_growth_is_ignored(self):
+        samples = [sample(m, particles=min(m, 15) * 10) for m in range(1, 31)]
+        self.assertEqual(soak.analyze(samples, warmup_fraction=0.5).failures, [])
+        self.assertTrue(soak.analyze(samples, warmup_fraction=0.0).failures)
+
+    def test_any_orphan_fails(self):
+        samples = [sample(m, orphans=3 if m == 2 else 0, restarts=1 if m >= 2 else 0) for m in range(1, 31)]
+        report = soak.analyze(samples)
+        self.assertEqual(report.restarts, 1)
+        self.assertEqual(report.failures, ["particlePool: up to 3 in-use objects not in state.particles"])
+
+
+if __name__ == "__main__":
+    unittest.main()
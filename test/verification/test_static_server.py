@@ -0,0 +1,165 @@
+"""Tests for the threaded DistServer backend (run: npm run test:verification)."""
+import gzip
+import os
+import sys
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+VERIFICATION_DIR = REPO_ROOT / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+sys.path.append(str(REPO_ROOT))
+
+from server import SHARED_SERVER_ENV, DistServer, find_free_port, shared_dist_server  # noqa: E402
+from static_server import FileCache, accepted_encodings  # noqa: E402
+import precompress  # noqa: E402
+
+
+def fetch(url, headers=None, method="GET"):
+    request = urllib.request.Request(url, headers=headers or {}, method=method)
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), exc.read()
+
+
+class StaticServerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "index.html").write_text("<canvas id=gameCanvas></canvas>")
+        assets = self.root / "assets"
+        assets.mkdir()
+        self.js = b"export const x = 1;\n" * 200
+        (assets / "index.js").write_bytes(self.js)
+        (assets / "index.js.gz").write_bytes(gzip.compress(self.js))
+        (assets / "release.wasm").write_bytes(b"\0asm\1\0\0\0")
+        self.server = DistServer(directory=str(self.root)).start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_serves_index_and_content_types(self):
+        status, headers, body = fetch(self.server.url + "/")
+        self.assertEqual(status, 200)
+        self.assertIn(b"gameCanvas", body)
+        _status, headers, _body = fetch(self.server.url + "/assets/release.wasm")
+        self.assertEqual(headers["Content-Type"], "application/wasm")
+
+    def test_prefers_precompressed_sibling(self):
+        status, headers, body = fetch(
+            self.server.url + "/assets/index.js", {"Accept-Encoding": "br;q=0, gzip"}
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(headers["Content-Type"], "text/javascript")
+        self.assertEqual(gzip.decompress(body), self.js)
+
+        _status, headers, body = fetch(self.server.url + "/assets/index.js")
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(body, self.js)
+
+    def test_if_none_match_returns_304(self):
+        _status, headers, _body = fetch(self.server.url + "/assets/index.js")
+        status, _headers, body = fetch(
+            self.server.url + "/assets/index.js", {"If-None-Match": headers["ETag"]}
+        )
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+
+    def test_changed_file_gets_new_etag(self):
+        url = self.server.url + "/assets/index.js"
+        _status, first, _body = fetch(url)
+        (self.root / "assets" / "index.js").write_bytes(b"export const x = 2;\n")
+        status, second, body = fetch(url, {"If-None-Match": first["ETag"]})
+        self.assertEqual(status, 200)
+        self.assertNotEqual(first["ETag"], second["ETag"])
+        self.assertEqual(body, b"export const x = 2;\n")
+
+    def test_head_and_missing_and_traversal(self):
+        status, headers, body = fetch(self.server.url + "/assets/index.js", method="HEAD")
+        self.assertEqual((status, body), (200, b""))
+        self.assertEqual(int(headers["Content-Length"]), len(self.js))
+        self.assertEqual(fetch(self.server.url + "/nope.js")[0], 404)
+        self.assertEqual(fetch(self.server.url + "/%2e%2e/%2e%2e/etc/passwd")[0], 404)
+
+    def test_concurrent_requests(self):
+        url = self.server.url + "/assets/index.js"
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            bodies = list(pool.map(lambda _i: fetch(url)[2], range(64)))
+        self.assertTrue(all(body == self.js for body in bodies))
+
+
+class SharedServerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        (Path(self.tmp.name) / "index.html").write_text("ok")
+
+    def tearDown(self):
+        os.environ.pop(SHARED_SERVER_ENV, None)
+        self.tmp.cleanup()
+
+    def test_scripts_attach_to_session_server(self):
+        with shared_dist_server(self.tmp.name) as session:
+            self.assertEqual(os.environ[SHARED_SERVER_ENV], session.url)
+            with DistServer() as attached:
+                self.assertEqual(attached.url, session.url)
+                self.assertIsNone(attached.httpd)
+            # Leaving the attached server must not stop the session server.
+            self.assertEqual(fetch(session.url + "/")[0], 200)
+        self.assertNotIn(SHARED_SERVER_ENV, os.environ)
+
+    def test_unreachable_shared_server_falls_back(self):
+        os.environ[SHARED_SERVER_ENV] = f"http://localhost:{find_free_port()}"
+        with DistServer(directory=self.tmp.name) as server:
+            self.assertIsNotNone(server.httpd)
+            self.assertEqual(fetch(server.url + "/")[2], b"ok")
+
+    def test_nested_runner_stops_its_fallback_server(self):
+        os.environ[SHARED_SERVER_ENV] = f"http://localhost:{find_free_port()}"
+        with shared_dist_server(self.tmp.name) as server:
+            self.assertIsNotNone(server.httpd)
+        self.assertIsNone(server.httpd)
+
+
+class PrecompressedServerTest(unittest.TestCase):
+    def test_precompress_option_writes_and_serves_siblings(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp) / "dist"
+            root.mkdir()
+            js = b"export const crystals = [];\n" * 200
+            (root / "index.js").write_bytes(js)
+            with mock.patch.object(precompress, "DEFAULT_STATE_DIR", Path(tmp) / "state"):
+                with DistServer(directory=str(root), precompress=True) as server:
+                    self.assertTrue((root / "index.js.gz").is_file())
+                    _status, headers, body = fetch(server.url + "/index.js", {"Accept-Encoding": "gzip"})
+            self.assertEqual(headers["Content-Encoding"], "gzip")
+            self.assertEqual(gzip.decompress(body), js)
+
+
+class HelpersTest(unittest.TestCase):
+    def test_accepted_encodings(self):
+        self.assertEqual(accepted_encodings("gzip, deflate, br"), {"gzip", "deflate", "br"})
+        self.assertEqual(accepted_encodings("br;q=0, gzip;q=0.5"), {"gzip"})
+        self.assertEqual(accepted_encodings(None), set())
+
+    def test_file_cache_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [Path(tmp) / f"{i}.bin" for i in range(3)]
+            for path in paths:
+                path.write_bytes(b"x" * 10)
+            cache = FileCache(max_bytes=25)
+            for path in paths:
+                cache.get(path)
+            self.assertEqual(list(cache._entries), paths[1:])
+
+
+if __name__ == "__main__":
+    unittest.main()
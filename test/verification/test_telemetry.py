@@ -0,0 +1,113 @@
+"""Tests for the perfMetrics telemetry harvester (run: npm run test:verification)."""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import telemetry  # noqa: E402
+
+
+def columns(rows):
+    """Column-major lists, as window.__telemetry.drain() returns them."""
+    return [[row.get(name) for row in rows] for name in telemetry.COLUMNS]
+
+
+def frame(t, frame_ms=16.0, particles=100, limit=400, quality=2):
+    return {"t": t, "frameMs": frame_ms, "particleCount": particles, "particleLimit": limit, "quality": quality}
+
+
+class FakePage:
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.calls = 0
+
+    def evaluate(self, _script):
+        self.calls += 1
+        return self.batches.pop(0) if self.batches else {"columns": columns([]), "dropped": 0}
+
+
+class PercentileTest(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(telemetry.percentile(values, 50), 50)
+        self.assertEqual(telemetry.percentile(values, 95), 95)
+        self.assertEqual(telemetry.percentile(values, 99), 99)
+        self.assertEqual(telemetry.percentile([7.0], 99), 7.0)
+        self.assertIsNone(telemetry.percentile([], 50))
+
+
+class SummarizeTest(unittest.TestCase):
+    def test_frame_times_particles_and_quality_share(self):
+        rows = [frame(i * 16, 16.0, particles=i, quality=2) for i in range(90)]
+        rows += [frame(2000 + i * 33, 33.0, particles=400, quality=1) for i in range(10)]
+        session = telemetry.Telemetry()
+        session.extend("storm", columns(rows))
+        summary = session.summary()["storm"]
+
+        self.assertEqual(summary["frames"], 100)
+        self.assertEqual(summary["frame_ms_p50"], 16.0)
+        self.assertEqual(summary["frame_ms_p95"], 33.0)
+        self.assertEqual(summary["frame_ms_max"], 33.0)
+        self.assertEqual(summary["particles_max"], 400)
+        self.assertEqual(summary["particle_load_p95"], 1.0)
+        self.assertEqual(summary["quality_switches"], 1)
+        self.assertAlmostEqual(summary["quality_share"]["high"], 1440 / 1770, places=3)
+        self.assertAlmostEqual(summary["quality_share"]["medium"], 330 / 1770, places=3)
+
+    def test_missing_metrics_are_ignored(self):
+        rows = [{"t": 0, "quality": -1}, frame(16)]
+        session = telemetry.Telemetry()
+        session.extend("menu", columns(rows))
+        summary = session.summary()["menu"]
+        self.assertEqual(summary["frames"], 2)
+        self.assertEqual(summary["frame_ms_p99"], 16.0)
+        self.assertIn("unknown", summary["quality_share"])
+
+
+class DrainTest(unittest.TestCase):
+    def test_rows_are_filed_under_the_current_scenario(self):
+        page = FakePage(
+            [
+                {"columns": columns([frame(0)]), "dropped": 0},
+                {"columns": columns([frame(16), frame(32)]), "dropped": 3},
+            ]
+        )
+        session = telemetry.Telemetry()
+        session.scenario(page, "storm")
+        self.assertEqual(session.drain(page), 2)
+        self.assertEqual(page.calls, 2)
+        self.assertEqual(session.data["default"]["t"], [0])
+        self.assertEqual(session.data["storm"]["t"], [16, 32])
+        self.assertEqual(session.summary()["storm"]["dropped"], 3)
+
+    def test_empty_drains_do_not_create_scenarios(self):
+        session = telemetry.Telemetry()
+        session.scenario(FakePage([]), "menu")
+        self.assertEqual(session.data, {})
+
+    def test_init_script_embeds_columns_and_capacity(self):
+        script = telemetry.telemetry_init(64)
+        self.assertIn("const capacity = 64;", script)
+        self.assertIn('"particleCount"', script)
+        self.assertIn("written % capacity", script)
+
+
+class CsvTest(unittest.TestCase):
+    def test_round_trip_plain_and_gzip(self):
+        session = telemetry.Telemetry()
+        session.extend("menu", columns([frame(0), {"t": 16, "quality": 0}]))
+        session.extend("storm", columns([frame(100, 20.5, particles=300)]))
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ("frames.csv", "frames.csv.gz"):
+                path = Path(tmp) / name
+                self.assertEqual(telemetry.write_csv(path, session.data), 3)
+                self.assertEqual(telemetry.read_csv(path), session.data)
+            plain = (Path(tmp) / "frames.csv").read_text(encoding="utf-8").splitlines()
+            self.assertEqual(plain[0].split(",")[:3], ["scenario", "t", "frameMs"])
+
+
+if __name__ == "__main__":
+    unittest.main()
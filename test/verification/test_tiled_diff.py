@@ -0,0 +1,171 @@
+"""Tests for tiled, region-aware visual diffs (run: npm run test:verification)."""
+import io
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import run_visual  # noqa: E402
+import visual_diff  # noqa: E402
+from visual_diff import check_regions, compare_images, write_heatmap  # noqa: E402
+from visual_manifest import JUICE_REGIONS, DiffRegion, ScreenshotSpec, ScriptSpec  # noqa: E402
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:  # pragma: no cover
+    Image = None
+
+
+@unittest.skipIf(Image is None or visual_diff.np is None, "Pillow and NumPy are required")
+class TiledDiffTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        # 100x70 is deliberately not a multiple of the tile size.
+        self.base = Image.new("RGB", (100, 70), (20, 30, 40))
+        self.baseline = self.dir / "base.png"
+        self.base.save(self.baseline)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _actual_with_block(self, box):
+        img = self.base.copy()
+        ImageDraw.Draw(img).rectangle(box, fill=(255, 255, 255))
+        path = self.dir / "actual.png"
+        img.save(path)
+        return path
+
+    def test_tile_counts_sum_to_diff_count(self):
+        actual = self._actual_with_block((5, 5, 94, 64))
+        result = compare_images(self.baseline, actual, tile_size=32)
+        self.assertEqual(result.tile_counts.shape, (3, 4))
+        self.assertEqual(
+            int(result.tile_counts.sum()),
+            round(result.diff_ratio * result.width * result.height),
+        )
+
+    def test_region_budget_catches_localized_change(self):
+        actual = self._actual_with_block((0, 0, 15, 15))
+        result = compare_images(self.baseline, actual, tile_size=16)
+        self.assertLess(result.diff_ratio, 0.05)
+
+        regions = (DiffRegion("crystals", (0.0, 0.0, 0.5, 0.5), 0.01),)
+        checks = {check.name: check for check in check_regions(result, regions, 0.05)}
+        self.assertFalse(checks["crystals"].passed)
+        self.assertTrue(checks["canvas"].passed)
+        self.assertEqual(checks["canvas"].diff_ratio, 0.0)
+
+    def test_later_regions_override_earlier(self):
+        actual = self._actual_with_block((0, 0, 15, 15))
+        result = compare_images(self.baseline, actual, tile_size=16)
+        regions = (
+            DiffRegion("strict", (0.0, 0.0, 1.0, 1.0), 0.0),
+            DiffRegion("hud", (0.0, 0.0, 0.2, 0.3), 1.0),
+        )
+        checks = {check.name: check for check in check_regions(result, regions, 0.0)}
+        self.assertNotIn("canvas", checks)
+        self.assertTrue(checks["hud"].passed)
+        self.assertTrue(checks["strict"].passed)
+
+    def test_fast_path_results_have_empty_grid(self):
+        result = compare_images(self.baseline, self.baseline, fast_paths=True, tile_size=32)
+        self.assertEqual(result.tier, "exact")
+        self.assertEqual(int(result.tile_counts.sum()), 0)
+
+    def test_heatmap_matches_canvas_size(self):
+        actual = self._actual_with_block((40, 20, 60, 40))
+        result = compare_images(self.baseline, actual, tile_size=32)
+        path = write_heatmap(result, (), 0.01, self.dir / "heatmap.png")
+        with Image.open(path) as heatmap:
+            self.assertEqual(heatmap.size, (100, 70))
+            self.assertEqual(heatmap.getpixel((50, 30)), (255, 0, 0))
+
+    def test_python_engine_rejects_tiles(self):
+        with self.assertRaises(ValueError):
+            compare_images(self.baseline, self.baseline, engine="python", tile_size=32)
+
+
+@unittest.skipIf(Image is None or visual_diff.np is None, "Pillow and NumPy are required")
+class JuiceRegionsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.baseline = VERIFICATION_DIR / "baselines" / "verify_juice.png"
+        self.base = Image.open(self.baseline).convert("RGB")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _failed(self, box):
+        img = self.base.copy()
+        ImageDraw.Draw(img).rectangle(box, fill=(255, 255, 255))
+        actual = self.dir / "actual.png"
+        img.save(actual)
+        result = compare_images(self.baseline, actual, tile_size=32)
+        return {check.name for check in check_regions(result, JUICE_REGIONS, 0.02) if not check.passed}
+
+    def test_crystal_band_churn_passes(self):
+        # 40% of the ceiling band: crystals breathing and growing between captures.
+        self.assertEqual(self._failed((0, 0, 1279, 50)), set())
+
+    def test_small_playfield_change_fails(self):
+        # About 3% of the playfield, well under the old whole-image 0.18 budget.
+        self.assertEqual(self._failed((400, 300, 560, 400)), {"canvas"})
+
+
+@unittest.skipIf(Image is None or visual_diff.np is None, "Pillow and NumPy are required")
+class RunVisualHeatmapTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        Image.new("RGB", (64, 64), (20, 30, 40)).save(self.dir / "base.png")
+        actual = Image.new("RGB", (64, 64), (20, 30, 40))
+        ImageDraw.Draw(actual).rectangle((0, 0, 31, 31), fill=(255, 255, 255))
+        actual.save(self.dir / "actual.png")
+        self.spec = spec = ScreenshotSpec(
+            str(self.dir / "actual.png"),
+            str(self.dir / "base.png"),
+            max_diff_ratio=0.01,
+            regions=(DiffRegion("corner", (0.0, 0.0, 0.5, 0.5), 0.01),),
+        )
+        self.patches = [
+            mock.patch.object(run_visual, "CANONICAL_VISUALS", (ScriptSpec("fake.py", (spec,)),)),
+            mock.patch.object(run_visual, "DIFFS_DIR", self.dir / "diffs"),
+            mock.patch("visual_manifest.DIFFS_DIR", self.dir / "diffs"),
+            mock.patch.object(run_visual, "prune", lambda _paths: None),
+            # Decode directly instead of filling the shared baseline cache.
+            mock.patch.object(
+                visual_diff,
+                "load_baseline_array",
+                lambda path: visual_diff.image_to_array(Image.open(path).convert("RGB")),
+            ),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.tmp.cleanup()
+
+    def _compare(self, **kwargs):
+        with redirect_stdout(io.StringIO()):
+            (result,) = run_visual.compare_screenshots(**kwargs)
+        return result
+
+    def test_heatmap_only_with_flag(self):
+        self.assertFalse(self._compare()[2])
+        self.assertTrue(self.spec.diff_path().is_file())
+        self.assertFalse(self.spec.heatmap_path().exists())
+        self._compare(heatmaps=True)
+        self.assertTrue(self.spec.heatmap_path().is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
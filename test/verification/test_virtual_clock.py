@@ -0,0 +1,161 @@
+"""Tests for the virtual clock init script and advance() (run: npm run test:verification)."""
+import json
+import shutil
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import screenshot_utils  # noqa: E402
+
+NODE = shutil.which("node")
+
+# Runs VIRTUAL_CLOCK_INIT against Node's globals standing in for window, then
+# the scenario body, and prints the scenario's `log` as JSON. Node drains one
+# MessagePort completely before serving another, unlike a browser event loop,
+# so MessageChannel is left out and the clock yields through the real
+# setTimeout; queueTask() stands in for a Worker reply arriving as a task.
+HARNESS = """
+const vm = require('vm');
+const [init, scenario] = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const sandbox = {
+    console,
+    setTimeout, clearTimeout,
+    queueTask: (fn) => setTimeout(fn, 0),
+    performance: { now: () => 0 },
+};
+sandbox.window = sandbox;
+const context = vm.createContext(sandbox);
+vm.runInContext(init, context);
+vm.runInContext(`(async () => { const log = []; ${scenario}; return log; })()`, context)
+    .then((log) => { console.log(JSON.stringify(log)); process.exit(0); })
+    .catch((err) => { console.error(err); process.exit(1); });
+"""
+
+
+def run_scenario(body):
+    result = subprocess.run(
+        [NODE, "-e", HARNESS],
+        input=json.dumps([screenshot_utils.VIRTUAL_CLOCK_INIT, body]),
+        capture_output=True,
+        text=True,
+        timeout=30,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+@unittest.skipIf(NODE is None, "node is required")
+class VirtualClockInitTest(unittest.TestCase):
+    def test_clocks_are_frozen_between_advances(self):
+        log = run_scenario("""
+            const t0 = performance.now(), d0 = Date.now();
+            log.push(performance.now() - t0, Date.now() - d0);
+            await __virtualClock.advance(50, 16);
+            log.push(performance.now() - t0, Date.now() - d0, __virtualClock.now());
+        """)
+        self.assertEqual(log, [0, 0, 50, 50, 1050])
+
+    def test_timers_run_before_frames_in_due_order(self):
+        log = run_scenario("""
+            requestAnimationFrame((t) => log.push(['raf-a', t]));
+            setTimeout(() => log.push(['timeout-10', performance.now()]), 10);
+            setTimeout(() => log.push(['timeout-5', performance.now()]), 5);
+            requestAnimationFrame((t) => {
+                log.push(['raf-b', t]);
+                requestAnimationFrame((t2) => log.push(['raf-next', t2]));
+            });
+            await __virtualClock.advance(32, 16);
+        """)
+        self.assertEqual(log, [
+            ["timeout-5", 1016],
+            ["timeout-10", 1016],
+            ["raf-a", 1016],
+            ["raf-b", 1016],
+            ["raf-next", 1032],
+        ])
+
+    def test_cancelled_callbacks_never_run(self):
+        log = run_scenario("""
+            clearTimeout(setTimeout(() => log.push('timeout'), 0));
+            cancelAnimationFrame(requestAnimationFrame(() => log.push('raf')));
+            await __virtualClock.advance(32, 16);
+        """)
+        self.assertEqual(log, [])
+
+    def test_intervals_repeat_until_cleared(self):
+        log = run_scenario("""
+            const id = setInterval((tag) => {
+                log.push([tag, performance.now()]);
+                if (log.length === 3) clearInterval(id);
+            }, 16, 'tick');
+            await __virtualClock.advance(80, 16);
+        """)
+        self.assertEqual(log, [["tick", 1016], ["tick", 1032], ["tick", 1048]])
+
+    def test_slow_interval_catches_up_within_a_frame(self):
+        log = run_scenario("""
+            const id = setInterval(() => log.push(performance.now()), 5);
+            await __virtualClock.advance(16, 16);
+            clearInterval(id);
+        """)
+        self.assertEqual(log, [1016, 1016, 1016])
+
+    def test_zero_delay_interval_does_not_spin(self):
+        log = run_scenario("""
+            let ticks = 0;
+            const id = setInterval(() => { ticks += 1; }, 0);
+            await __virtualClock.advance(16, 16);
+            clearInterval(id);
+            log.push(ticks);
+        """)
+        self.assertEqual(log, [16])
+
+    def test_queued_tasks_run_between_frames(self):
+        log = run_scenario("""
+            requestAnimationFrame((t) => {
+                log.push(['raf', t]);
+                requestAnimationFrame((t2) => log.push(['raf', t2]));
+            });
+            queueTask(() => log.push(['message', performance.now()]));
+            await __virtualClock.advance(32, 16);
+        """)
+        self.assertEqual(log, [["raf", 1016], ["message", 1016], ["raf", 1032]])
+
+
+class AdvanceTest(unittest.TestCase):
+    def test_steps_the_virtual_clock_in_fixed_frames(self):
+        page = mock.Mock()
+        page.evaluate.return_value = True
+        with mock.patch.object(screenshot_utils.time, "sleep") as sleep:
+            screenshot_utils.advance(page, 500)
+        page.evaluate.assert_called_once_with(
+            screenshot_utils.ADVANCE_VIRTUAL_JS, [500, screenshot_utils.VIRTUAL_FRAME_MS]
+        )
+        sleep.assert_not_called()
+
+    def test_sleeps_without_a_virtual_clock(self):
+        page = mock.Mock()
+        page.evaluate.return_value = False
+        with mock.patch.object(screenshot_utils.time, "sleep") as sleep:
+            screenshot_utils.advance(page, 250)
+        sleep.assert_called_once_with(0.25)
+
+    def test_non_positive_durations_do_nothing(self):
+        page = mock.Mock()
+        screenshot_utils.advance(page, 0)
+        page.evaluate.assert_not_called()
+
+    def test_real_time_env_disables_the_clock(self):
+        with mock.patch.dict("os.environ", {screenshot_utils.REAL_TIME_ENV: "1"}):
+            self.assertFalse(screenshot_utils.virtual_time_enabled())
+        with mock.patch.dict("os.environ", {screenshot_utils.REAL_TIME_ENV: "0"}):
+            self.assertTrue(screenshot_utils.virtual_time_enabled())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""Parity tests for the visual_diff engines (run: npm run test:verification)."""
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+VERIFICATION_DIR = Path(__file__).resolve().parents[2] / "verification"
+sys.path.insert(0, str(VERIFICATION_DIR))
+
+import visual_diff  # noqa: E402
+from visual_diff import check_within_threshold, compare_images  # noqa: E402
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover
+    Image = None
+
+
+def _noisy_copy(img, rng, fraction, max_delta):
+    out = img.copy()
+    pixels = out.load()
+    width, height = out.size
+    for _ in range(int(width * height * fraction)):
+        x, y = rng.randrange(width), rng.randrange(height)
+        pixels[x, y] = tuple(
+            max(0, min(255, c + rng.randint(-max_delta, max_delta))) for c in pixels[x, y]
+        )
+    return out
+
+
+@unittest.skipIf(Image is None or visual_diff.np is None, "Pillow and NumPy are required")
+class DiffEngineParityTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.rng = random.Random(1234)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _save(self, img, name):
+        path = self.dir / name
+        img.save(path)
+        return path
+
+    def _assert_parity(self, baseline, actual, pixel_threshold=12):
+        reference = compare_images(baseline, actual, pixel_threshold=pixel_threshold, engine="python")
+        vectorized = compare_images(baseline, actual, pixel_threshold=pixel_threshold, engine="numpy")
+        self.assertEqual(reference.diff_ratio, vectorized.diff_ratio)
+        return vectorized
+
+    def test_identical_images(self):
+        img = Image.effect_noise((64, 48), 40).convert("RGB")
+        path = self._save(img, "a.png")
+        self.assertEqual(self._assert_parity(path, path).diff_ratio, 0.0)
+
+    def test_noisy_images_across_thresholds(self):
+        base = Image.effect_noise((96, 64), 60).convert("RGB")
+        baseline = self._save(base, "base.png")
+        actual = self._save(_noisy_copy(base, self.rng, 0.3, 20), "actual.png")
+        for threshold in (0, 1, 12, 30, 60):
+            with self.subTest(threshold=threshold):
+                self._assert_parity(baseline, actual, pixel_threshold=threshold)
+
+    def test_resized_actual(self):
+        baseline = self._save(Image.effect_noise((80, 50), 50).convert("RGB"), "base.png")
+        actual = self._save(Image.effect_noise((100, 70), 50).convert("RGB"), "actual.png")
+        self._assert_parity(baseline, actual)
+
+    def test_committed_baseline_against_perturbed_copy(self):
+        source = VERIFICATION_DIR / "baselines" / "verify_juice.png"
+        crop = Image.open(source).convert("RGB").crop((400, 200, 560, 320))
+        baseline = self._save(crop, "base.png")
+        actual = self._save(_noisy_copy(crop, self.rng, 0.2, 40), "actual.png")
+        self.assertGreater(self._assert_parity(baseline, actual).diff_ratio, 0)
+
+    def test_diff_images_match(self):
+        base = Image.effect_noise((32, 32), 60).convert("RGB")
+        baseline = self._save(base, "base.png")
+        actual = self._save(_noisy_copy(base, self.rng, 0.5, 30), "actual.png")
+        for engine in visual_diff.DIFF_ENGINES:
+            compare_images(baseline, actual, engine=engine, diff_output_path=self.dir / f"{engine}.png")
+        with Image.open(self.dir / "python.png") as ref, Image.open(self.dir / "numpy.png") as vec:
+            self.assertEqual(ref.tobytes(), vec.tobytes())
+
+    def test_failing_check_writes_diff_without_recomparing(self):
+        base = Image.effect_noise((32, 32), 60).convert("RGB")
+        baseline = self._save(base, "base.png")
+        actual = self._save(_noisy_copy(base, self.rng, 0.5, 60), "actual.png")
+        result = compare_images(baseline, actual)
+        diff_path = self.dir / "diffs" / "base_diff.png"
+
+        original = visual_diff.compare_images
+        visual_diff.compare_images = lambda *a, **k: self.fail("images were compared twice")
+        try:
+            passed, _message = check_within_threshold(result, 0.0, diff_output_path=diff_path)
+        finally:
+            visual_diff.compare_images = original
+
+        self.assertFalse(passed)
+        self.assertTrue(diff_path.is_file())
+
+    def test_passing_check_skips_diff(self):
+        path = self._save(Image.effect_noise((16, 16), 40).convert("RGB"), "a.png")
+        diff_path = self.dir / "a_diff.png"
+        passed, _message = check_within_threshold(
+            compare_images(path, path), 0.01, diff_output_path=diff_path
+        )
+        self.assertTrue(passed)
+        self.assertFalse(diff_path.exists())
+
+    def test_identical_pixels_decided_by_exact_tier(self):
+        img = Image.effect_noise((48, 32), 40).convert("RGB")
+        baseline = self._save(img, "a.png")
+        actual = self._save(img, "b.png")
+        for engine in visual_diff.DIFF_ENGINES:
+            result = compare_images(baseline, actual, engine=engine, fast_paths=True)
+            self.assertEqual((result.tier, result.diff_ratio), ("exact", 0.0))
+
+    def test_small_localized_change_runs_the_full_diff(self):
+        # A 200x40 box barely moves a downsampled dHash, so only the full diff sees it.
+        img = Image.open(VERIFICATION_DIR / "baselines" / "vfx_effects_screenshot.png").convert("RGB")
+        baseline = self._save(img, "a.png")
+        boxed = img.copy()
+        boxed.paste((255, 255, 255), (40, 40, 240, 80))
+        actual = self._save(boxed, "b.png")
+        tiered = compare_images(baseline, actual, fast_paths=True)
+        full = compare_images(baseline, actual)
+        self.assertEqual(tiered.tier, "full")
+        self.assertGreater(tiered.diff_ratio, 0.0)
+        self.assertEqual(tiered.diff_ratio, full.diff_ratio)
+
+    def test_real_change_escalates_to_full_diff(self):
+        base = Image.effect_noise((48, 32), 60).convert("RGB")
+        baseline = self._save(base, "a.png")
+        actual = self._save(_noisy_copy(base, self.rng, 0.6, 80), "b.png")
+        tiered = compare_images(baseline, actual, fast_paths=True)
+        full = compare_images(baseline, actual)
+        self.assertEqual(tiered.tier, "full")
+        self.assertEqual(tiered.diff_ratio, full.diff_ratio)
+
+    def test_unknown_engine(self):
+        path = self._save(Image.new("RGB", (4, 4)), "a.png")
+        with self.assertRaises(ValueError):
+            compare_images(path, path, engine="gpu")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""On-disk cache of decoded baseline pixels, keyed by each PNG's SHA-256.
+
+Entries are plain `.npy` files (height x width x 3 uint8) named
+`<baseline name>.<sha256>.npy`, so repeat runs memory-map them read-only
+instead of decoding PNGs. Looking up a baseline evicts any entry for the same
+name whose hash no longer matches; prune() also drops entries for baselines
+that were deleted.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - guarded by visual_diff.require_pillow
+    Image = None
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - cache requires the numpy diff engine
+    np = None
+
+from visual_manifest import BASELINE_CACHE_DIR
+
+
+def file_sha256(path: Path | str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_path(cache_dir: Path, baseline: Path, sha: str) -> Path:
+    return cache_dir / f"{baseline.name}.{sha}.npy"
+
+
+def _stale_entries(cache_dir: Path, baseline: Path, keep: Path | None):
+    for entry in cache_dir.glob(f"{baseline.name}.*.npy"):
+        if entry != keep:
+            yield entry
+
+
+def cache_available() -> bool:
+    return Image is not None and np is not None
+
+
+def store_baseline_array(baseline_path: Path | str, cache_dir: Path | None = None) -> Path:
+    """Decode a baseline PNG into the cache and evict its stale entries."""
+    cache_dir = cache_dir or BASELINE_CACHE_DIR
+    baseline = Path(baseline_path)
+    return _store(baseline, _entry_path(cache_dir, baseline, file_sha256(baseline)), cache_dir)
+
+
+def _store(baseline: Path, entry: Path, cache_dir: Path) -> Path:
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    with Image.open(baseline) as img:
+        rgb = img.convert("RGB")
+    width, height = rgb.size
+    pixels = np.frombuffer(rgb.tobytes(), dtype=np.uint8).reshape(height, width, 3)
+
+    # Write-then-rename so a parallel reader never maps a half-written file.
+    tmp = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as handle:
+        np.save(handle, pixels)
+    os.replace(tmp, entry)
+
+    for stale in _stale_entries(cache_dir, baseline, entry):
+        stale.unlink(missing_ok=True)
+    return entry
+
+
+def load_baseline_array(baseline_path: Path | str, cache_dir: Path | None = None):
+    """Return the baseline's pixels as a read-only memory-mapped array."""
+    cache_dir = cache_dir or BASELINE_CACHE_DIR
+    baseline = Path(baseline_path)
+    entry = _entry_path(cache_dir, baseline, file_sha256(baseline))
+    if not entry.is_file():
+        _store(baseline, entry, cache_dir)
+    return np.load(entry, mmap_mode="r")
+
+
+def prune(baseline_paths, cache_dir: Path | None = None) -> int:
+    """Remove entries not matching the current hash of any listed baseline."""
+    cache_dir = cache_dir or BASELINE_CACHE_DIR
+    if not cache_dir.is_dir():
+        return 0
+    keep = set()
+    for path in map(Path, baseline_paths):
+        if path.is_file():
+            keep.add(_entry_path(cache_dir, path, file_sha256(path)))
+    removed = 0
+    for entry in cache_dir.glob("*.npy"):
+        if entry not in keep:
+            entry.unlink(missing_ok=True)
+            removed += 1
+    return removed
@@ -0,0 +1,362 @@
+"""Particle integration benchmark across the WASM, worker and JS paths.
+
+Visual particles are integrated by ParticleWorkerBridge.scheduleVisualIntegration
+along one of three routes: the off-thread particleIntegrator.worker.js, the
+WASM batch exports (batchIntegrateTrailParticles/batchIntegrateSimpleParticles)
+or the per-object JS updates. Which one runs depends on three thresholds:
+TRAIL_MIN_BATCH, AMBIENT_MIN_BATCH and WORKER_MIN_PARTICLES
+(src/modules/particleBatchCodec.js).
+
+This script forces each route through the page hook
+window.__PARTICLE_INTEGRATOR__ ('worker' | 'wasm' | 'js'; forced routes skip
+the thresholds) and sweeps fixed particle populations up to and past the batch
+capacities (trail 512, ambient 384, dust 200). For every point the game's own
+updateSharedVisuals runs once per animation frame on the real clock with the
+population held constant, and the script records:
+
+  - main_p50_ms / main_p95_ms: synchronous time of that call, i.e. what the
+    integration blocks the main thread for (pack/post/scatter for the worker)
+  - worker_p50_ms: integration time reported by the worker, off-thread
+  - blocking_ms: long-task blocking time (over 50 ms) per second of the point
+  - hit: share of frames that actually took the forced route (the worker
+    falls back to the main thread while two results are in flight)
+
+From the sweep it recommends each threshold as the smallest count from which
+the batched route stays faster than the per-object one at every larger count.
+
+Usage:
+  python3 verification/bench_particles.py [--families trail ambient dust mixed]
+                                          [--counts 8 16 ...] [--frames N]
+                                          [--json PATH]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from screenshot_utils import DETERMINISTIC_RNG_INIT  # noqa: E402
+from server import launch_browser, shared_dist_server  # noqa: E402
+from telemetry import percentile  # noqa: E402
+
+VERIFICATION_DIR = Path(__file__).parent
+REPO_ROOT = VERIFICATION_DIR.parent
+
+# Mirrors src/modules/particleBatchCodec.js and src/modules/WasmConstants.js.
+TRAIL_MIN_BATCH = 24
+AMBIENT_MIN_BATCH = 48
+WORKER_MIN_PARTICLES = 64
+TRAIL_BATCH_MAX = 512
+SIMPLE_BATCH_MAX = 384
+DUST_BATCH_MAX = 200
+
+PATHS = ("js", "wasm", "worker")
+# Share of a population that is (trail, ambient, dust) for each family.
+FAMILIES = {
+    "trail": (1.0, 0.0, 0.0),
+    "ambient": (0.0, 1.0, 0.0),
+    "dust": (0.0, 0.0, 1.0),
+    "mixed": (0.5, 0.3, 0.2),
+}
+# Sweeps stop a little past each family's batch capacity.
+FAMILY_LIMITS = {"trail": 640, "ambient": 480, "dust": 256, "mixed": 1024}
+DEFAULT_COUNTS = (8, 16, 24, 32, 48, 64, 96, 128, 192, 256, 320, 384, 448, 512, 640, 768, 1024)
+DEFAULT_WARMUP_FRAMES = 15
+DEFAULT_FRAMES = 60
+# Frames where the forced route did not run are excluded; points below this share are unreliable.
+MIN_HIT_RATE = 0.9
+LONG_TASK_MS = 50
+
+# Runs once per page: the real loop's own updateSharedVisuals becomes a no-op
+# so the benchmark is the only caller, and the game is paused so gameplay does
+# not add particles of its own. Dust has no pool, so one instance is kept as a
+# template for cloning.
+SETUP_JS = """
+() => {
+    const g = window.game;
+    const loop = g.systems.loop;
+    loop.updateSharedVisuals = () => {};
+    g.setQualityMode('high');
+    g.toggleDevPerfOverlay(true);
+    window.__dustTemplate = g.state.dustParticles[0];
+    if (!g.state.paused) g.togglePause();
+    window.__longTasks = [];
+    new PerformanceObserver((list) => {
+        for (const entry of list.getEntries()) window.__longTasks.push([entry.startTime, entry.duration]);
+    }).observe({ type: 'longtask', buffered: false });
+    return Boolean(window.__dustTemplate);
+}
+"""
+
+POINT_JS = """
+async ([path, trail, ambient, dust, warmup, frames, longTaskMs]) => {
+    const g = window.game;
+    const s = g.state;
+    const loop = g.systems.loop;
+    const integrate = Object.getPrototypeOf(loop).updateSharedVisuals;
+    const w = g.renderer.width;
+    const h = g.renderer.height;
+    const colors = ['#ff4fd8', '#4fd8ff', '#ffe14f', '#7dff4f'];
+
+    for (const p of s.particles) (p.isTrail ? g.trailPool : g.particlePool).release(p);
+    s.particles = [];
+    for (let i = 0; i < trail; i++) {
+        s.particles.push(g.trailPool.acquire(Math.random() * w, Math.random() * h, colors[i % 4], i % 3 === 0));
+    }
+    for (let i = 0; i < ambient; i++) {
+        s.particles.push(g.particlePool.acquire(
+            Math.random() * w, Math.random() * h, colors[i % 4], null, null, i % 2 ? 'aura' : 'ember'
+        ));
+    }
+    const template = window.__dustTemplate;
+    s.dustParticles = Array.from({ length: dust }, () => {
+        const d = Object.assign(Object.create(Object.getPrototypeOf(template)), template);
+        d.x = Math.random() * w;
+        d.y = Math.random() * h;
+        return d;
+    });
+
+    window.__PARTICLE_INTEGRATOR__ = path;
+    const nextFrame = () => new Promise((resolve) => requestAnimationFrame(resolve));
+    const rows = [];
+    let started = 0;
+    try {
+        for (let f = 0; f < warmup + frames; f++) {
+            if (f === warmup) {
+                window.__longTasks.length = 0;
+                started = performance.now();
+            }
+            // Keep the population constant: nothing may expire mid-point.
+            for (const p of s.particles) p.life = 1.0;
+            const t0 = performance.now();
+            integrate.call(loop, 16.67, 1.0);
+            const ms = performance.now() - t0;
+            const m = s.perfMetrics;
+            if (f >= warmup) {
+                rows.push([ms, m.particleIntegratorPath, Boolean(m.particleMainWasm), m.particleWorkerMs || 0]);
+            }
+            await nextFrame();
+        }
+    } finally {
+        window.__PARTICLE_INTEGRATOR__ = undefined;
+    }
+    const elapsed = performance.now() - started;
+    const blocking = window.__longTasks
+        .filter(([start]) => start >= started)
+        .reduce((sum, [, duration]) => sum + Math.max(0, duration - longTaskMs), 0);
+    return { rows, elapsed, blocking };
+}
+"""
+
+
+def split_population(family: str, count: int) -> tuple[int, int, int]:
+    """(trail, ambient, dust) counts for `count` particles of `family`; rounding goes to the first kind."""
+    shares = FAMILIES[family]
+    parts = [int(count * share) for share in shares]
+    first = next(i for i, share in enumerate(shares) if share > 0)
+    parts[first] += count - sum(parts)
+    return parts[0], parts[1], parts[2]
+
+
+def counts_for(family: str, counts: list[int]) -> list[int]:
+    return [c for c in counts if c <= FAMILY_LIMITS[family]]
+
+
+def paths_for(family: str) -> tuple[str, ...]:
+    # Dust has no WASM kernel; 'wasm' would measure the JS path twice.
+    return ("js", "worker") if family == "dust" else PATHS
+
+
+def took_path(path: str, route: Optional[str], used_wasm: bool) -> bool:
+    if path == "worker":
+        return route == "worker"
+    return route == "main" and used_wasm == (path == "wasm")
+
+
+def summarize_point(path: str, outcome: dict[str, Any]) -> dict[str, Any]:
+    """Per-point statistics from the page's per-frame rows ([ms, route, usedWasm, workerMs])."""
+    rows = outcome.get("rows") or []
+    hits = [r for r in rows if took_path(path, r[1], r[2])]
+    main = [r[0] for r in hits]
+    worker = [r[3] for r in hits if r[3] > 0]
+    seconds = (outcome.get("elapsed") or 0) / 1000
+    return {
+        "frames": len(rows),
+        "hit": round(len(hits) / len(rows), 3) if rows else 0.0,
+        "main_p50_ms": round(statistics.median(main), 4) if main else None,
+        "main_p95_ms": round(percentile(main, 95), 4) if main else None,
+        "worker_p50_ms": round(statistics.median(worker), 4) if worker else None,
+        "blocking_ms": round(outcome.get("blocking", 0) / seconds, 2) if seconds else 0.0,
+    }
+
+
+def _cost(point: Optional[dict[str, Any]]) -> Optional[float]:
+    if not point or point.get("hit", 0) < MIN_HIT_RATE:
+        return None
+    return point.get("main_p50_ms")
+
+
+def crossover(
+    faster: dict[int, dict[str, Any]], slower: dict[int, dict[str, Any]], limit: Optional[int] = None
+) -> Optional[int]:
+    """Smallest count from which `faster` costs no more than `slower` at every larger measured count."""
+    counts = sorted(c for c in faster if c in slower and (limit is None or c <= limit))
+    candidate = None
+    for count in reversed(counts):
+        fast, slow = _cost(faster[count]), _cost(slower[count])
+        if fast is None or slow is None:
+            continue
+        if fast > slow:
+            break
+        candidate = count
+    return candidate
+
+
+def best_main(results: dict[str, dict[int, dict[str, Any]]]) -> dict[int, dict[str, Any]]:
+    """The cheaper of the forced JS and WASM main-thread routes at each count."""
+    best: dict[int, dict[str, Any]] = {}
+    for path in ("js", "wasm"):
+        for count, point in results.get(path, {}).items():
+            cost = _cost(point)
+            if cost is not None and (count not in best or cost < _cost(best[count])):
+                best[count] = point
+    return best
+
+
+def recommend(results: dict[str, dict[str, dict[int, dict[str, Any]]]]) -> dict[str, dict[str, Any]]:
+    """Threshold recommendations from a sweep; None when the data never shows a crossover."""
+    out = {}
+    if "trail" in results:
+        trail = results["trail"]
+        out["TRAIL_MIN_BATCH"] = {
+            "current": TRAIL_MIN_BATCH,
+            "recommended": crossover(trail.get("wasm", {}), trail.get("js", {}), TRAIL_BATCH_MAX),
+        }
+    if "ambient" in results:
+        ambient = results["ambient"]
+        out["AMBIENT_MIN_BATCH"] = {
+            "current": AMBIENT_MIN_BATCH,
+            "recommended": crossover(ambient.get("wasm", {}), ambient.get("js", {}), SIMPLE_BATCH_MAX),
+        }
+    if "mixed" in results:
+        mixed = results["mixed"]
+        out["WORKER_MIN_PARTICLES"] = {
+            "current": WORKER_MIN_PARTICLES,
+            "recommended": crossover(mixed.get("worker", {}), best_main(mixed)),
+        }
+    return out
+
+
+def run_family(page, family: str, counts: list[int], warmup: int, frames: int) -> dict[str, dict[int, dict[str, Any]]]:
+    results: dict[str, dict[int, dict[str, Any]]] = {path: {} for path in paths_for(family)}
+    for count in counts:
+        trail, ambient, dust = split_population(family, count)
+        for path in paths_for(family):
+            outcome = page.evaluate(POINT_JS, [path, trail, ambient, dust, warmup, frames, LONG_TASK_MS])
+            results[path][count] = summarize_point(path, outcome)
+    return results
+
+
+def _fmt(point: Optional[dict[str, Any]], key: str = "main_p50_ms") -> str:
+    if not point or point.get(key) is None:
+        return f"{'-':>10}"
+    flag = "" if point["hit"] >= MIN_HIT_RATE else "?"
+    return f"{point[key]:>9.3f}{flag or ' '}"
+
+
+def print_results(results: dict[str, dict[str, dict[int, dict[str, Any]]]]) -> None:
+    for family, paths in results.items():
+        print(f"\n=== {family}: main-thread ms per frame (p50) ===")
+        print(f"  {'count':>6}{'js':>10}{'wasm':>10}{'worker':>10}{'off-thr':>10}{'blocking':>10}")
+        counts = sorted({c for points in paths.values() for c in points})
+        for count in counts:
+            worker = paths.get("worker", {}).get(count)
+            blocking = max((p.get(count, {}).get("blocking_ms", 0) for p in paths.values()), default=0)
+            print(
+                f"  {count:>6}{_fmt(paths.get('js', {}).get(count))}{_fmt(paths.get('wasm', {}).get(count))}"
+                f"{_fmt(worker)}{_fmt(worker, 'worker_p50_ms')}{blocking:>8.1f}ms"
+            )
+    print(f"  ? = the forced route ran on fewer than {MIN_HIT_RATE:.0%} of frames")
+
+
+def print_recommendations(recommendations: dict[str, dict[str, Any]]) -> None:
+    print("\n=== Threshold recommendations ===")
+    for name, r in recommendations.items():
+        if r["recommended"] is None:
+            print(f"  {name}: keep {r['current']} (no stable crossover in the sweep)")
+        elif r["recommended"] == r["current"]:
+            print(f"  {name}: {r['current']} matches the data")
+        else:
+            print(f"  {name}: {r['current']} -> {r['recommended']}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--families", nargs="*", choices=sorted(FAMILIES), default=list(FAMILIES), help="populations to sweep"
+    )
+    parser.add_argument(
+        "--counts", type=int, nargs="*", default=list(DEFAULT_COUNTS), help="particle counts (capped per family)"
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=DEFAULT_WARMUP_FRAMES,
+        help=f"unmeasured frames per point (default: {DEFAULT_WARMUP_FRAMES})",
+    )
+    parser.add_argument(
+        "--frames", type=int, default=DEFAULT_FRAMES, help=f"measured frames per point (default: {DEFAULT_FRAMES})"
+    )
+    parser.add_argument("--json", type=Path, default=None, help="write the results here")
+    return parser.parse_args(argv)
+
+
+def run(argv=None) -> int:
+    from playwright.sync_api import sync_playwright
+
+    args = parse_args(argv)
+    results: dict[str, dict[str, dict[int, dict[str, Any]]]] = {}
+    errors: list[str] = []
+
+    with shared_dist_server(REPO_ROOT / "dist") as server:
+        with sync_playwright() as playwright:
+            browser = launch_browser(playwright)
+            try:
+                context = browser.new_context(viewport={"width": 1280, "height": 800}, device_scale_factor=1)
+                context.add_init_script(DETERMINISTIC_RNG_INIT)
+                page = context.new_page()
+                page.on("pageerror", lambda exc: errors.append(str(exc)))
+                page.goto(server.url)
+                page.wait_for_selector("#gameCanvas")
+                page.click("#startBtn")
+                page.wait_for_function("() => window.game?.state?.active === true")
+                if not page.evaluate(SETUP_JS):
+                    print("No dust particles at this quality; dust populations will be empty.")
+                for family in args.families:
+                    results[family] = run_family(
+                        page, family, counts_for(family, args.counts), args.warmup, args.frames
+                    )
+                context.close()
+            finally:
+                browser.close()
+
+    print_results(results)
+    recommendations = recommend(results)
+    print_recommendations(recommendations)
+    for error in errors:
+        print(f"  PAGE ERROR — {error}")
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"results": results, "recommendations": recommendations}
+        args.json.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"JSON results: {args.json}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
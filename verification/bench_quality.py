@@ -0,0 +1,275 @@
+"""Adaptive-quality convergence benchmark for QualitySystem.
+
+QualitySystem moves three knobs in response to frame time: renderQuality
+(updateAdaptiveQuality, from smoothed FPS with a cooldown) and the
+adaptive overrides particleStrideBoost and effectScale
+(updateFrameTimeAdaptive, against ADAPTIVE_FRAME_BUDGET). This script checks
+that they settle instead of oscillating.
+
+For each CPU throttling level (CDP Emulation.setCPUThrottlingRate) a fresh
+page starts a session in "auto" quality and runs the same heavy scene: an
+in-page driver fires a spore and spawns a seeded particle burst and
+shockwave every SCENE_INTERVAL_MS, so no CDP round trips compete with the
+frames. telemetry.py samples every frame on the real clock. From those rows
+the benchmark reports, per level:
+
+  - quality_flips and quality_settle_ms: how often renderQuality changed and
+    when it changed for the last time (from the start of the scene)
+  - override_reversals and override_settle_ms: direction changes of
+    particleStrideBoost/effectScale (up-down-up is oscillation) and when they
+    last moved
+  - steady_p50_ms / steady_p95_ms: frame time over the final
+    --steady-fraction of the run, once everything should have converged
+
+Each level is checked against verification/quality-thresholds.json. A
+"default" block applies to every level and "throttle" entries override it
+per rate. Exit status is 1 when any threshold is exceeded.
+
+Usage:
+  python3 verification/bench_quality.py [--rates 1 2 4 6] [--seconds S]
+                                        [--thresholds PATH] [--json PATH]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from screenshot_utils import DETERMINISTIC_RNG_INIT  # noqa: E402
+from server import launch_browser, shared_dist_server  # noqa: E402
+from telemetry import QUALITY_LEVELS, Telemetry, percentile  # noqa: E402
+
+VERIFICATION_DIR = Path(__file__).parent
+REPO_ROOT = VERIFICATION_DIR.parent
+DEFAULT_THRESHOLDS = VERIFICATION_DIR / "quality-thresholds.json"
+DEFAULT_RATES = (1, 2, 4, 6)
+DEFAULT_SECONDS = 20
+DEFAULT_STEADY_FRACTION = 1 / 3
+SCENE_INTERVAL_MS = 100
+# Mirrors GAME_CONFIG.lanes (src/modules/Constants.js).
+LANES = 7
+# Override changes smaller than this are float noise, not movement.
+OVERRIDE_EPSILON = 1e-6
+
+# Keeps the scene heavy and identical at every throttling level: Math.random
+# is seeded by DETERMINISTIC_RNG_INIT, and the driver runs on page timers.
+HEAVY_SCENE_JS = """
+([intervalMs, lanes]) => {
+    const g = window.game;
+    g.setQualityMode('auto');
+    let lane = 0;
+    const colors = ['#ff4fd8', '#4fd8ff', '#ffe14f', '#7dff4f'];
+    window.__heavyScene = setInterval(() => {
+        if (!g.state.active) return;
+        lane = (lane + 3) % lanes;
+        g.setTargetLane(lane);
+        g.shootSpore();
+        const x = Math.random() * g.renderer.width;
+        const y = Math.random() * g.renderer.height;
+        const color = colors[lane % colors.length];
+        g.createParticles(x, y, color, 60);
+        g.createShockwave(x, y, color);
+    }, intervalMs);
+}
+"""
+STOP_SCENE_JS = "() => clearInterval(window.__heavyScene)"
+
+
+def load_thresholds(path: Path | str) -> dict[str, Any]:
+    """Parse the thresholds file; a missing file means nothing is gated."""
+    path = Path(path)
+    if not path.is_file():
+        return {}
+    thresholds = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(thresholds, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    return thresholds
+
+
+def thresholds_for(thresholds: dict[str, Any], rate: float) -> dict[str, float]:
+    limits = dict(thresholds.get("default") or {})
+    limits.update((thresholds.get("throttle") or {}).get(f"{rate:g}") or {})
+    return limits
+
+
+def _last_change(times: list[float], values: list[Any], start: float) -> tuple[int, float]:
+    """(number of changes, ms from `start` to the last one; 0 when nothing changed)."""
+    changes, last = 0, start
+    for index in range(1, len(values)):
+        if values[index] != values[index - 1]:
+            changes += 1
+            last = times[index]
+    return changes, last - start
+
+
+def _reversals(values: list[float]) -> tuple[int, Optional[int]]:
+    """Direction changes in a series, and the index of its last movement."""
+    reversals, direction, last_move = 0, 0, None
+    for index in range(1, len(values)):
+        delta = values[index] - values[index - 1]
+        if abs(delta) <= OVERRIDE_EPSILON:
+            continue
+        last_move = index
+        step = 1 if delta > 0 else -1
+        if direction and step != direction:
+            reversals += 1
+        direction = step
+    return reversals, last_move
+
+
+def analyze(
+    table: dict[str, list[Optional[float]]], steady_fraction: float = DEFAULT_STEADY_FRACTION
+) -> dict[str, Any]:
+    """Convergence metrics from one scene's telemetry rows."""
+    rows = [i for i, t in enumerate(table["t"]) if t is not None]
+    if not rows:
+        return {"frames": 0}
+    times = [table["t"][i] for i in rows]
+    start, end = times[0], times[-1]
+    quality = [table["quality"][i] for i in rows]
+    stride = [table["particleStrideBoost"][i] or 0.0 for i in rows]
+    effect = [table["effectScale"][i] if table["effectScale"][i] is not None else 1.0 for i in rows]
+
+    quality_flips, quality_settle = _last_change(times, quality, start)
+    stride_reversals, stride_last = _reversals(stride)
+    effect_reversals, effect_last = _reversals(effect)
+    moved = [i for i in (stride_last, effect_last) if i is not None]
+    override_settle = times[max(moved)] - start if moved else 0.0
+
+    steady_from = end - (end - start) * steady_fraction
+    steady = [table["frameMs"][i] for i in rows if table["t"][i] >= steady_from and table["frameMs"][i] is not None]
+    final = quality[-1]
+    return {
+        "frames": len(rows),
+        "duration_ms": round(end - start, 1),
+        "quality_flips": quality_flips,
+        "quality_settle_ms": round(quality_settle, 1),
+        "final_quality": QUALITY_LEVELS[int(final)] if final is not None and final >= 0 else None,
+        "override_reversals": stride_reversals + effect_reversals,
+        "override_settle_ms": round(override_settle, 1),
+        "final_stride_boost": round(stride[-1], 3),
+        "final_effect_scale": round(effect[-1], 3),
+        "steady_p50_ms": round(statistics.median(steady), 3) if steady else None,
+        "steady_p95_ms": round(percentile(steady, 95), 3) if steady else None,
+        # Settled when neither knob moved during the steady window.
+        "settled": max(quality_settle, override_settle) <= (steady_from - start),
+    }
+
+
+def check(result: dict[str, Any], limits: dict[str, float]) -> list[str]:
+    """Threshold names are metric names prefixed with max_ (e.g. max_quality_flips)."""
+    failures = []
+    for key, limit in sorted(limits.items()):
+        if key == "require_settled":
+            if limit and not result.get("settled"):
+                failures.append("knobs were still moving in the steady window")
+            continue
+        metric = key.removeprefix("max_")
+        value = result.get(metric)
+        if value is not None and value > limit:
+            failures.append(f"{metric} {value:g} > {limit:g}")
+    return failures
+
+
+def run_level(browser, url: str, rate: float, seconds: float) -> dict[str, list[Optional[float]]]:
+    context = browser.new_context(viewport={"width": 1280, "height": 800}, device_scale_factor=1)
+    try:
+        context.add_init_script(DETERMINISTIC_RNG_INIT)
+        telemetry = Telemetry()
+        telemetry.install(context)
+        page = context.new_page()
+        cdp = context.new_cdp_session(page)
+        page.goto(url)
+        page.wait_for_selector("#gameCanvas")
+        page.click("#startBtn")
+        page.wait_for_function("() => window.game?.state?.active === true")
+        cdp.send("Emulation.setCPUThrottlingRate", {"rate": rate})
+        page.evaluate(HEAVY_SCENE_JS, [SCENE_INTERVAL_MS, LANES])
+        telemetry.discard(page)
+        telemetry.scenario(page, "scene")
+        page.wait_for_timeout(seconds * 1000)
+        page.evaluate(STOP_SCENE_JS)
+        telemetry.drain(page)
+        cdp.send("Emulation.setCPUThrottlingRate", {"rate": 1})
+        return telemetry.data.get("scene") or {}
+    finally:
+        context.close()
+
+
+def print_results(results: dict[str, dict[str, Any]]) -> None:
+    print(
+        f"  {'throttle':<10}{'flips':>7}{'q settle':>10}{'reversals':>11}{'o settle':>10}"
+        f"{'steady p50':>12}{'steady p95':>12}  final"
+    )
+    for rate, r in results.items():
+        if not r.get("frames"):
+            print(f"  {rate:<10}  no frames sampled")
+            continue
+        print(
+            f"  {rate:<10}{r['quality_flips']:>7}{r['quality_settle_ms'] / 1000:>9.1f}s"
+            f"{r['override_reversals']:>11}{r['override_settle_ms'] / 1000:>9.1f}s"
+            f"{r['steady_p50_ms'] or 0:>10.1f}ms{r['steady_p95_ms'] or 0:>10.1f}ms"
+            f"  {r['final_quality']}, stride +{r['final_stride_boost']:g}, effects x{r['final_effect_scale']:g}"
+            f"{'' if r['settled'] else ' (not settled)'}"
+        )
+        for failure in r.get("failures", []):
+            print(f"    OVER THRESHOLD — {failure}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rates",
+        type=float,
+        nargs="*",
+        default=list(DEFAULT_RATES),
+        help="CPU throttling rates to test (default: 1 2 4 6)",
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=DEFAULT_SECONDS, help=f"scene length per rate (default: {DEFAULT_SECONDS})"
+    )
+    parser.add_argument(
+        "--steady-fraction",
+        type=float,
+        default=DEFAULT_STEADY_FRACTION,
+        help="final share of the run treated as steady state (default: 0.33)",
+    )
+    parser.add_argument("--thresholds", type=Path, default=DEFAULT_THRESHOLDS, help="thresholds JSON")
+    parser.add_argument("--json", type=Path, default=None, help="write the results here")
+    return parser.parse_args(argv)
+
+
+def run(argv=None) -> int:
+    from playwright.sync_api import sync_playwright
+
+    args = parse_args(argv)
+    thresholds = load_thresholds(args.thresholds)
+    results: dict[str, dict[str, Any]] = {}
+
+    with shared_dist_server(REPO_ROOT / "dist") as server:
+        with sync_playwright() as playwright:
+            browser = launch_browser(playwright)
+            try:
+                for rate in args.rates:
+                    table = run_level(browser, server.url, rate, args.seconds)
+                    result = analyze(table, args.steady_fraction) if table else {"frames": 0}
+                    result["failures"] = check(result, thresholds_for(thresholds, rate)) if table else []
+                    results[f"{rate:g}x"] = result
+            finally:
+                browser.close()
+
+    print_results(results)
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"JSON results: {args.json}")
+    return 1 if any(r["failures"] for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,298 @@
+"""Replay-driven simulation throughput benchmark.
+
+ReplayPlayer.runToCompletion() steps the game in fixed 16 ms ticks with no
+rendering budget, which makes a replay a deterministic CPU workload for
+GameLoop, CollisionSystem and the particle systems. This script replays the
+golden campaign fixture and synthetic long endless-mode sessions in headless
+Chromium on the virtual clock (so nothing but the replay runs) and measures,
+per workload:
+
+  - simulated ms per wall ms (how much faster than real time the sim runs)
+  - ticks per second (game.update() calls per wall second)
+  - heap growth: CDP Runtime.getHeapUsage after a forced GC, before vs after
+    the run (retained growth), plus performance.memory's peak-ish JS heap
+
+Each workload gets a warm-up run and then --repeats timed runs; medians are
+reported. Results are appended to a JSON history keyed by git commit, and the
+latest run is compared with the previous entry. --fail-on-regression exits 1
+when a workload's throughput drops by more than --threshold. The history
+defaults to the git-ignored .cache/bench/; set --history or
+BENCH_REPLAY_HISTORY to a path that persists between runs, for example one
+restored by the CI cache.
+
+Usage:
+  python3 verification/bench_replay.py [--repeats N] [--minutes M] [--history PATH]
+                                       [--threshold 0.15] [--fail-on-regression]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from replay_codec import load_replay  # noqa: E402
+from replay_corpus import simulation_budget  # noqa: E402
+from screenshot_utils import VIRTUAL_CLOCK_INIT  # noqa: E402
+from server import launch_browser, shared_dist_server  # noqa: E402
+
+VERIFICATION_DIR = Path(__file__).parent
+REPO_ROOT = VERIFICATION_DIR.parent
+GOLDEN_PATH = VERIFICATION_DIR / "fixtures" / "golden_campaign_l1.ccreplay"
+DEFAULT_HISTORY = REPO_ROOT / ".cache" / "bench" / "replay-throughput.json"
+# .cache/ is git-ignored and starts empty on CI runners; point this (or --history)
+# at a path the CI cache or artifact store restores between runs.
+HISTORY_ENV = "BENCH_REPLAY_HISTORY"
+HISTORY_VERSION = 1
+MAX_HISTORY = 200
+DEFAULT_REPEATS = 5
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_SYNTHETIC_MINUTES = (2, 5)
+ENDLESS_LANES = 7
+SYNTHETIC_FIRE_EVERY_MS = 400
+
+# Kept before VIRTUAL_CLOCK_INIT replaces performance.now, so runs are timed in
+# real milliseconds while the page's own rAF loop stays frozen between runs.
+REAL_CLOCK_INIT = "window.__benchNow = performance.now.bind(performance);"
+
+# Counts game.update() calls and the simulated time they cover, so a session
+# that ends early (game over) does not inflate the throughput figure.
+BENCH_REPLAY_JS = """
+([replay, maxMs]) => {
+    const g = window.game;
+    if (!g?.replay?.player) {
+        throw new Error('Replay API not available on window.game');
+    }
+    const update = g.update;
+    let ticks = 0;
+    let simMs = 0;
+    g.update = function countedUpdate(dt) {
+        ticks++;
+        simMs += dt;
+        return update.call(this, dt);
+    };
+    const heap = () => performance.memory ? performance.memory.usedJSHeapSize : null;
+    const heapBefore = heap();
+    const now = window.__benchNow;
+    const started = now();
+    try {
+        g.replay.player.load(replay);
+        g.replay.player.runToCompletion(g, maxMs);
+    } finally {
+        g.update = update;
+    }
+    const wallMs = now() - started;
+    return {
+        wallMs,
+        simMs,
+        ticks,
+        score: g.state.score,
+        active: g.state.active,
+        jsHeapBefore: heapBefore,
+        jsHeapAfter: heap(),
+    };
+}
+"""
+
+
+def synthetic_endless_replay(minutes: float, seed: int = 1) -> dict[str, Any]:
+    """A long endless-mode session that aims at a seeded-random lane and fires at a steady rate."""
+    rng = random.Random(seed)
+    events: list[dict[str, Any]] = [{"t": 0, "type": "start"}]
+    for t in range(SYNTHETIC_FIRE_EVERY_MS, int(minutes * 60_000), SYNTHETIC_FIRE_EVERY_MS):
+        events.append({"t": t, "type": "aim", "lane": rng.randrange(ENDLESS_LANES)})
+        events.append({"t": t, "type": "fire"})
+    return {
+        "version": 1,
+        "seed": seed,
+        "config": {"gameMode": "endless", "graphics": "high", "levelIndex": 0},
+        "events": events,
+    }
+
+
+def workloads(synthetic_minutes: list[float]) -> dict[str, dict[str, Any]]:
+    loads = {"golden_campaign_l1": load_replay(GOLDEN_PATH)}
+    for minutes in synthetic_minutes:
+        loads[f"endless_{minutes:g}min"] = synthetic_endless_replay(minutes)
+    return loads
+
+
+def _retained_heap(cdp) -> int:
+    cdp.send("HeapProfiler.collectGarbage")
+    return int(cdp.send("Runtime.getHeapUsage")["usedSize"])
+
+
+def measure(page, cdp, replay: dict[str, Any]) -> dict[str, Any]:
+    retained_before = _retained_heap(cdp)
+    raw = page.evaluate(BENCH_REPLAY_JS, [replay, simulation_budget(replay)])
+    retained_after = _retained_heap(cdp)
+    wall = max(raw["wallMs"], 1e-6)
+    return {
+        "wall_ms": raw["wallMs"],
+        "sim_ms": raw["simMs"],
+        "ticks": raw["ticks"],
+        "score": raw["score"],
+        "ended_early": not raw["active"],
+        "sim_per_wall": raw["simMs"] / wall,
+        "ticks_per_second": raw["ticks"] * 1000 / wall,
+        "retained_heap_growth": retained_after - retained_before,
+        "js_heap_growth": (
+            raw["jsHeapAfter"] - raw["jsHeapBefore"] if raw["jsHeapBefore"] is not None else None
+        ),
+    }
+
+
+def summarize(samples: list[dict[str, Any]]) -> dict[str, Any]:
+    """Medians over the timed runs, plus the spread of the headline metric."""
+    ratios = [s["sim_per_wall"] for s in samples]
+    summary = {
+        key: statistics.median(s[key] for s in samples)
+        for key in ("wall_ms", "sim_ms", "ticks", "sim_per_wall", "ticks_per_second", "retained_heap_growth")
+    }
+    js_growth = [s["js_heap_growth"] for s in samples if s["js_heap_growth"] is not None]
+    summary["js_heap_growth"] = statistics.median(js_growth) if js_growth else None
+    summary["sim_per_wall_min"] = min(ratios)
+    summary["sim_per_wall_max"] = max(ratios)
+    summary["score"] = samples[-1]["score"]
+    summary["ended_early"] = any(s["ended_early"] for s in samples)
+    summary["repeats"] = len(samples)
+    return summary
+
+
+def git_revision() -> dict[str, Any]:
+    def git(*args):
+        result = subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "src"))}
+
+
+def load_history(path: Path) -> list[dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return []
+    if not isinstance(data, dict) or data.get("version") != HISTORY_VERSION:
+        return []
+    return data.get("runs", [])
+
+
+def save_history(path: Path, runs: list[dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps({"version": HISTORY_VERSION, "runs": runs[-MAX_HISTORY:]}, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def find_regressions(
+    current: dict[str, dict[str, Any]], previous: Optional[dict[str, Any]], threshold: float
+) -> list[str]:
+    """Workloads whose median sim_per_wall fell more than `threshold` below the previous run."""
+    if not previous:
+        return []
+    regressions = []
+    for name, result in current.items():
+        before = previous["results"].get(name)
+        if not before or not before.get("sim_per_wall"):
+            continue
+        change = result["sim_per_wall"] / before["sim_per_wall"] - 1
+        if change < -threshold:
+            regressions.append(
+                f"{name}: {result['sim_per_wall']:.1f}x real time, was {before['sim_per_wall']:.1f}x "
+                f"({change:+.0%}) at {previous.get('commit') or 'unknown commit'}"
+            )
+    return regressions
+
+
+def _mb(value: Optional[float]) -> str:
+    return f"{value / (1024 * 1024):+8.2f} MB" if value is not None else f"{'-':>11}"
+
+
+def print_results(results: dict[str, dict[str, Any]], previous: Optional[dict[str, Any]]) -> None:
+    print(f"  {'workload':<22}{'sim/wall':>10}{'ticks/s':>10}{'retained':>12}{'js heap':>12}{'vs prev':>9}")
+    for name, r in results.items():
+        before = (previous or {}).get("results", {}).get(name, {}).get("sim_per_wall")
+        delta = f"{r['sim_per_wall'] / before - 1:+.0%}" if before else "-"
+        print(
+            f"  {name:<22}{r['sim_per_wall']:>9.1f}x{r['ticks_per_second']:>10.0f}"
+            f"{_mb(r['retained_heap_growth']):>12}{_mb(r['js_heap_growth']):>12}{delta:>9}"
+        )
+        if r["ended_early"]:
+            print(f"    (session was over before the run finished; {r['sim_ms'] / 1000:.0f}s simulated)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", "-n", type=int, default=DEFAULT_REPEATS, help="timed runs per workload")
+    parser.add_argument(
+        "--minutes",
+        type=float,
+        nargs="*",
+        default=list(DEFAULT_SYNTHETIC_MINUTES),
+        help="lengths of the synthetic endless replays (default: 2 5)",
+    )
+    parser.add_argument(
+        "--history",
+        type=Path,
+        default=Path(os.environ.get(HISTORY_ENV) or DEFAULT_HISTORY),
+        help=f"JSON history file (default: ${HISTORY_ENV} or .cache/bench/replay-throughput.json)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="relative sim/wall drop that counts as a regression (default: 0.15)",
+    )
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 when a regression is found")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    return parser.parse_args(argv)
+
+
+def run(argv=None) -> int:
+    from playwright.sync_api import sync_playwright
+
+    args = parse_args(argv)
+    loads = workloads(args.minutes)
+    results: dict[str, dict[str, Any]] = {}
+
+    with shared_dist_server(REPO_ROOT / "dist") as server:
+        with sync_playwright() as playwright:
+            browser = launch_browser(playwright)
+            context = browser.new_context(viewport={"width": 1280, "height": 800})
+            context.add_init_script(REAL_CLOCK_INIT)
+            context.add_init_script(VIRTUAL_CLOCK_INIT)
+            page = context.new_page()
+            cdp = context.new_cdp_session(page)
+            page.goto(server.url)
+            page.wait_for_selector("#gameCanvas")
+            page.wait_for_function("() => Boolean(window.game?.replay?.player)")
+
+            for name, replay in loads.items():
+                measure(page, cdp, replay)  # warm-up: JIT tiers, wasm compilation, pools
+                samples = [measure(page, cdp, replay) for _ in range(args.repeats)]
+                results[name] = summarize(samples)
+            browser.close()
+
+    history = load_history(args.history)
+    previous = history[-1] if history else None
+    print_results(results, previous)
+    regressions = find_regressions(results, previous, args.threshold)
+    for line in regressions:
+        print(f"  REGRESSION — {line}")
+
+    if not args.no_save:
+        entry = {**git_revision(), "recordedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+        save_history(args.history, [*history, {**entry, "results": results}])
+        print(f"History: {args.history} ({min(len(history) + 1, MAX_HISTORY)} run(s))")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
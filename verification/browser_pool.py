@@ -0,0 +1,171 @@
+"""Warm pool of headless Chromium instances that verification scripts attach to over CDP.
+
+Used by `run_all.py --jobs N`: each worker slot leases one browser, exports its
+endpoint through server.SHARED_CDP_ENV, and the script's launch_browser() call
+connects to it instead of cold-launching Chromium.
+"""
+from __future__ import annotations
+
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from server import CHROMIUM_ARGS
+
+DEVTOOLS_PREFIX = "DevTools listening on "
+
+# Flags Playwright adds to its own launches; keeps pooled browsers behaving the same.
+POOL_ARGS = [
+    "--headless=new",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--mute-audio",
+    "--hide-scrollbars",
+    "--remote-debugging-port=0",
+]
+
+
+def chromium_executable() -> str:
+    """Path of the Chromium build installed by `python3 -m playwright install chromium`."""
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        return p.chromium.executable_path
+
+
+class PooledBrowser:
+    """One Chromium process with its own profile dir and a CDP websocket endpoint."""
+
+    def __init__(self, executable: str, ready_timeout: float):
+        self.executable = executable
+        self.ready_timeout = ready_timeout
+        self.profile_dir: str | None = None
+        self.process: subprocess.Popen | None = None
+        self.endpoint: str | None = None
+
+    def start(self) -> "PooledBrowser":
+        self.profile_dir = tempfile.mkdtemp(prefix="cc-verify-chromium-")
+        self.process = subprocess.Popen(
+            [
+                self.executable,
+                *POOL_ARGS,
+                *CHROMIUM_ARGS,
+                f"--user-data-dir={self.profile_dir}",
+                "about:blank",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        ready = threading.Event()
+        threading.Thread(target=self._watch_stderr, args=(ready,), daemon=True).start()
+        if not ready.wait(self.ready_timeout) or self.endpoint is None:
+            self.stop()
+            raise RuntimeError(
+                f"Chromium did not expose a DevTools endpoint within {self.ready_timeout}s"
+            )
+        return self
+
+    def _watch_stderr(self, ready: threading.Event) -> None:
+        # Keep draining after the endpoint line so Chromium never blocks on a full pipe.
+        for line in self.process.stderr:
+            if not ready.is_set() and line.startswith(DEVTOOLS_PREFIX):
+                self.endpoint = line[len(DEVTOOLS_PREFIX):].strip()
+                ready.set()
+        ready.set()
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
+        if self.profile_dir is not None:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+        self.endpoint = None
+
+
+class BrowserPool:
+    """Fixed-size pool of warm browsers; lease() hands out one endpoint at a time.
+
+    A browser that dies and cannot be restarted is dropped, so the pool shrinks
+    instead of handing the dead instance to the next lease.
+    """
+
+    # How often a waiting lease() rechecks that the pool still has browsers.
+    poll_interval = 0.5
+
+    def __init__(self, size: int, ready_timeout: float = 15):
+        self.size = size
+        self.ready_timeout = ready_timeout
+        self._browsers: list[PooledBrowser] = []
+        self._idle: queue.Queue[PooledBrowser] = queue.Queue()
+        self._lock = threading.Lock()
+
+    def start(self) -> "BrowserPool":
+        executable = chromium_executable()
+        try:
+            for _ in range(self.size):
+                browser = PooledBrowser(executable, self.ready_timeout).start()
+                self._browsers.append(browser)
+                self._idle.put(browser)
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    @contextmanager
+    def lease(self):
+        """Yield a CDP endpoint for exclusive use; restarts the browser if a script killed it.
+
+        If the restart fails, the browser is dropped from the pool and the error
+        is raised to the caller.
+        """
+        browser = self._take()
+        if not browser.alive():
+            browser.stop()
+            try:
+                browser.start()
+            except Exception:
+                browser.stop()
+                with self._lock:
+                    self._browsers.remove(browser)
+                raise
+        try:
+            yield browser.endpoint
+        finally:
+            self._idle.put(browser)
+
+    def _take(self) -> PooledBrowser:
+        while True:
+            try:
+                return self._idle.get(timeout=self.poll_interval)
+            except queue.Empty:
+                with self._lock:
+                    if not self._browsers:
+                        raise RuntimeError("No browsers left in the pool; every restart failed") from None
+
+    def __len__(self) -> int:
+        return len(self._browsers)
+
+    def stop(self) -> None:
+        with self._lock:
+            for browser in self._browsers:
+                browser.stop()
+            self._browsers.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,389 @@
+"""Opt-in CPU profiling for verification scripts over CDP.
+
+When PROFILE_ENV names a directory (`run_all.py --profile` sets it), the
+browser returned by server.launch_browser() is wrapped in ProfiledBrowser.
+Every page a script opens then runs under the V8 sampling profiler
+(Profiler.start), and the first page is also traced with Chromium tracing
+(browser.start_tracing). When the script closes its context or browser the
+profiles are stopped and written out:
+
+  <dir>/<script>-<n>.cpuprofile   open in Chrome DevTools > Performance
+  <dir>/<script>.trace.json       open in chrome://tracing or Perfetto
+  <dir>/<script>.summary.txt      flat top self-time functions
+
+The summary maps each profiled function back through the Vite sourcemaps
+(build with `npm run build:profile`, which writes hidden .map files next to
+the bundles) to names such as CrystalRenderer.drawComplexCrystal at
+src/modules/renderers/CrystalRenderer.js:806. Without sourcemaps the
+minified bundle positions are reported instead.
+
+Only the sync Playwright API is wrapped; async callers get the plain browser.
+
+Usage (offline summary of a saved profile):
+  python3 verification/profiling.py PROFILE.cpuprofile [--dist dist] [--top N]
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import os
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+VERIFICATION_DIR = Path(__file__).parent
+REPO_ROOT = VERIFICATION_DIR.parent
+DEFAULT_DIST = REPO_ROOT / "dist"
+DEFAULT_PROFILE_DIR = REPO_ROOT / ".cache" / "profiles"
+PROFILE_ENV = "VERIFY_PROFILE_DIR"
+# Microseconds between samples; finer than the 1 ms default to catch short frames.
+SAMPLING_INTERVAL_US = 200
+DEFAULT_TOP = 25
+TRACE_CATEGORIES = [
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "v8.execute",
+    "blink.user_timing",
+]
+# V8 pseudo-frames that have no source location.
+META_FRAMES = ("(root)", "(program)", "(idle)", "(garbage collector)")
+
+_VLQ = {c: i for i, c in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")}
+
+
+# -- sourcemaps --------------------------------------------------------------
+
+
+def decode_vlq(segment: str) -> list[int]:
+    values, shift, value = [], 0, 0
+    for char in segment:
+        digit = _VLQ[char]
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+            continue
+        values.append(-(value >> 1) if value & 1 else value >> 1)
+        shift = value = 0
+    return values
+
+
+@dataclass
+class OriginalPosition:
+    source: str
+    line: int  # 1-based, as editors show it
+    column: int
+    name: Optional[str]
+
+
+class SourceMap:
+    """Generated (line, column) -> original position, for one v3 sourcemap."""
+
+    def __init__(self, data: dict[str, Any], base: Path = REPO_ROOT, root: Path = REPO_ROOT):
+        source_root = data.get("sourceRoot") or ""
+        self.sources = [_project_relative(base, source_root + source, root) for source in data.get("sources", [])]
+        self.names = data.get("names", [])
+        # Per generated line: sorted columns and the matching (source, line, column, name) tuples.
+        self._columns: list[list[int]] = []
+        self._mappings: list[list[tuple[int, int, int, Optional[int]]]] = []
+        source = line = column = name = 0
+        for group in data.get("mappings", "").split(";"):
+            columns, mappings, generated = [], [], 0
+            for segment in group.split(","):
+                if not segment:
+                    continue
+                fields = decode_vlq(segment)
+                generated += fields[0]
+                if len(fields) < 4:
+                    continue
+                source += fields[1]
+                line += fields[2]
+                column += fields[3]
+                named = None
+                if len(fields) > 4:
+                    name += fields[4]
+                    named = name
+                columns.append(generated)
+                mappings.append((source, line, column, named))
+            self._columns.append(columns)
+            self._mappings.append(mappings)
+
+    @classmethod
+    def load(cls, path: Path, root: Path = REPO_ROOT) -> "SourceMap":
+        return cls(json.loads(path.read_text(encoding="utf-8")), base=path.parent, root=root)
+
+    def lookup(self, line: int, column: int) -> Optional[OriginalPosition]:
+        """Original position for a 0-based generated line and column."""
+        if not 0 <= line < len(self._columns):
+            return None
+        index = bisect.bisect_right(self._columns[line], column) - 1
+        if index < 0:
+            return None
+        source, original_line, original_column, name = self._mappings[line][index]
+        return OriginalPosition(
+            self.sources[source],
+            original_line + 1,
+            original_column,
+            self.names[name] if name is not None else None,
+        )
+
+
+def _project_relative(base: Path, source: str, root: Path) -> str:
+    """Sourcemap sources are relative to the map file; report them relative to the project root."""
+    path = Path(os.path.normpath(Path(base).resolve() / source))
+    try:
+        return path.relative_to(Path(root).resolve()).as_posix()
+    except ValueError:
+        return source
+
+
+class SourceMapResolver:
+    """Finds and caches the sourcemap for each script URL in a profile."""
+
+    def __init__(self, dist: Path = DEFAULT_DIST):
+        self.dist = Path(dist)
+        self._maps: dict[str, Optional[SourceMap]] = {}
+
+    def for_url(self, url: str) -> Optional[SourceMap]:
+        if url not in self._maps:
+            self._maps[url] = self._load(url)
+        return self._maps[url]
+
+    def _load(self, url: str) -> Optional[SourceMap]:
+        path = urlparse(url).path.lstrip("/")
+        if not path.endswith((".js", ".mjs")):
+            return None
+        candidate = self.dist / (path + ".map")
+        if not candidate.is_file():
+            return None
+        try:
+            # dist/ sits in the project root, which is what src/ paths are relative to.
+            return SourceMap.load(candidate, root=self.dist.parent)
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+# -- cpuprofile summary --------------------------------------------------------
+
+
+def self_times(profile: dict[str, Any]) -> dict[int, float]:
+    """Self time in ms per profile node id, from the sample timeline."""
+    samples = profile.get("samples") or []
+    deltas = profile.get("timeDeltas") or []
+    totals: dict[int, float] = defaultdict(float)
+    # Sample i covers the time until sample i + 1 is taken.
+    for index in range(len(samples) - 1):
+        totals[samples[index]] += deltas[index + 1] / 1000
+    if not samples:
+        # Profiles without a timeline still carry hit counts.
+        interval = (profile.get("endTime", 0) - profile.get("startTime", 0)) / 1000
+        hits = sum(node.get("hitCount", 0) for node in profile.get("nodes", [])) or 1
+        for node in profile.get("nodes", []):
+            totals[node["id"]] += node.get("hitCount", 0) * interval / hits
+    return totals
+
+
+def describe_frame(frame: dict[str, Any], resolver: Optional[SourceMapResolver]) -> tuple[str, str]:
+    """(display name, location) for a V8 call frame, mapped to the original source when possible."""
+    name = frame.get("functionName") or "(anonymous)"
+    url = frame.get("url") or ""
+    if name in META_FRAMES or not url:
+        return name, ""
+    line, column = frame.get("lineNumber", -1), frame.get("columnNumber", -1)
+    original = resolver.for_url(url).lookup(line, column) if resolver and resolver.for_url(url) else None
+    if original is None:
+        return name, f"{urlparse(url).path.lstrip('/')}:{line + 1}:{column + 1}"
+    original_name = original.name or name
+    stem = Path(original.source).stem
+    qualified = original_name if "." in original_name or stem in ("index", "main") else f"{stem}.{original_name}"
+    return qualified, f"{original.source}:{original.line}"
+
+
+def summarize_profile(
+    profile: dict[str, Any], resolver: Optional[SourceMapResolver] = None, top: int = DEFAULT_TOP
+) -> list[dict[str, Any]]:
+    """Top functions by self time, merged by mapped name and location."""
+    nodes = {node["id"]: node for node in profile.get("nodes", [])}
+    merged: dict[tuple[str, str], float] = defaultdict(float)
+    for node_id, ms in self_times(profile).items():
+        node = nodes.get(node_id)
+        if node is not None:
+            merged[describe_frame(node["callFrame"], resolver)] += ms
+    busy = sum(ms for (name, _loc), ms in merged.items() if name != "(idle)") or 1
+    ranked = sorted(merged.items(), key=lambda item: item[1], reverse=True)
+    return [
+        {"function": name, "location": location, "self_ms": round(ms, 2), "share": round(ms / busy, 4)}
+        for (name, location), ms in ranked
+        if name != "(idle)"
+    ][:top]
+
+
+def format_summary(rows: list[dict[str, Any]], title: str) -> str:
+    lines = [f"=== Top self time: {title} ===", f"{'self ms':>10}  {'share':>6}  function"]
+    for row in rows:
+        location = f"  ({row['location']})" if row["location"] else ""
+        lines.append(f"{row['self_ms']:>10.1f}  {row['share']:>6.1%}  {row['function']}{location}")
+    return "\n".join(lines)
+
+
+# -- Playwright wrappers -------------------------------------------------------
+
+
+def profile_dir() -> Optional[Path]:
+    value = os.environ.get(PROFILE_ENV)
+    return Path(value) if value else None
+
+
+def script_label() -> str:
+    return Path(sys.argv[0]).stem or "session"
+
+
+class _PageProfile:
+    def __init__(self, page, cdp):
+        self.page = page
+        self.cdp = cdp
+
+
+class ProfiledBrowser:
+    """Delegates to a sync Playwright Browser and profiles every page it opens."""
+
+    def __init__(self, browser, out_dir: Path, label: str, dist: Path = DEFAULT_DIST):
+        self._browser = browser
+        self.out_dir = Path(out_dir)
+        self.label = label
+        self.dist = Path(dist)
+        self.profiles: list[dict[str, Any]] = []
+        self._active: list[_PageProfile] = []
+        self._trace_path: Optional[Path] = None
+        self._finished = False
+
+    def __getattr__(self, name):
+        return getattr(self._browser, name)
+
+    def new_context(self, *args, **kwargs):
+        return ProfiledContext(self._browser.new_context(*args, **kwargs), self)
+
+    def new_page(self, *args, **kwargs):
+        # browser.new_page() owns a private context; route it through a wrapper so it is profiled too.
+        return self.new_context(*args, **kwargs).new_page()
+
+    def attach(self, context, page) -> None:
+        cdp = context.new_cdp_session(page)
+        cdp.send("Profiler.enable")
+        cdp.send("Profiler.setSamplingInterval", {"interval": SAMPLING_INTERVAL_US})
+        cdp.send("Profiler.start")
+        self._active.append(_PageProfile(page, cdp))
+        if self._trace_path is None:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            self._trace_path = self.out_dir / f"{self.label}.trace.json"
+            self._browser.start_tracing(page=page, path=str(self._trace_path), categories=TRACE_CATEGORIES)
+
+    def stop_pages(self, pages: Optional[list] = None) -> None:
+        """Stop and save the profiles of `pages` (default: every page still profiling)."""
+        keep = []
+        for entry in self._active:
+            if pages is not None and entry.page not in pages:
+                keep.append(entry)
+                continue
+            try:
+                profile = entry.cdp.send("Profiler.stop")["profile"]
+            except Exception as exc:  # the page may already be gone; losing one profile must not fail the script
+                print(f"[profile] could not stop profiler: {exc}")
+                continue
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            path = self.out_dir / f"{self.label}-{len(self.profiles) + 1}.cpuprofile"
+            path.write_text(json.dumps(profile), encoding="utf-8")
+            self.profiles.append(profile)
+            print(f"[profile] {path}")
+        self._active = keep
+
+    def finish(self) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        self.stop_pages()
+        if self._trace_path is not None:
+            try:
+                self._browser.stop_tracing()
+                print(f"[profile] {self._trace_path}")
+            except Exception as exc:
+                print(f"[profile] could not stop tracing: {exc}")
+        if self.profiles:
+            resolver = SourceMapResolver(self.dist)
+            rows = summarize_profile(merge_profiles(self.profiles), resolver)
+            text = format_summary(rows, self.label)
+            (self.out_dir / f"{self.label}.summary.txt").write_text(text + "\n", encoding="utf-8")
+            print(text)
+
+    def close(self, *args, **kwargs):
+        self.finish()
+        return self._browser.close(*args, **kwargs)
+
+
+class ProfiledContext:
+    """Delegates to a BrowserContext; new pages are profiled, close() saves them first."""
+
+    def __init__(self, context, owner: ProfiledBrowser):
+        self._context = context
+        self._owner = owner
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+    def new_page(self, *args, **kwargs):
+        page = self._context.new_page(*args, **kwargs)
+        self._owner.attach(self._context, page)
+        return page
+
+    def close(self, *args, **kwargs):
+        self._owner.stop_pages(list(self._context.pages))
+        return self._context.close(*args, **kwargs)
+
+
+def merge_profiles(profiles: list[dict[str, Any]]) -> dict[str, Any]:
+    """One profile whose node ids and samples are the union of `profiles` (ids re-based)."""
+    if len(profiles) == 1:
+        return profiles[0]
+    nodes, samples, deltas, offset = [], [], [], 0
+    for profile in profiles:
+        ids = [node["id"] for node in profile.get("nodes", [])]
+        for node in profile.get("nodes", []):
+            nodes.append({**node, "id": node["id"] + offset})
+        samples.extend(s + offset for s in profile.get("samples") or [])
+        # A zero delta at each seam keeps one profile's last sample from absorbing the next one's start.
+        profile_deltas = list(profile.get("timeDeltas") or [])
+        deltas.extend([0, *profile_deltas[1:]] if deltas else profile_deltas)
+        offset += max(ids, default=0) + 1
+    return {"nodes": nodes, "samples": samples, "timeDeltas": deltas}
+
+
+def maybe_profile(browser):
+    """Wrap a sync Browser in ProfiledBrowser when PROFILE_ENV is set; otherwise return it unchanged."""
+    directory = profile_dir()
+    if directory is None or not hasattr(browser, "new_context") or hasattr(browser, "__await__"):
+        return browser
+    return ProfiledBrowser(browser, directory, script_label())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Flat self-time summary of saved .cpuprofile files.")
+    parser.add_argument("profiles", nargs="+", type=Path)
+    parser.add_argument("--dist", type=Path, default=DEFAULT_DIST, help="build whose sourcemaps to use")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"rows to show (default: {DEFAULT_TOP})")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    profiles = [json.loads(path.read_text(encoding="utf-8")) for path in args.profiles]
+    rows = summarize_profile(merge_profiles(profiles), SourceMapResolver(args.dist), args.top)
+    print(format_summary(rows, ", ".join(p.name for p in args.profiles)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
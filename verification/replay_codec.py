@@ -0,0 +1,551 @@
+"""Read and write .ccreplay files as schema v1 JSON or as a compact binary encoding.
+
+The JSON form is what the game records and loads (see docs/REPLAY.md). The
+binary form is meant for large anti-cheat corpora. It starts with a small
+header (the JSON file minus its events) and is followed by one record per
+event:
+
+  tag byte   bits 0-2 type (start, aim, fire, powerUp, pause, resume,
+             milestone; 7 = a type this codec does not know)
+             bit 3 lane, bit 4 score, bit 5 kind, bit 6 colorIdx,
+             bit 7 extra fields
+  varint     t minus the previous event's t (whole milliseconds)
+  then, when flagged: varint kind code, varint lane, zigzag varint score,
+  varint colorIdx, and a length-prefixed JSON object of any other fields
+  (including an unknown type's name or a fractional t).
+
+Events are always kept in the order the game uses on load: by t, then
+start -> aim -> fire -> powerUp -> pause -> resume -> milestone. Converting
+between the two forms is lossless. Field values and top-level key order
+survive a round trip, and JSON written by write_json() is formatted like
+the recorder's output.
+
+open_replay() streams events lazily from either form. Binary files are
+decoded in a single forward pass. A JSON file is scanned once to collect its
+header and to check that its events are already in canonical order, then
+read again to yield them; an out-of-order JSON file is sorted in memory, as
+parseReplayFile() does.
+
+Usage:
+  python3 verification/replay_codec.py SRC DST   # format chosen by DST's suffix
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, TextIO
+
+REPLAY_VERSION = 1
+JSON_SUFFIX = ".ccreplay"
+BINARY_SUFFIX = ".ccreplayb"
+BINARY_MAGIC = b"CCRB"
+BINARY_VERSION = 1
+
+# Same-timestamp ordering from docs/REPLAY.md (replayFormat.js EVENT_ORDER).
+EVENT_TYPES = ("start", "aim", "fire", "powerUp", "pause", "resume", "milestone")
+EVENT_ORDER = {name: index for index, name in enumerate(EVENT_TYPES)}
+INPUT_TYPES = frozenset(EVENT_TYPES[:-1])
+UNKNOWN_ORDER = 99
+MILESTONE_KINDS = ("match", "score", "levelComplete")
+
+_TYPE_OTHER = 7
+_LANE, _SCORE, _KIND, _COLOR, _EXTRA = 0x08, 0x10, 0x20, 0x40, 0x80
+_CHUNK = 64 * 1024
+
+
+class ReplayFormatError(ValueError):
+    """The file is not a valid .ccreplay in either encoding."""
+
+
+def sort_key(event: dict[str, Any]) -> tuple:
+    return event["t"], EVENT_ORDER.get(event["type"], UNKNOWN_ORDER)
+
+
+def canonical_events(events: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Events in load order; the sort is stable, like Array.prototype.sort."""
+    return sorted(events, key=sort_key)
+
+
+def validate_event(event: Any, index: int) -> dict[str, Any]:
+    if not isinstance(event, dict) or not _is_number(event.get("t")) or not isinstance(event.get("type"), str):
+        raise ReplayFormatError(f"Invalid event at index {index}")
+    if event["type"] == "aim" and not _is_number(event.get("lane")):
+        raise ReplayFormatError(f"aim event at index {index} missing lane")
+    return event
+
+
+def validate_header(header: Any) -> dict[str, Any]:
+    """The checks parseReplayFile() applies to everything except the events."""
+    if not isinstance(header, dict):
+        raise ReplayFormatError("Replay must be a JSON object")
+    if header.get("version") != REPLAY_VERSION:
+        raise ReplayFormatError(f"Unsupported replay version: {header.get('version')}")
+    if not _is_number(header.get("seed")):
+        raise ReplayFormatError("Replay missing valid seed")
+    if not isinstance(header.get("config"), dict):
+        raise ReplayFormatError("Replay missing config")
+    return header
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value == value
+
+
+# -- varints ---------------------------------------------------------------
+
+
+def encode_varint(value: int) -> bytes:
+    if value < 0:
+        raise ValueError(f"varint must be non-negative, got {value}")
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+class _ByteReader:
+    """Buffered forward reader over a binary file for varint decoding."""
+
+    def __init__(self, handle: BinaryIO):
+        self._handle = handle
+        self._buf = b""
+        self._pos = 0
+
+    def _fill(self, need: int) -> bool:
+        while len(self._buf) - self._pos < need:
+            chunk = self._handle.read(_CHUNK)
+            if not chunk:
+                return False
+            self._buf = self._buf[self._pos :] + chunk
+            self._pos = 0
+        return True
+
+    def at_eof(self) -> bool:
+        return not self._fill(1)
+
+    def read(self, size: int) -> bytes:
+        if not self._fill(size):
+            raise ReplayFormatError("Truncated binary replay")
+        data = self._buf[self._pos : self._pos + size]
+        self._pos += size
+        return data
+
+    def byte(self) -> int:
+        return self.read(1)[0]
+
+    def varint(self) -> int:
+        result = shift = 0
+        while True:
+            byte = self.byte()
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result
+            shift += 7
+            if shift > 63:
+                raise ReplayFormatError("Varint too long")
+
+
+# -- binary ----------------------------------------------------------------
+
+
+def _is_small_uint(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def encode_event(event: dict[str, Any], previous_t: int) -> tuple[bytes, int]:
+    """One binary record; returns (bytes, whole-ms t to delta the next event against)."""
+    t = event["t"]
+    whole_t = math.floor(t)
+    if whole_t < previous_t:
+        raise ReplayFormatError(f"Events out of order at t={t}; write canonical_events()")
+    extra = {k: v for k, v in event.items() if k not in ("t", "type", "lane", "score", "kind", "colorIdx")}
+    tag = EVENT_ORDER.get(event["type"], _TYPE_OTHER)
+    if tag == _TYPE_OTHER:
+        extra["type"] = event["type"]
+    if whole_t != t:
+        extra["t"] = t
+    fields = bytearray()
+    if "kind" in event:
+        if event["kind"] in MILESTONE_KINDS:
+            tag |= _KIND
+            fields += encode_varint(MILESTONE_KINDS.index(event["kind"]))
+        else:
+            extra["kind"] = event["kind"]
+    if "lane" in event:
+        if _is_small_uint(event["lane"]):
+            tag |= _LANE
+            fields += encode_varint(event["lane"])
+        else:
+            extra["lane"] = event["lane"]
+    if "score" in event:
+        if isinstance(event["score"], int) and not isinstance(event["score"], bool):
+            tag |= _SCORE
+            fields += encode_varint(zigzag(event["score"]))
+        else:
+            extra["score"] = event["score"]
+    if "colorIdx" in event:
+        if _is_small_uint(event["colorIdx"]):
+            tag |= _COLOR
+            fields += encode_varint(event["colorIdx"])
+        else:
+            extra["colorIdx"] = event["colorIdx"]
+    if extra:
+        tag |= _EXTRA
+        blob = json.dumps(extra, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        fields += encode_varint(len(blob)) + blob
+    return bytes([tag]) + encode_varint(whole_t - previous_t) + bytes(fields), whole_t
+
+
+def decode_event(reader: _ByteReader, previous_t: int) -> tuple[dict[str, Any], int]:
+    tag = reader.byte()
+    whole_t = previous_t + reader.varint()
+    code = tag & 0x07
+    event: dict[str, Any] = {"t": whole_t, "type": EVENT_TYPES[code] if code < len(EVENT_TYPES) else None}
+    # Key order follows the recorder: t, type, then kind/lane/score as emitted.
+    if tag & _KIND:
+        kind = reader.varint()
+        if kind >= len(MILESTONE_KINDS):
+            raise ReplayFormatError(f"Unknown milestone kind code {kind}")
+        event["kind"] = MILESTONE_KINDS[kind]
+    if tag & _LANE:
+        event["lane"] = reader.varint()
+    if tag & _SCORE:
+        event["score"] = unzigzag(reader.varint())
+    if tag & _COLOR:
+        event["colorIdx"] = reader.varint()
+    if tag & _EXTRA:
+        extra = json.loads(reader.read(reader.varint()).decode("utf-8"))
+        event.update(extra)
+    if event["type"] is None:
+        raise ReplayFormatError("Binary event with an unknown type is missing its name")
+    return event, whole_t
+
+
+def _with_events_slot(header: dict[str, Any]) -> dict[str, Any]:
+    # A null "events" entry records where the events sit among the top-level keys.
+    slotted = {key: (None if key == "events" else value) for key, value in header.items()}
+    slotted.setdefault("events", None)
+    return slotted
+
+
+def write_binary(handle_or_path, header: dict[str, Any], events: Iterable[dict[str, Any]]) -> int:
+    """Stream events (already in canonical order) to the binary form; returns the event count."""
+    with _open_for_write(handle_or_path, binary=True) as handle:
+        handle.write(BINARY_MAGIC + bytes([BINARY_VERSION]))
+        blob = json.dumps(_with_events_slot(header), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        handle.write(encode_varint(len(blob)) + blob)
+        previous_t, previous_key, count = 0, None, 0
+        for index, event in enumerate(events):
+            validate_event(event, index)
+            key = sort_key(event)
+            if previous_key is not None and key < previous_key:
+                raise ReplayFormatError(f"Events out of order at index {index}; write canonical_events()")
+            record, previous_t = encode_event(event, previous_t)
+            handle.write(record)
+            previous_key, count = key, count + 1
+        return count
+
+
+def _binary_header(reader: _ByteReader) -> dict[str, Any]:
+    if reader.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+        raise ReplayFormatError("Not a binary replay")
+    version = reader.byte()
+    if version != BINARY_VERSION:
+        raise ReplayFormatError(f"Unsupported binary replay version: {version}")
+    return json.loads(reader.read(reader.varint()).decode("utf-8"))
+
+
+def _iter_binary_events(path: Path) -> Iterator[dict[str, Any]]:
+    with open(path, "rb") as handle:
+        reader = _ByteReader(handle)
+        _binary_header(reader)
+        previous_t = 0
+        while not reader.at_eof():
+            event, previous_t = decode_event(reader, previous_t)
+            yield event
+
+
+# -- JSON ------------------------------------------------------------------
+
+
+class _JsonScanner:
+    """Incremental reader for a top-level JSON object whose "events" array may be large."""
+
+    def __init__(self, handle: TextIO):
+        self._handle = handle
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _more(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._handle.read(_CHUNK)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf) or not self._more():
+                return self._buf[self._pos : self._pos + 1]
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ReplayFormatError(f"Malformed replay JSON: expected {char!r}")
+        self._pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as exc:
+                if self._more():
+                    continue
+                raise ReplayFormatError(f"Malformed replay JSON: {exc}") from None
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self._buf) and self._more():
+                continue
+            self._pos = end
+            return value
+
+    def _separator(self, close: str) -> bool:
+        """Consume ',' (more items follow) or the closing bracket."""
+        char = self._peek()
+        self._pos += 1
+        if char == ",":
+            return True
+        if char == close:
+            return False
+        raise ReplayFormatError(f"Malformed replay JSON: expected ',' or {close!r}")
+
+    def _events(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if not self._separator("]"):
+                return
+
+    def items(self) -> Iterator[tuple[str, Any]]:
+        """Top-level (key, value) pairs; the value for "events" is a lazy iterator."""
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key == "events" and self._peek() == "[":
+                events = self._events()
+                yield key, events
+                for _rest in events:  # drain if the caller did not
+                    pass
+            else:
+                yield key, self._value()
+            if not self._separator("}"):
+                return
+
+
+def _scan_json(path: Path) -> tuple[dict[str, Any], bool, int]:
+    """First pass: (header with an events placeholder, already canonical?, event count)."""
+    header: dict[str, Any] = {}
+    canonical, count, previous = True, 0, None
+    with open(path, encoding="utf-8") as handle:
+        for key, value in _JsonScanner(handle).items():
+            if key != "events" or not isinstance(value, Iterator):
+                header[key] = value
+                continue
+            header["events"] = None
+            for event in value:
+                validate_event(event, count)
+                current = sort_key(event)
+                if previous is not None and current < previous:
+                    canonical = False
+                previous, count = current, count + 1
+    return header, canonical, count
+
+
+def _iter_json_events(path: Path) -> Iterator[dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        for key, value in _JsonScanner(handle).items():
+            if key == "events" and isinstance(value, Iterator):
+                yield from value
+                return
+
+
+def _indent_tail(text: str, prefix: str) -> str:
+    return text.replace("\n", "\n" + prefix)
+
+
+def write_json(handle_or_path, header: dict[str, Any], events: Iterable[dict[str, Any]]) -> int:
+    """Stream schema v1 JSON formatted like json.dumps(replay, indent=2); returns the event count."""
+    keys = list(_with_events_slot(header))
+    count = 0
+    with _open_for_write(handle_or_path, binary=False) as handle:
+        handle.write("{")
+        for position, key in enumerate(keys):
+            handle.write(("," if position else "") + "\n  " + json.dumps(key, ensure_ascii=False) + ": ")
+            if key != "events":
+                handle.write(_indent_tail(json.dumps(header[key], indent=2, ensure_ascii=False), "  "))
+                continue
+            handle.write("[")
+            previous = None
+            for index, event in enumerate(events):
+                validate_event(event, index)
+                if previous is not None and sort_key(event) < previous:
+                    raise ReplayFormatError(f"Events out of order at index {index}; write canonical_events()")
+                previous = sort_key(event)
+                text = _indent_tail(json.dumps(event, indent=2, ensure_ascii=False), "    ")
+                handle.write(("," if index else "") + "\n    " + text)
+                count += 1
+            handle.write("\n  ]" if count else "]")
+        handle.write("\n}" if keys else "}")
+    return count
+
+
+# -- public API ------------------------------------------------------------
+
+
+def is_binary(path: Path | str) -> bool:
+    with open(path, "rb") as handle:
+        return handle.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+class ReplayStream:
+    """A replay opened for lazy reading: validated header now, events on demand."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.format = "binary" if is_binary(self.path) else "json"
+        # Binary writers only accept canonical streams; JSON is checked on the first pass.
+        self.canonical = True
+        if self.format == "binary":
+            with open(self.path, "rb") as handle:
+                self._header = _binary_header(_ByteReader(handle))
+        else:
+            self._header, self.canonical, count = _scan_json(self.path)
+            if "events" not in self._header or not count:
+                raise ReplayFormatError("Replay missing events")
+        validate_header(self._header)
+
+    @property
+    def header(self) -> dict[str, Any]:
+        """Top-level fields in file order, with "events" as a None placeholder."""
+        return dict(self._header)
+
+    def events(self) -> Iterator[dict[str, Any]]:
+        """Events in canonical load order, decoded one at a time."""
+        if not self.canonical:
+            return iter(canonical_events(_iter_json_events(self.path)))
+        return self.file_events()
+
+    def file_events(self) -> Iterator[dict[str, Any]]:
+        """Events in the order they are stored, without sorting."""
+        if self.format == "binary":
+            return _iter_binary_events(self.path)
+        return _iter_json_events(self.path)
+
+    def load(self) -> dict[str, Any]:
+        """The whole replay as a dict, events in canonical order."""
+        replay = self.header
+        replay["events"] = list(self.events())
+        if not replay["events"]:
+            raise ReplayFormatError("Replay missing events")
+        return replay
+
+
+def open_replay(path: Path | str) -> ReplayStream:
+    return ReplayStream(path)
+
+
+def load_replay(path: Path | str) -> dict[str, Any]:
+    """Read either form into a dict shaped like the JSON file, events in load order."""
+    return open_replay(path).load()
+
+
+def dump_replay(replay: dict[str, Any], path: Path | str, fmt: Optional[str] = None) -> int:
+    """Write a replay dict in `fmt` ("json" or "binary"; default from the suffix)."""
+    validate_header(replay)
+    events = canonical_events(validate_event(e, i) for i, e in enumerate(replay.get("events") or []))
+    writer = write_binary if (fmt or format_for(path)) == "binary" else write_json
+    return writer(path, replay, events)
+
+
+def convert(src: Path | str, dst: Path | str, fmt: Optional[str] = None) -> int:
+    """Stream src into dst without loading every event; returns the event count."""
+    stream = open_replay(src)
+    writer = write_binary if (fmt or format_for(dst)) == "binary" else write_json
+    return writer(dst, stream.header, stream.events())
+
+
+def format_for(path: Path | str) -> str:
+    return "binary" if Path(path).suffix == BINARY_SUFFIX else "json"
+
+
+@contextmanager
+def _open_for_write(target, binary: bool):
+    """Write to an open handle as-is, or to a path atomically."""
+    if hasattr(target, "write"):
+        yield target
+        return
+    path = Path(target)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") if binary else open(tmp, "w", encoding="utf-8") as handle:
+            yield handle
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("src", type=Path)
+    parser.add_argument("dst", type=Path)
+    parser.add_argument(
+        "--format", choices=("json", "binary"), default=None, help=f"output form (default: binary for {BINARY_SUFFIX})"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    try:
+        count = convert(args.src, args.dst, args.format)
+    except (OSError, ReplayFormatError) as exc:
+        print(f"ERROR: {exc}")
+        return 1
+    before, after = args.src.stat().st_size, args.dst.stat().st_size
+    print(f"{args.src} -> {args.dst}: {count} events, {before} -> {after} bytes ({after / max(before, 1):.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,367 @@
+"""Runs a directory of .ccreplay files against a production build and reports divergences.
+
+verify_replay.py checks a single golden fixture. This runner takes a whole
+corpus, for example the recorded sessions behind a daily challenge, and
+spreads it across N worker pages in one headless Chromium. Each page loads the
+game once and is reused for every replay it picks up:
+ReplayPlayer.load() + runToCompletion() restart the session through
+startGameFromReplay(), and the page runs on the virtual clock
+(screenshot_utils.VIRTUAL_CLOCK_INIT), so the live rAF loop never advances
+between replays.
+
+For each replay the runner records:
+  - the final score and its delta from expect.finalScore (within expect.tolerance)
+  - milestone mismatches: the milestones the simulation produced, compared
+    with the ones recorded in the file (kind, lane and score, in order)
+  - the simulated game-clock time and the wall time the page spent on it
+
+Replays may be JSON or the compact binary form (replay_codec.py). They are
+read lazily and results are kept as small records, so corpora of
+thousands of files are fine. Every replay also goes through replay_index.py's
+plausibility checks first. Their problems are reported as warnings, and the
+replay is still simulated, because the browser run is the authoritative check
+(--no-screen skips screening).
+Pass --json and/or --junit to write reports; the
+JUnit file has one <testcase> per replay for CI test-result viewers.
+
+Usage:
+  python3 verification/replay_corpus.py [DIR ...] [--jobs N] [--json PATH] [--junit PATH] [--no-screen]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from screenshot_utils import DETERMINISTIC_RNG_INIT, VIRTUAL_CLOCK_INIT  # noqa: E402
+from replay_codec import ReplayFormatError, load_replay  # noqa: E402
+from replay_index import REPLAY_SUFFIXES, discover_replays, index_replay, label_for  # noqa: E402
+from server import launch_browser, shared_dist_server  # noqa: E402
+
+VERIFICATION_DIR = Path(__file__).parent
+DEFAULT_CORPUS = VERIFICATION_DIR / "fixtures"
+DEFAULT_JOBS = min(4, os.cpu_count() or 1)
+# Simulated time allowed after the last input event for spores and souls to settle.
+DRAIN_MS = 10_000
+# Fields that must agree between a recorded and a re-simulated milestone.
+MILESTONE_KEYS = ("kind", "lane", "score")
+PROGRESS_EVERY = 100
+
+GAME_READY_JS = "() => Boolean(window.game?.replay?.player)"
+
+# Temporarily routes recorder.onMilestone into a local list: the recorder is
+# off during playback, but the hook still fires at the same choke point.
+RUN_REPLAY_JS = """
+([replay, maxMs]) => {
+    const g = window.game;
+    if (!g?.replay?.player) {
+        throw new Error('Replay API not available on window.game');
+    }
+    const recorder = g.replay.recorder;
+    const original = recorder.onMilestone;
+    const observed = [];
+    recorder.onMilestone = (game, data) => {
+        observed.push({ t: game.state.gameClockMs, type: 'milestone', ...data });
+    };
+    try {
+        g.replay.player.load(replay);
+        g.replay.player.runToCompletion(g, maxMs);
+    } finally {
+        recorder.onMilestone = original;
+    }
+    return {
+        score: g.state.score,
+        complete: g.replay.player.isComplete(),
+        simMs: g.state.gameClockMs,
+        milestones: observed,
+    };
+}
+"""
+
+
+@dataclass
+class ReplayResult:
+    path: str
+    # "pass" | "fail" | "error"
+    status: str
+    score: Optional[int] = None
+    expected_score: Optional[int] = None
+    tolerance: int = 0
+    score_delta: Optional[int] = None
+    complete: bool = False
+    milestones_expected: int = 0
+    milestones_observed: int = 0
+    milestone_mismatches: list[dict[str, Any]] = field(default_factory=list)
+    sim_ms: Optional[float] = None
+    wall_ms: Optional[float] = None
+    failures: list[str] = field(default_factory=list)
+    # replay_index plausibility problems; advisory, they never fail a replay on their own
+    warnings: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def recorded_milestones(replay: dict) -> list[dict]:
+    return [e for e in replay.get("events", []) if e.get("type") == "milestone"]
+
+
+def simulation_budget(replay: dict) -> int:
+    """maxMs for runToCompletion: the last event plus time to drain in-flight spores."""
+    times = [e.get("t", 0) for e in replay.get("events", [])]
+    return int(max(times, default=0)) + DRAIN_MS
+
+
+def _milestone_key(event: Optional[dict]) -> Optional[tuple]:
+    return None if event is None else tuple(event.get(k) for k in MILESTONE_KEYS)
+
+
+def compare_milestones(expected: list[dict], observed: list[dict]) -> list[dict[str, Any]]:
+    """Index-aligned differences; a missing or extra milestone is reported against None."""
+    mismatches = []
+    for index in range(max(len(expected), len(observed))):
+        want = expected[index] if index < len(expected) else None
+        got = observed[index] if index < len(observed) else None
+        if _milestone_key(want) != _milestone_key(got):
+            mismatches.append({"index": index, "expected": want, "observed": got})
+    return mismatches
+
+
+def evaluate_result(path: str, replay: dict, outcome: dict, wall_ms: float) -> ReplayResult:
+    """Turn the page's RUN_REPLAY_JS outcome into a pass/fail record."""
+    expect = replay.get("expect") or {}
+    expected_score = expect.get("finalScore")
+    tolerance = expect.get("tolerance", 0)
+    expected = recorded_milestones(replay)
+    observed = outcome.get("milestones", [])
+
+    result = ReplayResult(
+        path=path,
+        status="pass",
+        score=outcome["score"],
+        expected_score=expected_score,
+        tolerance=tolerance,
+        complete=bool(outcome["complete"]),
+        milestones_expected=len(expected),
+        milestones_observed=len(observed),
+        milestone_mismatches=compare_milestones(expected, observed),
+        sim_ms=outcome.get("simMs"),
+        wall_ms=round(wall_ms, 2),
+    )
+    if not result.complete:
+        result.failures.append("replay did not finish dispatching all events")
+    if expected_score is not None:
+        result.score_delta = result.score - expected_score
+        if abs(result.score_delta) > tolerance:
+            result.failures.append(
+                f"score {result.score}, expected {expected_score} (delta {result.score_delta:+d}, tolerance {tolerance})"
+            )
+    if result.milestone_mismatches:
+        first = result.milestone_mismatches[0]
+        result.failures.append(
+            f"{len(result.milestone_mismatches)} milestone mismatch(es), first at #{first['index']}: "
+            f"expected {_milestone_key(first['expected'])}, got {_milestone_key(first['observed'])}"
+        )
+    if result.failures:
+        result.status = "fail"
+    return result
+
+
+def build_report(results: list[ReplayResult], elapsed: float, jobs: int) -> dict[str, Any]:
+    sim_total = sum(r.sim_ms or 0 for r in results)
+    wall_total = sum(r.wall_ms or 0 for r in results)
+    return {
+        "replays": len(results),
+        "passed": sum(r.status == "pass" for r in results),
+        "failed": sum(r.status == "fail" for r in results),
+        "errors": sum(r.status == "error" for r in results),
+        "warned": sum(bool(r.warnings) for r in results),
+        "jobs": jobs,
+        "elapsed_seconds": round(elapsed, 3),
+        "simulated_ms": sim_total,
+        # Simulated game time per millisecond of page time, summed over workers.
+        "speedup": round(sim_total / wall_total, 1) if wall_total else None,
+        "results": [asdict(r) for r in results],
+    }
+
+
+def junit_xml(results: list[ReplayResult], elapsed: float) -> str:
+    suite = ET.Element(
+        "testsuite",
+        name="replay-corpus",
+        tests=str(len(results)),
+        failures=str(sum(r.status == "fail" for r in results)),
+        errors=str(sum(r.status == "error" for r in results)),
+        time=f"{elapsed:.3f}",
+    )
+    for r in results:
+        case = ET.SubElement(
+            suite, "testcase", classname="replay", name=r.path, time=f"{(r.wall_ms or 0) / 1000:.3f}"
+        )
+        if r.status == "fail":
+            ET.SubElement(case, "failure", message=r.failures[0]).text = "\n".join(r.failures)
+        elif r.status == "error":
+            ET.SubElement(case, "error", message=r.error.splitlines()[0]).text = r.error
+        ET.SubElement(case, "system-out").text = "\n".join(
+            [
+                f"score={r.score} delta={r.score_delta} sim_ms={r.sim_ms} "
+                f"milestones={r.milestones_observed}/{r.milestones_expected}"
+            ]
+            + [f"warning: {w}" for w in r.warnings]
+        )
+    ET.indent(suite)
+    return '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(suite, encoding="unicode") + "\n"
+
+
+def screen_replays(paths: list[Path], roots: list[Path]) -> dict[int, list[str]]:
+    """Run replay_index's plausibility checks; returns warnings by path index for replays it rejects."""
+    warnings = {}
+    for index, path in enumerate(paths):
+        entry = index_replay(path, label_for(path, roots))
+        if entry.status != "ok":
+            warnings[index] = [f"implausible: {p}" for p in entry.problems]
+    return warnings
+
+
+async def _open_worker_page(browser, url: str):
+    context = await browser.new_context(viewport={"width": 1280, "height": 800}, device_scale_factor=1)
+    await context.add_init_script(DETERMINISTIC_RNG_INIT)
+    await context.add_init_script(VIRTUAL_CLOCK_INIT)
+    page = await context.new_page()
+    await page.goto(url)
+    await page.wait_for_selector("#gameCanvas")
+    await page.wait_for_function(GAME_READY_JS)
+    return context, page
+
+
+async def run_corpus(paths: list[Path], roots: list[Path], url: str, jobs: int) -> list[ReplayResult]:
+    """Replay every path across `jobs` reused pages; results come back in path order."""
+    from playwright.async_api import async_playwright
+
+    queue: asyncio.Queue[tuple[int, Path]] = asyncio.Queue()
+    for item in enumerate(paths):
+        queue.put_nowait(item)
+    results: list[Optional[ReplayResult]] = [None] * len(paths)
+    done = 0
+
+    async with async_playwright() as p:
+        browser = await launch_browser(p)
+
+        async def worker():
+            nonlocal done
+            context, page = await _open_worker_page(browser, url)
+            try:
+                while True:
+                    try:
+                        index, path = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    label = label_for(path, roots)
+                    try:
+                        replay = load_replay(path)
+                    except (OSError, ReplayFormatError) as exc:
+                        replay = None
+                        result = ReplayResult(label, "error", error=f"{type(exc).__name__}: {exc}")
+                    if replay is not None:
+                        try:
+                            started = time.perf_counter()
+                            outcome = await page.evaluate(RUN_REPLAY_JS, [replay, simulation_budget(replay)])
+                            result = evaluate_result(label, replay, outcome, (time.perf_counter() - started) * 1000)
+                        except Exception as exc:  # one bad replay must not stop the corpus
+                            result = ReplayResult(label, "error", error=f"{type(exc).__name__}: {exc}")
+                            # The page may be mid-session or crashed; start the next replay from a fresh load.
+                            await context.close()
+                            context, page = await _open_worker_page(browser, url)
+                    results[index] = result
+                    done += 1
+                    if result.status != "pass":
+                        print(f"[{result.status.upper()}] {label}: {result.error or '; '.join(result.failures)}")
+                    elif done % PROGRESS_EVERY == 0:
+                        print(f"  {done}/{len(paths)} replays")
+            finally:
+                await context.close()
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(jobs)))
+        finally:
+            await browser.close()
+    return results
+
+
+def print_summary(report: dict[str, Any]) -> None:
+    slowest = sorted(report["results"], key=lambda r: r["wall_ms"] or 0, reverse=True)[:5]
+    if slowest:
+        print("\n=== Slowest replays ===")
+        for r in slowest:
+            print(f"{(r['wall_ms'] or 0):9.1f} ms  {(r['sim_ms'] or 0) / 1000:7.1f}s simulated  {r['path']}")
+    speedup = f", {report['speedup']}x real time per page" if report["speedup"] else ""
+    print(
+        f"\n{report['passed']}/{report['replays']} replays passed "
+        f"({report['failed']} failed, {report['errors']} errors, {report['warned']} implausible) "
+        f"in {report['elapsed_seconds']:.1f}s with {report['jobs']} page(s){speedup}"
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "corpus",
+        nargs="*",
+        type=Path,
+        default=[DEFAULT_CORPUS],
+        help="directories (searched recursively) or replay files (default: verification/fixtures)",
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=DEFAULT_JOBS, help=f"worker pages (default: {DEFAULT_JOBS})"
+    )
+    parser.add_argument("--json", type=Path, default=None, help="write the JSON report here")
+    parser.add_argument("--junit", type=Path, default=None, help="write a JUnit XML report here")
+    parser.add_argument(
+        "--no-screen", action="store_true", help="skip replay_index.py's plausibility warnings"
+    )
+    return parser.parse_args(argv)
+
+
+def _write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def run(argv=None) -> int:
+    args = parse_args(argv)
+    paths = discover_replays(args.corpus)
+    if not paths:
+        print(f"No {' or '.join(REPLAY_SUFFIXES)} files found in {', '.join(map(str, args.corpus))}.")
+        return 1
+
+    started = time.perf_counter()
+    warnings = {} if args.no_screen else screen_replays(paths, args.corpus)
+    for index, problems in warnings.items():
+        print(f"[WARN] {label_for(paths[index], args.corpus)}: {'; '.join(problems)}")
+    jobs = max(1, min(args.jobs, len(paths)))
+    with shared_dist_server(VERIFICATION_DIR.parent / "dist") as server:
+        print(f"Replaying {len(paths)} file(s) across {jobs} page(s) against {server.url}")
+        results = asyncio.run(run_corpus(paths, args.corpus, server.url, jobs))
+    for index, problems in warnings.items():
+        results[index].warnings = problems
+    elapsed = time.perf_counter() - started
+
+    report = build_report(results, elapsed, jobs)
+    print_summary(report)
+    if args.json:
+        _write(args.json, json.dumps(report, indent=2))
+        print(f"JSON report: {args.json}")
+    if args.junit:
+        _write(args.junit, junit_xml(results, elapsed))
+        print(f"JUnit report: {args.junit}")
+    return 0 if report["passed"] == report["replays"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,416 @@
+"""Seeded replay fuzzer: synthesizes stress replays and plays them headlessly.
+
+The golden fixture is a short, calm level-1 run. This script generates
+seeded .ccreplay sessions that push the simulation much harder:
+
+  fire_storm   very high APM: a shot every few ticks across random lanes
+  lane_sweep   the launcher sweeps edge to edge, firing on every lane
+  pause_spam   pause/resume pairs between bursts of fire
+  marathon     a long endless-mode session at a steady human rate
+  chaos        a random mix of all inputs, including power-ups
+
+Every replay goes through ReplayPlayer.runToCompletion() in headless
+Chromium on the virtual clock (the same path as replay_corpus.py). Each
+game.update() tick is timed against the real clock. A replay is reported
+with:
+  - status: "ok", "error" (page errors or an exception from the replay) or
+    "crash" (the page died); the page is reloaded after either
+  - the page errors and console errors raised while it ran
+  - tick-time p50 / p99 / max, and the slowest ticks above --outlier-ms with
+    the game-clock time and entity counts (spores, particles, souls, ...) at
+    that tick, to point at the expensive code in Entities.js and the
+    particle systems
+
+Replays that fail or have outliers are written to --artifacts so they can be
+replayed on their own. --write-only just writes the generated files.
+
+Note on pauses: the game clock stops while paused, so a recorded `resume`
+always shares its `pause`'s t. The generator follows that rule; a resume at
+a later t would never be reached.
+
+Usage:
+  python3 verification/replay_fuzz.py [--scenarios NAME ...] [--seeds N] [--seconds S]
+                                      [--outlier-ms MS] [--json PATH] [--artifacts DIR]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from bench_replay import REAL_CLOCK_INIT  # noqa: E402
+from replay_codec import canonical_events, dump_replay  # noqa: E402
+from replay_corpus import simulation_budget  # noqa: E402
+from screenshot_utils import DETERMINISTIC_RNG_INIT, VIRTUAL_CLOCK_INIT  # noqa: E402
+from server import launch_browser, shared_dist_server  # noqa: E402
+from telemetry import percentile  # noqa: E402
+
+VERIFICATION_DIR = Path(__file__).parent
+REPO_ROOT = VERIFICATION_DIR.parent
+DEFAULT_ARTIFACTS = REPO_ROOT / ".cache" / "fuzz"
+DEFAULT_SECONDS = 60
+DEFAULT_SEEDS = 3
+DEFAULT_OUTLIER_MS = 8.0
+# Mirrors GAME_CONFIG.lanes (src/modules/Constants.js).
+LANES = 7
+TICK_MS = 16
+MAX_OUTLIERS = 10
+MARATHON_MINUTES = 10
+
+# Times every game.update() with the real clock and snapshots entity counts
+# for the slowest ticks. Outliers are kept as a small sorted list, so long
+# sessions do not grow the page heap.
+FUZZ_REPLAY_JS = """
+([replay, maxMs, outlierMs, maxOutliers]) => {
+    const g = window.game;
+    if (!g?.replay?.player) {
+        throw new Error('Replay API not available on window.game');
+    }
+    const now = window.__benchNow;
+    const update = g.update;
+    const durations = [];
+    const outliers = [];
+    const counts = () => {
+        const s = g.state;
+        return {
+            spores: s.spores.length,
+            particles: s.particles.length,
+            soulParticles: s.soulParticles.length,
+            shockwaves: s.shockwaves.length,
+            floatingTexts: s.floatingTexts.length,
+            energyRings: s.energyRings.length,
+        };
+    };
+    g.update = function timedUpdate(dt) {
+        const started = now();
+        try {
+            return update.call(this, dt);
+        } finally {
+            const ms = now() - started;
+            durations.push(ms);
+            if (ms >= outlierMs && (outliers.length < maxOutliers || ms > outliers[outliers.length - 1].ms)) {
+                outliers.push({ tick: durations.length - 1, t: g.state.gameClockMs, ms, counts: counts() });
+                outliers.sort((a, b) => b.ms - a.ms);
+                outliers.length = Math.min(outliers.length, maxOutliers);
+            }
+        }
+    };
+    try {
+        g.replay.player.load(replay);
+        g.replay.player.runToCompletion(g, maxMs);
+    } finally {
+        g.update = update;
+    }
+    return {
+        durations,
+        outliers,
+        complete: g.replay.player.isComplete(),
+        active: g.state.active,
+        score: g.state.score,
+        simMs: g.state.gameClockMs,
+        final: counts(),
+    };
+}
+"""
+
+
+def _replay(seed: int, events: list[dict[str, Any]], mode: str = "campaign") -> dict[str, Any]:
+    return {
+        "version": 1,
+        "seed": seed,
+        "config": {"gameMode": mode, "graphics": "high", "levelIndex": 0},
+        "events": canonical_events([{"t": 0, "type": "start"}, *events]),
+    }
+
+
+class _Inputs:
+    """Event list builder that, like ReplayRecorder, only records aim on a lane change."""
+
+    def __init__(self):
+        self.events: list[dict[str, Any]] = []
+        self._lane = -1
+
+    def aim(self, t: int, lane: int) -> None:
+        if lane != self._lane:
+            self._lane = lane
+            self.events.append({"t": t, "type": "aim", "lane": lane})
+
+    def add(self, t: int, kind: str) -> None:
+        self.events.append({"t": t, "type": kind})
+
+
+def fire_storm(rng: random.Random, seconds: float) -> dict[str, Any]:
+    """A shot every 1-4 ticks at a random lane (roughly 900-3700 APM)."""
+    inputs, t = _Inputs(), TICK_MS
+    while t < seconds * 1000:
+        inputs.aim(t, rng.randrange(LANES))
+        inputs.add(t, "fire")
+        t += TICK_MS * rng.randint(1, 4)
+    return _replay(rng.randrange(2**32), inputs.events)
+
+
+def lane_sweep(rng: random.Random, seconds: float) -> dict[str, Any]:
+    """Sweep 0..6..0, firing on every lane, with a seeded sweep speed."""
+    inputs, t = _Inputs(), TICK_MS
+    step = TICK_MS * rng.randint(2, 6)
+    lanes = list(range(LANES)) + list(range(LANES - 2, 0, -1))
+    index = 0
+    while t < seconds * 1000:
+        inputs.aim(t, lanes[index % len(lanes)])
+        inputs.add(t, "fire")
+        index += 1
+        t += step
+    return _replay(rng.randrange(2**32), inputs.events)
+
+
+def pause_spam(rng: random.Random, seconds: float) -> dict[str, Any]:
+    """Short bursts of fire, each followed by one or more pause/resume toggles."""
+    inputs, t = _Inputs(), TICK_MS
+    while t < seconds * 1000:
+        for _ in range(rng.randint(1, 5)):
+            inputs.aim(t, rng.randrange(LANES))
+            inputs.add(t, "fire")
+            t += TICK_MS * rng.randint(2, 10)
+        for _ in range(rng.randint(1, 3)):
+            inputs.add(t, "pause")
+            inputs.add(t, "resume")
+            t += TICK_MS
+    return _replay(rng.randrange(2**32), inputs.events)
+
+
+def marathon(rng: random.Random, seconds: float) -> dict[str, Any]:
+    """An endless-mode session of at least MARATHON_MINUTES at ~150 APM."""
+    inputs, t = _Inputs(), TICK_MS
+    end = max(seconds, MARATHON_MINUTES * 60) * 1000
+    while t < end:
+        inputs.aim(t, rng.randrange(LANES))
+        inputs.add(t, "fire")
+        t += rng.randint(250, 550)
+    return _replay(rng.randrange(2**32), inputs.events, mode="endless")
+
+
+def chaos(rng: random.Random, seconds: float) -> dict[str, Any]:
+    """Every input type at random intervals, occasionally several in one tick."""
+    inputs, t = _Inputs(), TICK_MS
+    weights = {"aim": 4, "fire": 6, "powerUp": 1, "pause": 1}
+    while t < seconds * 1000:
+        kind = rng.choices(list(weights), weights=list(weights.values()))[0]
+        if kind == "aim":
+            inputs.aim(t, rng.randrange(LANES))
+        elif kind == "pause":
+            inputs.add(t, "pause")
+            inputs.add(t, "resume")
+        else:
+            inputs.add(t, kind)
+        t += TICK_MS * rng.choice((0, 1, 1, 2, 3, 8))
+    mode = rng.choice(("campaign", "endless"))
+    return _replay(rng.randrange(2**32), inputs.events, mode=mode)
+
+
+SCENARIOS: dict[str, Callable[[random.Random, float], dict[str, Any]]] = {
+    "fire_storm": fire_storm,
+    "lane_sweep": lane_sweep,
+    "pause_spam": pause_spam,
+    "marathon": marathon,
+    "chaos": chaos,
+}
+
+
+def generate(scenario: str, seed: int, seconds: float = DEFAULT_SECONDS) -> dict[str, Any]:
+    """The same (scenario, seed, seconds) always yields the same replay."""
+    return SCENARIOS[scenario](random.Random(f"{scenario}:{seed}"), seconds)
+
+
+@dataclass
+class FuzzResult:
+    name: str
+    scenario: str
+    seed: int
+    # "ok" | "error" | "crash"
+    status: str = "ok"
+    events: int = 0
+    ticks: int = 0
+    sim_ms: Optional[float] = None
+    complete: bool = False
+    score: Optional[int] = None
+    tick_p50_ms: Optional[float] = None
+    tick_p99_ms: Optional[float] = None
+    tick_max_ms: Optional[float] = None
+    outliers: list[dict[str, Any]] = field(default_factory=list)
+    final_counts: dict[str, int] = field(default_factory=dict)
+    page_errors: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def apply_outcome(result: FuzzResult, outcome: dict[str, Any]) -> FuzzResult:
+    durations = outcome["durations"]
+    result.ticks = len(durations)
+    result.sim_ms = outcome["simMs"]
+    result.complete = bool(outcome["complete"])
+    result.score = outcome["score"]
+    result.final_counts = outcome["final"]
+    result.outliers = [{**o, "ms": round(o["ms"], 3)} for o in outcome["outliers"]]
+    if durations:
+        result.tick_p50_ms = round(statistics.median(durations), 3)
+        result.tick_p99_ms = round(percentile(durations, 99), 3)
+        result.tick_max_ms = round(max(durations), 3)
+    if result.page_errors and result.status == "ok":
+        result.status = "error"
+    return result
+
+
+def _open_page(browser, url: str, errors: list[str]):
+    context = browser.new_context(viewport={"width": 1280, "height": 800}, device_scale_factor=1)
+    context.add_init_script(DETERMINISTIC_RNG_INIT)
+    context.add_init_script(REAL_CLOCK_INIT)
+    context.add_init_script(VIRTUAL_CLOCK_INIT)
+    page = context.new_page()
+
+    def on_console(msg):
+        if msg.type == "error":
+            errors.append(f"console: {msg.text}")
+
+    page.on("pageerror", lambda exc: errors.append(f"pageerror: {exc}"))
+    page.on("console", on_console)
+    page.goto(url)
+    page.wait_for_selector("#gameCanvas")
+    page.wait_for_function("() => Boolean(window.game?.replay?.player)")
+    return context, page
+
+
+def run_fuzz(jobs: list[tuple[str, int, dict[str, Any]]], url: str, outlier_ms: float) -> list[FuzzResult]:
+    from playwright.sync_api import Error as PlaywrightError
+    from playwright.sync_api import sync_playwright
+
+    results = []
+    errors: list[str] = []
+    with sync_playwright() as playwright:
+        browser = launch_browser(playwright)
+        context, page = _open_page(browser, url, errors)
+        try:
+            for scenario, seed, replay in jobs:
+                result = FuzzResult(f"{scenario}-{seed}", scenario, seed, events=len(replay["events"]))
+                errors.clear()
+                try:
+                    outcome = page.evaluate(
+                        FUZZ_REPLAY_JS, [replay, simulation_budget(replay), outlier_ms, MAX_OUTLIERS]
+                    )
+                    result.page_errors = list(errors)
+                    apply_outcome(result, outcome)
+                except PlaywrightError as exc:
+                    result.page_errors = list(errors)
+                    result.status = "crash" if page.is_closed() or "crash" in str(exc).lower() else "error"
+                    result.error = str(exc).splitlines()[0]
+                if result.status != "ok":
+                    # The session may be half-torn-down; give the next replay a fresh page.
+                    context.close()
+                    context, page = _open_page(browser, url, errors)
+                results.append(result)
+                print(format_result(result))
+        finally:
+            context.close()
+            browser.close()
+    return results
+
+
+def format_result(r: FuzzResult) -> str:
+    if r.status != "ok" and r.tick_p50_ms is None:
+        return f"  [{r.status.upper()}] {r.name}: {r.error or '; '.join(r.page_errors[:1])}"
+    line = (
+        f"  [{r.status.upper()}] {r.name:<16} {r.events:>6} events {r.ticks:>6} ticks  "
+        f"p50 {r.tick_p50_ms:.2f} ms  p99 {r.tick_p99_ms:.2f} ms  max {r.tick_max_ms:.2f} ms"
+    )
+    if r.outliers:
+        worst = r.outliers[0]
+        line += f"  (worst at t={worst['t']:.0f}: {worst['counts']})"
+    if r.page_errors:
+        line += f"\n      {r.page_errors[0]}"
+    return line
+
+
+def write_artifacts(results: list[FuzzResult], replays: dict[str, dict[str, Any]], directory: Path) -> list[Path]:
+    """Save the replays worth re-running on their own: failures and ones with tick outliers."""
+    written = []
+    for r in results:
+        if r.status != "ok" or r.outliers:
+            path = directory / f"{r.name}.ccreplay"
+            directory.mkdir(parents=True, exist_ok=True)
+            dump_replay(replays[r.name], path)
+            written.append(path)
+    return written
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenarios", nargs="*", choices=sorted(SCENARIOS), default=list(SCENARIOS), help="default: all"
+    )
+    parser.add_argument(
+        "--seeds", type=int, default=DEFAULT_SEEDS, help=f"seeds per scenario (default: {DEFAULT_SEEDS})"
+    )
+    parser.add_argument("--first-seed", type=int, default=1, help="first seed (default: 1)")
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        default=DEFAULT_SECONDS,
+        help=f"game-clock length of each replay (default: {DEFAULT_SECONDS}; marathon runs at least "
+        f"{MARATHON_MINUTES} min)",
+    )
+    parser.add_argument(
+        "--outlier-ms",
+        type=float,
+        default=DEFAULT_OUTLIER_MS,
+        help=f"report ticks slower than this (default: {DEFAULT_OUTLIER_MS})",
+    )
+    parser.add_argument("--json", type=Path, default=None, help="write the JSON report here")
+    parser.add_argument(
+        "--artifacts",
+        type=Path,
+        default=DEFAULT_ARTIFACTS,
+        help=f"where replays are written (default: {DEFAULT_ARTIFACTS})",
+    )
+    parser.add_argument("--write-only", action="store_true", help="write every generated replay and exit")
+    return parser.parse_args(argv)
+
+
+def run(argv=None) -> int:
+    args = parse_args(argv)
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    jobs = [(s, seed, generate(s, seed, args.seconds)) for s in args.scenarios for seed in seeds]
+    replays = {f"{s}-{seed}": replay for s, seed, replay in jobs}
+
+    if args.write_only:
+        args.artifacts.mkdir(parents=True, exist_ok=True)
+        for name, replay in replays.items():
+            dump_replay(replay, args.artifacts / f"{name}.ccreplay")
+        print(f"Wrote {len(replays)} replay(s) to {args.artifacts}")
+        return 0
+
+    with shared_dist_server(REPO_ROOT / "dist") as server:
+        print(f"Fuzzing {len(jobs)} replay(s) against {server.url}")
+        results = run_fuzz(jobs, server.url, args.outlier_ms)
+
+    failed = [r for r in results if r.status != "ok"]
+    worst = max((r for r in results if r.tick_max_ms is not None), key=lambda r: r.tick_max_ms, default=None)
+    print(f"\n{len(results) - len(failed)}/{len(results)} replays ran clean")
+    if worst:
+        print(f"Slowest tick: {worst.tick_max_ms:.2f} ms in {worst.name}")
+    written = write_artifacts(results, replays, args.artifacts)
+    if written:
+        print(f"Saved {len(written)} replay(s) to {args.artifacts} for re-running")
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps([asdict(r) for r in results], indent=2), encoding="utf-8")
+        print(f"JSON report: {args.json}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
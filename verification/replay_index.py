@@ -0,0 +1,419 @@
+"""Index a .ccreplay corpus and reject implausible replays without a browser.
+
+Each replay (JSON or binary, see replay_codec.py) is read as a stream of
+events in file order, once. The index entry records:
+  - event counts per type, the duration (last event's t) and the lanes aimed at
+  - the milestone score curve (t, kind, lane, score for every milestone)
+  - the problems found, if any
+
+A replay is rejected when it could not have come from ReplayRecorder:
+  - the file is malformed or its header fails parseReplayFile()'s checks
+  - it does not open with `start` at t=0, or t ever goes backwards
+  - an aim or milestone lane is outside 0..GAME_CONFIG.lanes-1
+  - an event type or milestone kind is unknown
+  - milestone scores decrease, or expect.finalScore is below the last one
+  - a score is more than the matches before it can pay: MATCH_POINTS each
+    (CollisionSystem) plus one boss rewards.scoreBonus per boss-hp matches
+    (src/data/bosses.json, paid by Game.handleBossDefeat without a milestone)
+  - there are more matches than MAX_MATCHES_PER_SPORE per spore fired
+
+The index is kept in a small SQLite file. Entries are reused while a file's
+size and mtime are unchanged, so re-indexing a growing corpus only reads the
+new files. replay_corpus.py runs the same checks before spending any browser
+time on a replay.
+
+Usage:
+  python3 verification/replay_index.py [CORPUS ...] [--db PATH] [--json PATH]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from replay_codec import (  # noqa: E402
+    BINARY_SUFFIX,
+    EVENT_TYPES,
+    JSON_SUFFIX,
+    MILESTONE_KINDS,
+    ReplayFormatError,
+    open_replay,
+)
+
+VERIFICATION_DIR = Path(__file__).parent
+DEFAULT_CORPUS = VERIFICATION_DIR / "fixtures"
+DEFAULT_DB = VERIFICATION_DIR.parent / ".cache" / "replays" / "index.sqlite"
+REPLAY_SUFFIXES = (JSON_SUFFIX, BINARY_SUFFIX)
+BOSSES_FILE = VERIFICATION_DIR.parent / "src" / "data" / "bosses.json"
+# Mirrors GAME_CONFIG.lanes (src/modules/Constants.js).
+LANES = 7
+# Points per matched crystal (src/modules/systems/CollisionSystem.js); there
+# is no combo multiplier, and levels pay no completion bonus.
+MATCH_POINTS = 10
+# A spore resolves its top and bottom crystals independently and never pierces,
+# so one fire can score at most two matches.
+MAX_MATCHES_PER_SPORE = 2
+# Stop collecting problems after this many; the replay is rejected either way.
+MAX_PROBLEMS = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS replays (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    format TEXT,
+    status TEXT NOT NULL,
+    problems TEXT NOT NULL,
+    seed INTEGER,
+    game_mode TEXT,
+    level_index INTEGER,
+    duration_ms REAL,
+    events INTEGER NOT NULL,
+    counts TEXT NOT NULL,
+    matches INTEGER NOT NULL,
+    lanes_used TEXT NOT NULL,
+    last_milestone_score INTEGER,
+    expected_score INTEGER
+);
+CREATE TABLE IF NOT EXISTS milestones (
+    path TEXT NOT NULL REFERENCES replays(path) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    t REAL NOT NULL,
+    kind TEXT,
+    lane INTEGER,
+    score INTEGER,
+    PRIMARY KEY (path, seq)
+);
+"""
+
+
+@dataclass
+class ReplayIndexEntry:
+    path: str
+    size: int
+    mtime_ns: int
+    # "ok" | "rejected"
+    status: str = "ok"
+    problems: list[str] = field(default_factory=list)
+    format: Optional[str] = None
+    seed: Optional[int] = None
+    game_mode: Optional[str] = None
+    level_index: Optional[int] = None
+    duration_ms: Optional[float] = None
+    events: int = 0
+    counts: dict[str, int] = field(default_factory=dict)
+    matches: int = 0
+    lanes_used: list[int] = field(default_factory=list)
+    last_milestone_score: Optional[int] = None
+    # expect.finalScore from the header.
+    expected_score: Optional[int] = None
+    # (t, kind, lane, score) per milestone, in file order.
+    score_curve: list[tuple] = field(default_factory=list)
+
+    def reject(self, problem: str) -> None:
+        self.status = "rejected"
+        if len(self.problems) < MAX_PROBLEMS:
+            self.problems.append(problem)
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_lane(entry: ReplayIndexEntry, event: dict, index: int) -> Optional[int]:
+    if "lane" not in event:
+        return None
+    lane = event["lane"]
+    if not _is_int(lane) or not 0 <= lane < LANES:
+        entry.reject(f"event {index} ({event['type']}): lane {lane!r} outside 0..{LANES - 1}")
+        return None
+    return lane
+
+
+def index_replay(path: Path, label: Optional[str] = None) -> ReplayIndexEntry:
+    """Stream one replay and summarize it; never raises for a bad file."""
+    stat = path.stat()
+    entry = ReplayIndexEntry(label or path.as_posix(), stat.st_size, stat.st_mtime_ns)
+    try:
+        stream = open_replay(path)
+        header = stream.header
+        entry.format = stream.format
+        entry.seed = header.get("seed")
+        config = header.get("config") or {}
+        entry.game_mode = config.get("gameMode")
+        entry.level_index = config.get("levelIndex")
+        expected = (header.get("expect") or {}).get("finalScore")
+        entry.expected_score = expected
+        _scan_events(entry, stream.file_events())
+    except (OSError, ReplayFormatError, UnicodeDecodeError, ValueError) as exc:
+        entry.reject(f"{type(exc).__name__}: {exc}")
+        return entry
+
+    if expected is not None:
+        if not _is_int(expected) or expected < 0:
+            entry.reject(f"expect.finalScore {expected!r} is not a non-negative integer")
+        else:
+            if expected > score_ceiling(entry.matches):
+                entry.reject(
+                    f"expect.finalScore {expected} exceeds what {entry.matches} match(es) can pay "
+                    f"({score_ceiling(entry.matches)})"
+                )
+            if entry.last_milestone_score is not None and expected < entry.last_milestone_score:
+                entry.reject(
+                    f"expect.finalScore {expected} is below the last milestone score {entry.last_milestone_score}"
+                )
+    return entry
+
+
+def _scan_events(entry: ReplayIndexEntry, events: Iterable[dict]) -> None:
+    counts: Counter[str] = Counter()
+    lanes: set[int] = set()
+    previous_t = None
+    for index, event in enumerate(events):
+        kind, t = event["type"], event["t"]
+        counts[kind] += 1
+        if index == 0 and (kind != "start" or t != 0):
+            entry.reject(f"event 0 is {kind} at t={t}, expected start at t=0")
+        if t < 0:
+            entry.reject(f"event {index} ({kind}): negative t={t}")
+        if previous_t is not None and t < previous_t:
+            entry.reject(f"event {index} ({kind}): t={t} goes back from t={previous_t}")
+        previous_t = t
+        if kind not in EVENT_TYPES:
+            entry.reject(f"event {index}: unknown type {kind!r}")
+            continue
+
+        lane = _check_lane(entry, event, index)
+        if kind == "aim" and lane is not None:
+            lanes.add(lane)
+        if kind != "milestone":
+            continue
+
+        milestone_kind = event.get("kind")
+        if milestone_kind not in MILESTONE_KINDS:
+            entry.reject(f"event {index}: unknown milestone kind {milestone_kind!r}")
+        score = event.get("score")
+        if score is not None:
+            _check_score(entry, index, score)
+        entry.score_curve.append((t, milestone_kind, lane, score))
+        if milestone_kind == "match":
+            entry.matches += 1
+            if entry.matches > MAX_MATCHES_PER_SPORE * counts["fire"]:
+                entry.reject(f"event {index}: match #{entry.matches} but only {counts['fire']} spore(s) fired")
+
+    entry.events = sum(counts.values())
+    entry.counts = dict(sorted(counts.items()))
+    entry.duration_ms = previous_t
+    entry.lanes_used = sorted(lanes)
+
+
+def _boss_rewards(path: Path = BOSSES_FILE) -> tuple[int, int]:
+    """(fewest matches that can defeat a boss, largest defeat bonus)."""
+    bosses = json.loads(path.read_text(encoding="utf-8"))["bosses"]
+    if not bosses:
+        return 1, 0
+    # BossController.onMatch deals 1 damage per match.
+    min_hp = min(max(1, int(b.get("hp", 1))) for b in bosses)
+    max_bonus = max(int((b.get("rewards") or {}).get("scoreBonus", 0)) for b in bosses)
+    return min_hp, max_bonus
+
+
+BOSS_MIN_HP, BOSS_MAX_BONUS = _boss_rewards()
+
+
+def score_ceiling(matches: int) -> int:
+    """Most score `matches` matches can have paid, including boss defeat bonuses."""
+    return matches * MATCH_POINTS + (matches // BOSS_MIN_HP) * BOSS_MAX_BONUS
+
+
+def _check_score(entry: ReplayIndexEntry, index: int, score: Any) -> None:
+    if not _is_int(score) or score < 0:
+        entry.reject(f"event {index}: milestone score {score!r} is not a non-negative integer")
+        return
+    if entry.last_milestone_score is not None and score < entry.last_milestone_score:
+        entry.reject(f"event {index}: score drops from {entry.last_milestone_score} to {score}")
+    # A match milestone carries the score before its own points arrive.
+    ceiling = score_ceiling(entry.matches)
+    if score > ceiling:
+        entry.reject(
+            f"event {index}: score jumps from {entry.last_milestone_score or 0} to {score}, "
+            f"but {entry.matches} earlier match(es) can pay at most {ceiling}"
+        )
+    entry.last_milestone_score = score
+
+
+class ReplayIndex:
+    """SQLite-backed store of ReplayIndexEntry rows, one per replay path."""
+
+    def __init__(self, db_path: Path | str):
+        self.db_path = Path(db_path)
+        if str(db_path) != ":memory:":
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path))
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ReplayIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def is_current(self, label: str, path: Path) -> bool:
+        stat = path.stat()
+        row = self._conn.execute("SELECT size, mtime_ns FROM replays WHERE path = ?", (label,)).fetchone()
+        return row == (stat.st_size, stat.st_mtime_ns)
+
+    def put(self, entry: ReplayIndexEntry) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM replays WHERE path = ?", (entry.path,))
+            self._conn.execute(
+                "INSERT INTO replays VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.path,
+                    entry.size,
+                    entry.mtime_ns,
+                    entry.format,
+                    entry.status,
+                    json.dumps(entry.problems),
+                    entry.seed,
+                    entry.game_mode,
+                    entry.level_index,
+                    entry.duration_ms,
+                    entry.events,
+                    json.dumps(entry.counts),
+                    entry.matches,
+                    ",".join(map(str, entry.lanes_used)),
+                    entry.last_milestone_score,
+                    entry.expected_score if _is_int(entry.expected_score) else None,
+                ),
+            )
+            self._conn.executemany(
+                "INSERT INTO milestones VALUES (?, ?, ?, ?, ?, ?)",
+                [(entry.path, seq, *point) for seq, point in enumerate(entry.score_curve)],
+            )
+
+    def get(self, label: str) -> Optional[ReplayIndexEntry]:
+        row = self._conn.execute("SELECT * FROM replays WHERE path = ?", (label,)).fetchone()
+        if row is None:
+            return None
+        entry = ReplayIndexEntry(
+            path=row[0],
+            size=row[1],
+            mtime_ns=row[2],
+            format=row[3],
+            status=row[4],
+            problems=json.loads(row[5]),
+            seed=row[6],
+            game_mode=row[7],
+            level_index=row[8],
+            duration_ms=row[9],
+            events=row[10],
+            counts=json.loads(row[11]),
+            matches=row[12],
+            lanes_used=[int(lane) for lane in row[13].split(",") if lane],
+            last_milestone_score=row[14],
+            expected_score=row[15],
+        )
+        entry.score_curve = [
+            tuple(point)
+            for point in self._conn.execute(
+                "SELECT t, kind, lane, score FROM milestones WHERE path = ? ORDER BY seq", (label,)
+            )
+        ]
+        return entry
+
+    def prune(self, keep: set[str]) -> int:
+        """Drop rows for replays no longer in the corpus; returns how many."""
+        stale = [row[0] for row in self._conn.execute("SELECT path FROM replays") if row[0] not in keep]
+        with self._conn:
+            self._conn.executemany("DELETE FROM replays WHERE path = ?", [(p,) for p in stale])
+        return len(stale)
+
+
+def update_index(index: ReplayIndex, paths: list[Path], labels: list[str]) -> tuple[list[ReplayIndexEntry], int]:
+    """Index every path, reusing unchanged rows; returns (entries in path order, files read)."""
+    entries, read = [], 0
+    for path, label in zip(paths, labels):
+        entry = index.get(label) if index.is_current(label, path) else None
+        if entry is None:
+            entry = index_replay(path, label)
+            index.put(entry)
+            read += 1
+        entries.append(entry)
+    return entries, read
+
+
+def discover_replays(roots: list[Path]) -> list[Path]:
+    """Every replay (JSON or binary) under the given directories, or the files themselves, sorted."""
+    found = set()
+    for root in roots:
+        if root.is_file():
+            found.add(root)
+        else:
+            found.update(p for p in root.rglob("*") if p.suffix in REPLAY_SUFFIXES and p.is_file())
+    return sorted(found)
+
+
+def label_for(path: Path, roots: list[Path]) -> str:
+    for root in roots:
+        if root.is_dir() and root in path.parents:
+            return path.relative_to(root).as_posix()
+    return path.as_posix()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "corpus",
+        nargs="*",
+        type=Path,
+        default=[DEFAULT_CORPUS],
+        help="directories (searched recursively) or replay files (default: verification/fixtures)",
+    )
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"SQLite index (default: {DEFAULT_DB})")
+    parser.add_argument("--json", type=Path, default=None, help="also write every entry as JSON here")
+    return parser.parse_args(argv)
+
+
+def run(argv=None) -> int:
+    args = parse_args(argv)
+    paths = discover_replays(args.corpus)
+    if not paths:
+        print(f"No {' or '.join(REPLAY_SUFFIXES)} files found in {', '.join(map(str, args.corpus))}.")
+        return 1
+    labels = [label_for(p, args.corpus) for p in paths]
+
+    started = time.perf_counter()
+    with ReplayIndex(args.db) as index:
+        entries, read = update_index(index, paths, labels)
+        pruned = index.prune(set(labels))
+    elapsed = time.perf_counter() - started
+
+    rejected = [e for e in entries if e.status != "ok"]
+    for entry in rejected:
+        print(f"[REJECTED] {entry.path}: {'; '.join(entry.problems)}")
+    print(
+        f"\n{len(entries) - len(rejected)}/{len(entries)} replays plausible "
+        f"({read} read, {len(entries) - read} unchanged, {pruned} pruned) in {elapsed:.2f}s -> {args.db}"
+    )
+    if args.json:
+        args.json.parent.mkdir(parents=True, exist_ok=True)
+        args.json.write_text(json.dumps([asdict(e) for e in entries], indent=2), encoding="utf-8")
+        print(f"JSON index: {args.json}")
+    return 0 if not rejected else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -1,15 +1,37 @@
 """Runs every self-contained verification script against a production build.
 
-Each script starts (and stops) its own static server via server.DistServer, so
-this can run end-to-end with no server pre-started. Requires `npm run build`
-to have produced `dist/` first.
+The runner starts one static server (server.shared_dist_server) that every
+script's DistServer attaches to, so this can run end-to-end with no server
+pre-started. Requires `npm run build` to have produced `dist/` first.
 
-Usage: python3 verification/run_all.py
+With `--jobs N` (N > 1) up to N scripts run at once, each as its own
+subprocess driven by one of N worker threads; they share a pool of N warm
+Chromium instances and each script still gets its own browser context.
+Output is buffered per script and printed when it finishes so logs do not
+interleave.
+
+With `--precompress` the shared server's build gets .br/.gz siblings first
+(precompress.py), so scripts load the same encoded assets production serves.
+
+With `--profile [DIR]` every script's pages run under the CDP sampling
+profiler and Chromium tracing (profiling.py); .cpuprofile, trace and
+self-time summary files land in DIR (default: .cache/profiles). Build with
+`npm run build:profile` first so the summaries map to src/ names.
+
+Usage: python3 verification/run_all.py [--jobs N] [--precompress] [--profile [DIR]]
 """
+import argparse
+import os
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from profiling import DEFAULT_PROFILE_DIR, PROFILE_ENV
+from server import SHARED_CDP_ENV, shared_dist_server
+
 VERIFICATION_DIR = Path(__file__).parent
 EXCLUDE = {"server.py", "run_all.py"}
 
@@ -20,26 +42,117 @@ def discover_scripts():
     )
 
 
-def run():
+def run_sequential(scripts):
+    results = []
+    for script in scripts:
+        print(f"\n=== Running {script.name} ===")
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, str(script)], cwd=VERIFICATION_DIR.parent)
+        results.append((script.name, result.returncode == 0, time.perf_counter() - started))
+    return results
+
+
+def run_parallel(scripts, jobs):
+    from browser_pool import BrowserPool
+
+    print_lock = threading.Lock()
+
+    with BrowserPool(jobs) as pool:
+        print(f"{jobs} warm Chromium instance(s)")
+
+        def run_one(script):
+            try:
+                with pool.lease() as endpoint:
+                    env = dict(os.environ)
+                    env[SHARED_CDP_ENV] = endpoint
+                    started = time.perf_counter()
+                    result = subprocess.run(
+                        [sys.executable, str(script)],
+                        cwd=VERIFICATION_DIR.parent,
+                        env=env,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,
+                        text=True,
+                    )
+                    elapsed = time.perf_counter() - started
+            except (OSError, RuntimeError) as exc:
+                # A pooled browser that could not be restarted fails only this script.
+                with print_lock:
+                    print(f"\n=== {script.name} ===\n[error] {exc}")
+                return script.name, False, 0.0
+            with print_lock:
+                print(f"\n=== {script.name} ({elapsed:.1f}s) ===")
+                print(result.stdout, end="")
+            return script.name, result.returncode == 0, elapsed
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(run_one, scripts))
+
+
+def print_timings(results, wall_time):
+    print("\n=== Wall Time by Script (slowest first) ===")
+    for name, _passed, elapsed in sorted(results, key=lambda r: r[2], reverse=True):
+        print(f"{elapsed:8.1f}s  {name}")
+    total = sum(elapsed for _name, _passed, elapsed in results)
+    print(f"\nTotal script time {total:.1f}s, wall time {wall_time:.1f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="number of scripts to run in parallel (default: 1, sequential)",
+    )
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        help="write .br/.gz siblings into dist/ before serving it",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        type=Path,
+        const=DEFAULT_PROFILE_DIR,
+        default=None,
+        metavar="DIR",
+        help="save a CPU profile, trace and self-time summary per script (default DIR: .cache/profiles)",
+    )
+    return parser.parse_args(argv)
+
+
+def run(argv=None):
+    args = parse_args(argv)
     scripts = discover_scripts()
     if not scripts:
         print("No verification scripts found.")
         return 1
 
-    results = []
-    for script in scripts:
-        print(f"\n=== Running {script.name} ===")
-        result = subprocess.run([sys.executable, str(script)], cwd=VERIFICATION_DIR.parent)
-        results.append((script.name, result.returncode == 0))
+    if args.profile:
+        # Inherited by every script, sequential or pooled.
+        os.environ[PROFILE_ENV] = str(args.profile.resolve())
+        print(f"Profiling into {args.profile}")
+
+    started = time.perf_counter()
+    with shared_dist_server(VERIFICATION_DIR.parent / "dist", precompress=args.precompress) as server:
+        print(f"Shared server at {server.url}")
+        if args.jobs > 1:
+            results = run_parallel(scripts, min(args.jobs, len(scripts)))
+        else:
+            results = run_sequential(scripts)
+    wall_time = time.perf_counter() - started
 
     print("\n=== Verification Summary ===")
     failures = 0
-    for name, passed in results:
+    for name, passed, _elapsed in results:
         status = "PASS" if passed else "FAIL"
         if not passed:
             failures += 1
         print(f"[{status}] {name}")
 
+    print_timings(results, wall_time)
     print(f"\n{len(results) - failures}/{len(results)} scripts passed")
     return 1 if failures else 0
 
@@ -1,19 +1,40 @@
 """Run canonical visual verification scripts and compare screenshots to baselines.
 
+Specs with region budgets (visual_manifest.DiffRegion) are scored per region
+from a tiled diff, which needs NumPy. Pass --heatmaps to also write a per-tile
+<name>_heatmap.png next to each failing spec's _diff.png.
+
 Usage (from repo root):
     npm run build
-    python3 verification/run_visual.py
+    python3 verification/run_visual.py [--heatmaps]
 """
 from __future__ import annotations
 
+import argparse
 import subprocess
 import sys
+from collections import Counter
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from visual_diff import compare_images, require_pillow
-from visual_manifest import BASELINES_DIR, CANONICAL_VISUALS, DIFFS_DIR, REPO_ROOT
+from baseline_cache import cache_available, prune
+from server import shared_dist_server
+from visual_diff import (
+    DIFF_TIERS,
+    check_regions,
+    check_within_threshold,
+    compare_images,
+    require_pillow,
+    write_heatmap,
+)
+from visual_manifest import (
+    BASELINES_DIR,
+    CANONICAL_VISUALS,
+    DIFFS_DIR,
+    REPO_ROOT,
+    iter_screenshot_specs,
+)
 
 
 def run_script(script_name: str) -> bool:
@@ -26,10 +47,10 @@ def run_script(script_name: str) -> bool:
     return result.returncode == 0
 
 
-def compare_screenshots() -> list[tuple[str, str, bool, str]]:
+def compare_screenshots(heatmaps: bool = False) -> list[tuple[str, str, bool, str, str | None]]:
     require_pillow()
     DIFFS_DIR.mkdir(parents=True, exist_ok=True)
-    results: list[tuple[str, str, bool, str]] = []
+    results: list[tuple[str, str, bool, str, str | None]] = []
 
     for script_name, spec in (
         (entry.script, screenshot)
@@ -37,61 +58,103 @@ def compare_screenshots() -> list[tuple[str, str, bool, str]]:
         for screenshot in entry.screenshots
     ):
         label = f"{script_name} -> {Path(spec.baseline).name}"
+        tiled = cache_available()
+        if spec.regions and not tiled:
+            message = "region budgets need NumPy (pip install numpy)"
+            print(f"[FAIL] {label}: {message}")
+            results.append((script_name, label, False, message, None))
+            continue
         try:
             diff = compare_images(
                 spec.baseline_path(),
                 spec.actual_path(),
                 pixel_threshold=spec.pixel_threshold,
+                baseline_cache=tiled,
+                fast_paths=True,
+                tile_size=spec.tile_size if tiled else None,
             )
-            passed, message = _check(diff, spec.max_diff_ratio)
-            if not passed:
-                compare_images(
-                    spec.baseline_path(),
-                    spec.actual_path(),
-                    pixel_threshold=spec.pixel_threshold,
+            if tiled and spec.regions:
+                passed, message = _check_regions(diff, spec)
+            else:
+                passed, message = check_within_threshold(
+                    diff,
+                    spec.max_diff_ratio,
                     diff_output_path=spec.diff_path(),
                 )
-                print(f"[FAIL] {label}: {message} (diff: {spec.diff_path()})")
+            message = f"{message} [{diff.tier} tier]"
+            if not passed:
+                artifacts = f"diff: {spec.diff_path()}"
+                if heatmaps and tiled:
+                    write_heatmap(diff, spec.regions, spec.max_diff_ratio, spec.heatmap_path())
+                    artifacts += f", heatmap: {spec.heatmap_path()}"
+                print(f"[FAIL] {label}: {message} ({artifacts})")
             else:
                 print(f"[PASS] {label}: {message}")
-            results.append((script_name, label, passed, message))
+            results.append((script_name, label, passed, message, diff.tier))
         except FileNotFoundError as exc:
             print(f"[FAIL] {label}: {exc}")
-            results.append((script_name, label, False, str(exc)))
+            results.append((script_name, label, False, str(exc), None))
 
+    if cache_available():
+        prune(spec.baseline_path() for _script, spec in iter_screenshot_specs())
     return results
 
 
-def _check(diff, max_diff_ratio: float) -> tuple[bool, str]:
-    pct = diff.diff_ratio * 100
-    limit_pct = max_diff_ratio * 100
-    if diff.diff_ratio <= max_diff_ratio:
-        return True, f"{pct:.2f}% pixels differ (limit {limit_pct:.2f}%)"
-    return False, f"{pct:.2f}% pixels differ, exceeds limit {limit_pct:.2f}%"
+def _check_regions(diff, spec) -> tuple[bool, str]:
+    checks = check_regions(diff, spec.regions, spec.max_diff_ratio)
+    failed = [check for check in checks if not check.passed]
+    if failed:
+        diff.write_diff(spec.diff_path())
+    summary = ", ".join(
+        f"{check.name} {check.diff_ratio * 100:.2f}%"
+        f"{'>' if not check.passed else '<='}{check.max_diff_ratio * 100:.2f}%"
+        for check in checks
+    )
+    if failed:
+        return False, f"{len(failed)} region(s) over budget: {summary}"
+    return True, f"all regions within budget: {summary}"
 
 
-def run() -> int:
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--heatmaps",
+        action="store_true",
+        help="write a per-tile heatmap next to each failing spec's diff image",
+    )
+    return parser.parse_args(argv)
+
+
+def run(argv=None) -> int:
+    args = parse_args(argv)
     if not BASELINES_DIR.is_dir():
         print(f"[error] Baselines directory not found: {BASELINES_DIR}")
         print("Run: python3 verification/update_baselines.py")
         return 1
 
     script_failures: list[str] = []
-    for entry in CANONICAL_VISUALS:
-        if not run_script(entry.script):
-            script_failures.append(entry.script)
+    with shared_dist_server(REPO_ROOT / "dist"):
+        for entry in CANONICAL_VISUALS:
+            if not run_script(entry.script):
+                script_failures.append(entry.script)
 
     print("\n=== Visual Baseline Comparison ===")
-    comparison_results = compare_screenshots()
+    comparison_results = compare_screenshots(heatmaps=args.heatmaps)
 
     print("\n=== Visual Regression Summary ===")
     visual_failures = 0
-    for _script, label, passed, message in comparison_results:
+    for _script, label, passed, message, _tier in comparison_results:
         status = "PASS" if passed else "FAIL"
         if not passed:
             visual_failures += 1
         print(f"[{status}] {label}: {message}")
 
+    tier_counts = Counter(tier for *_rest, tier in comparison_results if tier is not None)
+    print(
+        "\nDecided by tier: "
+        + ", ".join(f"{tier} {tier_counts.get(tier, 0)}" for tier in DIFF_TIERS)
+    )
+
     if script_failures:
         print("\nScript failures:")
         for name in script_failures:
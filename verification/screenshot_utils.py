@@ -1,6 +1,17 @@
-"""Helpers for deterministic Playwright screenshots in visual regression tests."""
+"""Helpers for deterministic Playwright screenshots in visual regression tests.
+
+Deterministic contexts also install a virtual clock: requestAnimationFrame,
+performance.now, Date.now, setTimeout and setInterval are driven by advance(),
+which steps the game in fixed 16 ms frames as fast as the CPU allows instead
+of sleeping. Each frame ends by yielding one real task, so Worker replies that
+have already arrived are delivered before the next frame; a reply still being
+computed lands in a later frame, so worker-driven state depends on host speed.
+Set VERIFY_REAL_TIME=1 (or pass virtual_time=False) to fall back to
+wall-clock sleeps.
+"""
 from __future__ import annotations
 
+import os
 import time
 from pathlib import Path
 
@@ -19,6 +30,100 @@ DETERMINISTIC_RNG_INIT = """
 })();
 """
 
+REAL_TIME_ENV = "VERIFY_REAL_TIME"
+VIRTUAL_FRAME_MS = 16
+
+# Frames and timers only run inside __virtualClock.advance(); between calls the
+# page is frozen, so captures no longer depend on how fast the host is. Within
+# a frame, due timers run first (by due time, ties in creation order), then the
+# frame's rAF callbacks in request order.
+VIRTUAL_CLOCK_INIT = """
+(() => {
+    const realSetTimeout = window.setTimeout.bind(window);
+    const channel = typeof MessageChannel === 'function' ? new MessageChannel() : null;
+    const epoch = Date.now();
+    let now = 1000;
+    let nextId = 1;
+    let frameQueue = [];
+    const timers = new Map();
+
+    const report = (err) => realSetTimeout(() => { throw err; }, 0);
+    // One real task, so queued events such as Worker messages are dispatched.
+    const yieldTask = () => new Promise((resolve) => {
+        if (!channel) return realSetTimeout(resolve, 0);
+        channel.port1.onmessage = () => resolve();
+        channel.port2.postMessage(null);
+    });
+
+    performance.now = () => now;
+    Date.now = () => epoch + now;
+    window.requestAnimationFrame = (cb) => {
+        const id = nextId++;
+        frameQueue.push({ id, cb });
+        return id;
+    };
+    window.cancelAnimationFrame = (id) => {
+        frameQueue = frameQueue.filter((entry) => entry.id !== id);
+    };
+    window.setTimeout = (fn, delay = 0, ...args) => {
+        const id = nextId++;
+        timers.set(id, { at: now + Math.max(0, Number(delay) || 0), fn, args, every: 0 });
+        return id;
+    };
+    window.setInterval = (fn, delay = 0, ...args) => {
+        const id = nextId++;
+        // At least 1 ms, so a zero-delay interval cannot spin a frame forever.
+        const every = Math.max(1, Number(delay) || 0);
+        timers.set(id, { at: now + every, fn, args, every });
+        return id;
+    };
+    // As in browsers, either clear function cancels either kind of timer.
+    window.clearTimeout = (id) => { timers.delete(id); };
+    window.clearInterval = window.clearTimeout;
+
+    const runDueTimers = () => {
+        for (;;) {
+            let due = null;
+            for (const [id, timer] of timers) {
+                if (timer.at <= now && (!due || timer.at < due[1].at)) due = [id, timer];
+            }
+            if (!due) return;
+            // Intervals are rescheduled before running, so the callback may clear them.
+            if (due[1].every) due[1].at += due[1].every;
+            else timers.delete(due[0]);
+            if (typeof due[1].fn !== 'function') continue;
+            try { due[1].fn(...due[1].args); } catch (err) { report(err); }
+        }
+    };
+
+    window.__virtualClock = {
+        now: () => now,
+        async advance(ms, frameMs) {
+            const end = now + ms;
+            while (now < end) {
+                now = Math.min(end, now + frameMs);
+                runDueTimers();
+                const frame = frameQueue;
+                frameQueue = [];
+                for (const { cb } of frame) {
+                    try { cb(now); } catch (err) { report(err); }
+                }
+                // Let promise continuations settle and pending events arrive.
+                await yieldTask();
+            }
+            return now;
+        },
+    };
+})();
+"""
+
+ADVANCE_VIRTUAL_JS = """
+([ms, frameMs]) => {
+    if (!window.__virtualClock) return false;
+    return window.__virtualClock.advance(ms, frameMs).then(() => true);
+}
+"""
+
 FREEZE_PATCH_JS = """
 () => {
     const g = window.game;
@@ -67,25 +172,35 @@ CLEAR_SNAPSHOT_JS = """
 """
 
 
-def new_deterministic_context(browser, viewport=None):
-    """Browser context with a seeded Math.random for reproducible captures."""
+def virtual_time_enabled() -> bool:
+    return os.environ.get(REAL_TIME_ENV, "") in ("", "0")
+
+
+def new_deterministic_context(browser, viewport=None, *, virtual_time=None):
+    """Browser context with a seeded Math.random (and virtual clock) for reproducible captures."""
     kwargs = {"device_scale_factor": 1}
     if viewport is not None:
         kwargs["viewport"] = viewport
     context = browser.new_context(**kwargs)
     context.add_init_script(DETERMINISTIC_RNG_INIT)
+    if virtual_time is None:
+        virtual_time = virtual_time_enabled()
+    if virtual_time:
+        context.add_init_script(VIRTUAL_CLOCK_INIT)
     return context
 
 
-def new_deterministic_page(browser, viewport=None):
-    """Page with seeded RNG for reproducible captures."""
-    return new_deterministic_context(browser, viewport).new_page()
+def new_deterministic_page(browser, viewport=None, *, virtual_time=None):
+    """Page with seeded RNG (and virtual clock) for reproducible captures."""
+    return new_deterministic_context(browser, viewport, virtual_time=virtual_time).new_page()
 
 
 def advance(page, milliseconds: int) -> None:
-    """Advance wall-clock time while the game loop runs."""
+    """Advance game time: step the virtual clock if installed, else sleep wall-clock time."""
     if milliseconds <= 0:
         return
+    if page.evaluate(ADVANCE_VIRTUAL_JS, [milliseconds, VIRTUAL_FRAME_MS]):
+        return
     time.sleep(milliseconds / 1000)
 
 
@@ -103,7 +218,7 @@ def capture_deterministic_screenshot(
     """Freeze animation at a fixed timestamp, then capture the game canvas."""
     freeze_visual_loop(page)
     page.evaluate(SET_SNAPSHOT_JS, timestamp)
-    page.wait_for_timeout(settle_ms)
+    advance(page, settle_ms)
     page.evaluate(
         "(ts) => { const g = window.game; if (g) g.renderer.draw(g.state, g.launcher, ts); }",
         timestamp,
@@ -1,18 +1,35 @@
 """Shared helper for verification scripts: serves dist/ over HTTP and configures Chromium.
 
 Usage:
-    from server import DistServer, CHROMIUM_ARGS, report_screenshot, report_failure
+    from server import DistServer, launch_browser, report_screenshot, report_failure
 
     with DistServer() as server:
-        browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+        browser = launch_browser(p)
         page.goto(server.url)
+
+Runners (run_all.py, run_visual.py, update_baselines.py) wrap their session in
+shared_dist_server(), which exports SHARED_SERVER_ENV so every DistServer in
+the child scripts attaches to one long-lived server instead of starting its
+own. Scripts run standalone still start a private server. Under
+`run_all.py --jobs N` the runner also exports SHARED_CDP_ENV so
+launch_browser() connects to a warm pooled Chromium instead of cold-launching.
+Under `run_all.py --profile` it exports profiling.PROFILE_ENV, and
+launch_browser() returns a ProfiledBrowser that saves a CPU profile per page.
+DistServer(precompress=True) first runs the repo's precompress.py over the
+build so the threaded backend serves the same .br/.gz bytes as production.
 """
+import os
 import socket
 import subprocess
 import sys
 import time
 import urllib.error
 import urllib.request
+from contextlib import contextmanager
+
+from profiling import maybe_profile
+from static_server import StaticFileServer
+from visual_manifest import REPO_ROOT
 
 # Explicit launch args so Chromium runs reliably in CI/containers where the
 # default sandbox and /dev/shm size are unavailable or too small.
@@ -22,6 +39,12 @@ CHROMIUM_ARGS = [
     "--disable-gpu",
 ]
 
+# Exported by the verification runners; see module docstring.
+SHARED_SERVER_ENV = "VERIFY_DIST_URL"
+SHARED_CDP_ENV = "VERIFY_CDP_ENDPOINT"
+
+SERVER_BACKENDS = ("threaded", "subprocess")
+
 
 def find_free_port():
     """Ask the OS for an unused localhost port."""
@@ -31,23 +54,52 @@ def find_free_port():
 
 
 class DistServer:
-    """Starts `python3 -m http.server` over a build directory on an available port.
+    """Serves a build directory on an available port.
+
+    The default "threaded" backend is the in-process static_server (threaded,
+    precompressed siblings, ETag/304, LRU cache) and is ready as soon as its
+    accept loop starts. backend="subprocess" keeps the original
+    `python3 -m http.server` child process, which start() polls until it answers.
+    Either way stop()/`__exit__` always shuts the server down.
+
+    If SHARED_SERVER_ENV is set and no explicit port is requested, attaches to
+    that already-running server instead and stop() leaves it running. When the
+    shared server does not answer, start() falls back to a private one.
 
-    Blocks in start()/`__enter__` until the server actually answers requests,
-    instead of a fixed sleep, and always stops it in stop()/`__exit__`.
+    precompress=True writes .br/.gz siblings (skipping unchanged files) before a
+    private server starts; it has no effect when attaching to a shared one.
     """
 
-    def __init__(self, directory="dist", port=None, ready_timeout=10):
+    def __init__(self, directory="dist", port=None, ready_timeout=10, backend="threaded", precompress=False):
+        if backend not in SERVER_BACKENDS:
+            raise ValueError(f"Unknown DistServer backend {backend!r}; expected one of {SERVER_BACKENDS}")
         self.directory = directory
-        self.port = port or find_free_port()
+        self.backend = backend
+        self.shared_url = os.environ.get(SHARED_SERVER_ENV) if port is None else None
+        self.port = port or (None if self.shared_url else find_free_port())
         self.ready_timeout = ready_timeout
+        self.precompress = precompress
         self.process = None
+        self.httpd = None
 
     @property
     def url(self):
+        if self.shared_url:
+            return self.shared_url.rstrip("/")
         return f"http://localhost:{self.port}"
 
     def start(self):
+        if self.shared_url:
+            if _answers(self.shared_url):
+                return self
+            print(f"[warn] Shared server {self.shared_url} is not answering; starting a private one")
+            self.shared_url = None
+            self.port = find_free_port()
+        if self.precompress:
+            precompress_dist(self.directory)
+        if self.backend == "threaded":
+            self.httpd = StaticFileServer(self.directory, self.port).start(self.ready_timeout)
+            return self
         self.process = subprocess.Popen(
             [sys.executable, "-m", "http.server", str(self.port), "--directory", self.directory],
             stdout=subprocess.DEVNULL,
@@ -68,6 +120,9 @@ class DistServer:
         )
 
     def stop(self):
+        if self.httpd is not None:
+            self.httpd.stop()
+            self.httpd = None
         if self.process is None:
             return
         self.process.terminate()
@@ -85,6 +140,55 @@ class DistServer:
         self.stop()
 
 
+def precompress_dist(directory="dist"):
+    """Run the repo-root precompress.py over directory (quietly)."""
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.append(str(REPO_ROOT))
+    from precompress import precompress
+
+    return precompress(directory, verbose=False)
+
+
+def _answers(url, timeout=2):
+    try:
+        urllib.request.urlopen(urllib.request.Request(url, method="HEAD"), timeout=timeout)
+        return True
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+@contextmanager
+def shared_dist_server(directory="dist", precompress=False):
+    """Start one DistServer for a runner session and export it to child scripts.
+
+    Nested runners reuse the server already exported by their parent.
+    """
+    if os.environ.get(SHARED_SERVER_ENV):
+        # DistServer reuses the parent's URL, or starts a private fallback that must be stopped too.
+        with DistServer(directory) as server:
+            yield server
+        return
+    with DistServer(directory, precompress=precompress) as server:
+        os.environ[SHARED_SERVER_ENV] = server.url
+        try:
+            yield server
+        finally:
+            os.environ.pop(SHARED_SERVER_ENV, None)
+
+
+def launch_browser(playwright):
+    """Launch headless Chromium, or connect to the pooled instance in SHARED_CDP_ENV.
+
+    Works with both the sync and async Playwright APIs (await the result for async).
+    Each script still creates its own context, so pooled browsers stay isolated.
+    With profiling.PROFILE_ENV set, sync browsers come back wrapped in ProfiledBrowser.
+    """
+    endpoint = os.environ.get(SHARED_CDP_ENV)
+    if endpoint:
+        return maybe_profile(playwright.chromium.connect_over_cdp(endpoint))
+    return maybe_profile(playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS))
+
+
 def report_screenshot(path):
     """Print a consistently-tagged line so screenshots are easy to grep from verify output."""
     print(f"[screenshot] {path}")
@@ -0,0 +1,342 @@
+"""Memory and pool-health soak test for long endless sessions.
+
+Plays a seeded endless-mode replay (replay_fuzz's marathon scenario) for
+--minutes of simulated time by stepping ReplayPlayer on the virtual clock,
+so an hour of play takes a few minutes of wall time. When the session ends
+(game over, or the replay runs out) a new one starts from the next seed and
+the soak carries on; restarts are counted because they are where state is
+most often dropped without being released.
+
+Every --sample-seconds of simulated time the script records:
+  - retained heap: CDP Runtime.getHeapUsage after HeapProfiler.collectGarbage,
+    plus performance.memory.usedJSHeapSize
+  - both entity pools (Game.particlePool, Game.trailPool): objects in use,
+    objects available, and orphans, i.e. in-use objects that are no longer
+    in state.particles and so can never be released
+  - live entity array lengths: particles, soulParticles, energyRings,
+    floatingTexts, shockwaves, spores
+
+Samples before --warmup-fraction of the run are ignored (pools and JIT
+caches fill up first). A series shows sustained growth when the lowest value
+of the final third is above the highest value of the first third. The run
+fails when:
+  - retained heap grows that way faster than --max-heap-mb-per-min
+  - any entity array grows that way
+  - any sample has pool orphans (pool totals are high-water marks, so only
+    orphans show a pool leak)
+
+With --heap-snapshots, .heapsnapshot files are written at the end of warmup
+and at the end of the run, so the retained objects can be compared in Chrome
+DevTools (Memory > Comparison).
+
+Usage:
+  python3 verification/soak.py [--minutes N] [--sample-seconds S] [--seed N]
+                               [--max-heap-mb-per-min MB] [--heap-snapshots]
+                               [--out DIR]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from replay_fuzz import generate  # noqa: E402
+from screenshot_utils import DETERMINISTIC_RNG_INIT, VIRTUAL_CLOCK_INIT  # noqa: E402
+from server import launch_browser, shared_dist_server  # noqa: E402
+
+VERIFICATION_DIR = Path(__file__).parent
+REPO_ROOT = VERIFICATION_DIR.parent
+DEFAULT_OUT = REPO_ROOT / ".cache" / "soak"
+DEFAULT_MINUTES = 30
+DEFAULT_SAMPLE_SECONDS = 15
+DEFAULT_WARMUP_FRACTION = 0.2
+DEFAULT_MAX_HEAP_MB_PER_MIN = 0.25
+ENTITY_ARRAYS = ("particles", "soulParticles", "energyRings", "floatingTexts", "shockwaves", "spores")
+POOLS = ("particlePool", "trailPool")
+TICK_MS = 16
+MB = 1024 * 1024
+
+# Loads the first session. The page keeps the replay so restarts only need a new seed.
+SOAK_START_JS = """
+(replay) => {
+    const g = window.game;
+    if (!g?.replay?.player) {
+        throw new Error('Replay API not available on window.game');
+    }
+    window.__soak = { replay, restarts: 0, simMs: 0 };
+    g.replay.player.load(replay);
+    g.replay.player.start(g);
+}
+"""
+
+# Steps `ms` of simulated time, restarting on game over or replay end, then
+# reports pool and entity sizes. Orphans are in-use pool objects missing from
+# state.particles.
+SOAK_STEP_JS = """
+(ms) => {
+    const g = window.game;
+    const soak = window.__soak;
+    const player = g.replay.player;
+    for (let elapsed = 0; elapsed < ms; elapsed += 16) {
+        if (!g.state.active || player.isComplete()) {
+            soak.restarts++;
+            player.load({ ...soak.replay, seed: (soak.replay.seed + soak.restarts) >>> 0 });
+            player.start(g);
+        }
+        player.step(g, 16);
+        soak.simMs += 16;
+    }
+    const s = g.state;
+    const live = new Set(s.particles);
+    const pool = (p) => ({
+        inUse: p.inUse.length,
+        available: p.available.length,
+        orphans: p.inUse.reduce((n, obj) => n + (live.has(obj) ? 0 : 1), 0),
+    });
+    const counts = {};
+    for (const name of %s) counts[name] = s[name].length;
+    return {
+        simMs: soak.simMs,
+        restarts: soak.restarts,
+        score: s.score,
+        jsHeap: performance.memory ? performance.memory.usedJSHeapSize : null,
+        pools: { particlePool: pool(g.particlePool), trailPool: pool(g.trailPool) },
+        counts,
+    };
+}
+""" % json.dumps(list(ENTITY_ARRAYS))
+
+
+@dataclass
+class Sample:
+    sim_ms: int
+    restarts: int
+    score: int
+    retained_heap: int
+    js_heap: Optional[int]
+    pools: dict[str, dict[str, int]]
+    counts: dict[str, int]
+
+
+@dataclass
+class SoakReport:
+    minutes: float
+    samples: int
+    restarts: int
+    heap_mb_per_min: Optional[float] = None
+    growth: list[str] = field(default_factory=list)
+    failures: list[str] = field(default_factory=list)
+
+
+def series(samples: list[Sample]) -> dict[str, list[float]]:
+    """Retained heap and entity array lengths as lists aligned with `samples`."""
+    out: dict[str, list[float]] = {"retained_heap_mb": [s.retained_heap / MB for s in samples]}
+    for name in ENTITY_ARRAYS:
+        out[name] = [s.counts.get(name, 0) for s in samples]
+    return out
+
+
+def sustained_growth(values: list[float]) -> bool:
+    """True when the final third never dips to the first third's peak."""
+    if len(values) < 3:
+        return False
+    third = len(values) // 3
+    return min(values[-third:]) > max(values[:third])
+
+
+def slope_per_minute(times_ms: list[float], values: list[float]) -> Optional[float]:
+    """Least-squares slope of `values` per simulated minute."""
+    n = len(values)
+    if n < 2:
+        return None
+    mean_t = sum(times_ms) / n
+    mean_v = sum(values) / n
+    var = sum((t - mean_t) ** 2 for t in times_ms)
+    if var == 0:
+        return None
+    cov = sum((t - mean_t) * (v - mean_v) for t, v in zip(times_ms, values))
+    return cov / var * 60_000
+
+
+def analyze(
+    samples: list[Sample],
+    warmup_fraction: float = DEFAULT_WARMUP_FRACTION,
+    max_heap_mb_per_min: float = DEFAULT_MAX_HEAP_MB_PER_MIN,
+) -> SoakReport:
+    end = samples[-1].sim_ms if samples else 0
+    report = SoakReport(
+        minutes=round(end / 60_000, 2),
+        samples=len(samples),
+        restarts=samples[-1].restarts if samples else 0,
+    )
+    steady = [s for s in samples if s.sim_ms >= end * warmup_fraction]
+    data = series(steady)
+    times = [s.sim_ms for s in steady]
+
+    heap = data.pop("retained_heap_mb")
+    slope = slope_per_minute(times, heap)
+    report.heap_mb_per_min = round(slope, 4) if slope is not None else None
+    if sustained_growth(heap):
+        report.growth.append("retained_heap_mb")
+        if slope is not None and slope > max_heap_mb_per_min:
+            report.failures.append(f"retained heap grows {slope:.2f} MB/min > {max_heap_mb_per_min:g}")
+
+    for name, values in data.items():
+        if sustained_growth(values):
+            report.growth.append(name)
+            report.failures.append(f"{name} keeps growing ({values[0]:g} -> {values[-1]:g})")
+
+    # Pool totals are high-water marks and may rise late in a run; orphans are
+    # a leak whenever they appear, warmup included.
+    for pool in POOLS:
+        orphans = max((s.pools[pool]["orphans"] for s in samples), default=0)
+        if orphans:
+            report.failures.append(f"{pool}: up to {orphans} in-use objects not in state.particles")
+    return report
+
+
+def take_heap_snapshot(cdp, path: Path) -> None:
+    chunks: list[str] = []
+
+    def handler(params):
+        chunks.append(params["chunk"])
+
+    cdp.on("HeapProfiler.addHeapSnapshotChunk", handler)
+    try:
+        cdp.send("HeapProfiler.takeHeapSnapshot", {"reportProgress": False})
+    finally:
+        cdp.remove_listener("HeapProfiler.addHeapSnapshotChunk", handler)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(chunks), encoding="utf-8")
+    print(f"[heap-snapshot] {path}")
+
+
+def retained_heap(cdp) -> int:
+    cdp.send("HeapProfiler.collectGarbage")
+    return int(cdp.send("Runtime.getHeapUsage")["usedSize"])
+
+
+def run_soak(page, cdp, args) -> list[Sample]:
+    replay = generate("marathon", args.seed, args.minutes * 60)
+    page.evaluate(SOAK_START_JS, replay)
+    total_ms = int(args.minutes * 60_000)
+    step_ms = int(args.sample_seconds * 1000) // TICK_MS * TICK_MS
+    warmup_ms = total_ms * args.warmup_fraction
+    samples: list[Sample] = []
+    snapshot_taken = False
+    while not samples or samples[-1].sim_ms < total_ms:
+        raw = page.evaluate(SOAK_STEP_JS, step_ms)
+        sample = Sample(
+            sim_ms=raw["simMs"],
+            restarts=raw["restarts"],
+            score=raw["score"],
+            retained_heap=retained_heap(cdp),
+            js_heap=raw["jsHeap"],
+            pools=raw["pools"],
+            counts=raw["counts"],
+        )
+        samples.append(sample)
+        print(format_sample(sample))
+        if args.heap_snapshots and not snapshot_taken and sample.sim_ms >= warmup_ms:
+            take_heap_snapshot(cdp, args.out / "warm.heapsnapshot")
+            snapshot_taken = True
+    if args.heap_snapshots:
+        take_heap_snapshot(cdp, args.out / "end.heapsnapshot")
+    return samples
+
+
+def format_sample(s: Sample) -> str:
+    pools = "  ".join(
+        f"{name} {p['inUse']}/{p['inUse'] + p['available']}" + (f" ({p['orphans']} orphaned)" if p["orphans"] else "")
+        for name, p in s.pools.items()
+    )
+    counts = " ".join(f"{name}={s.counts[name]}" for name in ENTITY_ARRAYS)
+    return (
+        f"  {s.sim_ms / 60_000:6.1f} min  heap {s.retained_heap / MB:7.2f} MB  {pools}  {counts}"
+        f"{f'  restarts={s.restarts}' if s.restarts else ''}"
+    )
+
+
+def print_report(report: SoakReport) -> None:
+    print("\n=== Soak Summary ===")
+    print(f"  {report.minutes:g} simulated min, {report.samples} samples, {report.restarts} restarts")
+    if report.heap_mb_per_min is not None:
+        print(f"  retained heap trend after warmup: {report.heap_mb_per_min:+.3f} MB/min")
+    if report.growth:
+        print(f"  sustained growth: {', '.join(report.growth)}")
+    for failure in report.failures:
+        print(f"  FAIL — {failure}")
+    if not report.failures:
+        print("  no sustained growth")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--minutes", type=float, default=DEFAULT_MINUTES, help=f"simulated minutes (default: {DEFAULT_MINUTES})"
+    )
+    parser.add_argument(
+        "--sample-seconds",
+        type=float,
+        default=DEFAULT_SAMPLE_SECONDS,
+        help=f"simulated seconds between samples (default: {DEFAULT_SAMPLE_SECONDS})",
+    )
+    parser.add_argument("--seed", type=int, default=1, help="marathon replay seed (default: 1)")
+    parser.add_argument(
+        "--warmup-fraction",
+        type=float,
+        default=DEFAULT_WARMUP_FRACTION,
+        help="leading share of the run excluded from growth checks (default: 0.2)",
+    )
+    parser.add_argument(
+        "--max-heap-mb-per-min",
+        type=float,
+        default=DEFAULT_MAX_HEAP_MB_PER_MIN,
+        help=f"allowed retained-heap trend under sustained growth (default: {DEFAULT_MAX_HEAP_MB_PER_MIN})",
+    )
+    parser.add_argument("--heap-snapshots", action="store_true", help="write .heapsnapshot files to --out")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help="output directory (default: .cache/soak)")
+    return parser.parse_args(argv)
+
+
+def run(argv=None) -> int:
+    from playwright.sync_api import sync_playwright
+
+    args = parse_args(argv)
+    errors: list[str] = []
+
+    with shared_dist_server(REPO_ROOT / "dist") as server:
+        with sync_playwright() as playwright:
+            browser = launch_browser(playwright)
+            try:
+                context = browser.new_context(viewport={"width": 1280, "height": 800}, device_scale_factor=1)
+                context.add_init_script(DETERMINISTIC_RNG_INIT)
+                context.add_init_script(VIRTUAL_CLOCK_INIT)
+                page = context.new_page()
+                page.on("pageerror", lambda exc: errors.append(str(exc)))
+                cdp = context.new_cdp_session(page)
+                page.goto(server.url)
+                page.wait_for_selector("#gameCanvas")
+                page.wait_for_function("() => Boolean(window.game?.replay?.player)")
+                samples = run_soak(page, cdp, args)
+                context.close()
+            finally:
+                browser.close()
+
+    report = analyze(samples, args.warmup_fraction, args.max_heap_mb_per_min)
+    report.failures.extend(f"page error: {error}" for error in errors)
+    print_report(report)
+    args.out.mkdir(parents=True, exist_ok=True)
+    payload = {"report": asdict(report), "samples": [asdict(s) for s in samples]}
+    (args.out / "soak.json").write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"Samples: {args.out / 'soak.json'}")
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,187 @@
+"""In-process threaded static file server used as the default DistServer backend.
+
+Compared to `python3 -m http.server` it serves each request on its own thread,
+prefers precompressed `.br`/`.gz` siblings when the client accepts them,
+answers If-None-Match with 304 using content-hash ETags, and keeps recently
+served files in a bounded LRU memory cache.
+"""
+from __future__ import annotations
+
+import hashlib
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# (Accept-Encoding token, sibling suffix), in order of preference.
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+CONTENT_TYPES = {
+    ".js": "text/javascript",
+    ".mjs": "text/javascript",
+    ".wasm": "application/wasm",
+    ".webmanifest": "application/manifest+json",
+    ".json": "application/json",
+    ".css": "text/css",
+    ".html": "text/html; charset=utf-8",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".map": "application/json",
+}
+
+
+def content_type(path: Path) -> str:
+    return CONTENT_TYPES.get(path.suffix) or mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+
+def accepted_encodings(header: str | None) -> set[str]:
+    """Encodings listed in Accept-Encoding without an explicit q=0."""
+    accepted = set()
+    for item in (header or "").split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = params.strip().lower()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token)
+    return accepted
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class FileCache:
+    """Thread-safe LRU of file bodies keyed by path, invalidated on mtime/size change."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Path, tuple[int, int, bytes, str]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> tuple[bytes, str]:
+        """Return (body, etag) for path, reading it from disk on a miss."""
+        stat = path.stat()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(path)
+                return entry[2], entry[3]
+
+        body = path.read_bytes()
+        etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        if len(body) <= self.max_bytes:
+            with self._lock:
+                old = self._entries.pop(path, None)
+                if old is not None:
+                    self._bytes -= len(old[2])
+                self._entries[path] = (stat.st_mtime_ns, stat.st_size, body, etag)
+                self._bytes += len(body)
+                while self._bytes > self.max_bytes:
+                    _evicted, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted[2])
+        return body, etag
+
+
+class StaticRequestHandler(BaseHTTPRequestHandler):
+    server_version = "CaveCrystalsVerify/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _resolve(self) -> Path | None:
+        root = self.server.root
+        rel = unquote(urlsplit(self.path).path).lstrip("/")
+        candidate = (root / rel).resolve()
+        if candidate != root and root not in candidate.parents:
+            return None
+        if candidate.is_dir():
+            candidate = candidate / "index.html"
+        return candidate if candidate.is_file() else None
+
+    def _serve(self, send_body: bool) -> None:
+        path = self._resolve()
+        if path is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        source, encoding = path, None
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding"))
+        for token, suffix in PRECOMPRESSED:
+            sibling = path.with_name(path.name + suffix)
+            if token in accepted and sibling.is_file():
+                source, encoding = sibling, token
+                break
+
+        body, etag = self.server.files.get(source)
+        if etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type(path))
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding is not None:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002 - BaseHTTPRequestHandler signature
+        pass
+
+
+class StaticFileServer(ThreadingHTTPServer):
+    def __init__(self, directory: str | os.PathLike, port: int, cache_bytes: int = DEFAULT_CACHE_BYTES):
+        self.root = Path(directory).resolve()
+        self.files = FileCache(cache_bytes)
+        self._thread: threading.Thread | None = None
+        super().__init__(("127.0.0.1", port), StaticRequestHandler)
+
+    def start(self, ready_timeout: float = 10) -> "StaticFileServer":
+        """Serve on a background thread; returns once the accept loop is running."""
+        ready = threading.Event()
+
+        def serve():
+            ready.set()
+            self.serve_forever(poll_interval=0.25)
+
+        self._thread = threading.Thread(target=serve, name="dist-static-server", daemon=True)
+        self._thread.start()
+        if not ready.wait(ready_timeout):
+            raise RuntimeError(f"Static server did not start within {ready_timeout}s")
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
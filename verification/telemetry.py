@@ -0,0 +1,381 @@
+"""Frame-time telemetry for Playwright sessions, sampled from state.perfMetrics.
+
+QualitySystem.updatePerfMetrics() refreshes window.game.state.perfMetrics on
+every frame. TELEMETRY_INIT (installed with context.add_init_script) keeps a
+fixed-size ring buffer in the page, one Float64Array per column, and appends
+one row per animation frame: the frame timestamp, the perfMetrics fields
+below, the render quality and the adaptive overrides. Nothing crosses the
+CDP boundary until Telemetry.drain() pulls every row since the last drain in
+a single page.evaluate; if the buffer wrapped in between, the lost rows are
+counted as dropped.
+
+Rows are grouped by scenario (Telemetry.scenario()). write_csv() writes one
+columnar CSV (gzip when the name ends in .gz) and summarize() reports, per
+scenario, frame-time p50/p95/p99, particle load (count, and count against
+the quality profile's limit) and how long each render quality was active.
+
+Frame times only mean something on the real clock: under the virtual clock
+(screenshot_utils.VIRTUAL_CLOCK_INIT) every frame is 16 ms. Particle and
+quality columns are valid either way.
+
+Usage:
+  python3 verification/telemetry.py [--scenarios NAME ...] [--seconds S] [--out DIR]
+                                    [--max-p95-ms MS]
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+sys.path.insert(0, os.path.dirname(__file__))
+from screenshot_utils import DETERMINISTIC_RNG_INIT  # noqa: E402
+from server import launch_browser, shared_dist_server  # noqa: E402
+
+VERIFICATION_DIR = Path(__file__).parent
+REPO_ROOT = VERIFICATION_DIR.parent
+DEFAULT_OUT = REPO_ROOT / ".cache" / "telemetry"
+# About two minutes of frames at 60 fps between drains.
+DEFAULT_CAPACITY = 8192
+DEFAULT_SECONDS = 10
+PERCENTILES = (50, 95, 99)
+
+# perfMetrics fields sampled each frame, in column order after "t".
+METRIC_COLUMNS = (
+    "frameMs",
+    "smoothedFrameMs",
+    "instantFps",
+    "fps",
+    "particleCount",
+    "particleLimit",
+    "particleStride",
+    "envParticleCount",
+    "shockwaveCount",
+    "sporeCount",
+    "energyRingCount",
+    "particleUpdateMs",
+    "particleWorkerMs",
+)
+# renderQuality is stored as an index into QUALITY_LEVELS (-1 when unknown).
+QUALITY_LEVELS = ("low", "medium", "high")
+COLUMNS = ("t", *METRIC_COLUMNS, "quality", "particleStrideBoost", "effectScale")
+
+# The rAF wrapper samples once per distinct frame timestamp, before the
+# frame's first callback runs, so each row holds the metrics the previous
+# frame left behind. Missing fields are stored as NaN.
+TELEMETRY_INIT = """
+(() => {
+    const COLUMNS = %(columns)s;
+    const METRICS = %(metrics)s;
+    const QUALITY = %(quality)s;
+    const capacity = %(capacity)d;
+    const columns = COLUMNS.map(() => new Float64Array(capacity));
+    let written = 0;
+    let drained = 0;
+    let lastFrame = null;
+
+    const num = (value) => (typeof value === 'number' ? value : NaN);
+    const sample = (ts) => {
+        const state = window.game?.state;
+        const metrics = state?.perfMetrics;
+        if (!metrics) return;
+        const row = written %% capacity;
+        let c = 0;
+        columns[c++][row] = ts;
+        for (const key of METRICS) columns[c++][row] = num(metrics[key]);
+        columns[c++][row] = QUALITY.indexOf(state.renderQuality);
+        columns[c++][row] = num(state.adaptiveOverrides?.particleStrideBoost);
+        columns[c++][row] = num(state.adaptiveOverrides?.effectScale);
+        written++;
+    };
+
+    const requestFrame = window.requestAnimationFrame.bind(window);
+    window.requestAnimationFrame = (cb) => requestFrame((ts) => {
+        if (ts !== lastFrame) {
+            lastFrame = ts;
+            try { sample(ts); } catch (err) { /* telemetry must never break a frame */ }
+        }
+        return cb(ts);
+    });
+
+    window.__telemetry = {
+        capacity,
+        drain() {
+            const dropped = Math.max(0, written - drained - capacity);
+            const start = drained + dropped;
+            const out = COLUMNS.map(() => []);
+            for (let i = start; i < written; i++) {
+                const row = i %% capacity;
+                for (let c = 0; c < columns.length; c++) {
+                    const value = columns[c][row];
+                    out[c].push(Number.isNaN(value) ? null : value);
+                }
+            }
+            drained = written;
+            return { columns: out, dropped };
+        },
+    };
+})();
+"""
+
+
+def telemetry_init(capacity: int = DEFAULT_CAPACITY) -> str:
+    return TELEMETRY_INIT % {
+        "columns": json.dumps(list(COLUMNS)),
+        "metrics": json.dumps(list(METRIC_COLUMNS)),
+        "quality": json.dumps(list(QUALITY_LEVELS)),
+        "capacity": capacity,
+    }
+
+
+class Telemetry:
+    """Collects perfMetrics rows from one page, grouped by scenario name."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.data: dict[str, dict[str, list[Optional[float]]]] = {}
+        self.dropped: dict[str, int] = {}
+        self._current = "default"
+
+    def install(self, context) -> None:
+        """Add the ring buffer to every page the context opens; call before page.goto()."""
+        context.add_init_script(telemetry_init(self.capacity))
+
+    def scenario(self, page, name: str) -> None:
+        """Drain what the previous scenario left in the buffer, then start filing rows under `name`."""
+        self.drain(page)
+        self._current = name
+
+    def drain(self, page) -> int:
+        """Pull every buffered row in one round trip; returns how many arrived."""
+        raw = page.evaluate("() => window.__telemetry ? window.__telemetry.drain() : null")
+        if raw is None:
+            return 0
+        return self.extend(self._current, raw["columns"], raw["dropped"])
+
+    def discard(self, page) -> None:
+        """Throw away buffered rows, e.g. the ones sampled while the page was loading."""
+        page.evaluate("() => window.__telemetry && window.__telemetry.drain()")
+
+    def extend(self, name: str, columns: list[list[Optional[float]]], dropped: int = 0) -> int:
+        if not (columns and columns[0]) and not dropped:
+            return 0
+        table = self.data.setdefault(name, {column: [] for column in COLUMNS})
+        for column, values in zip(COLUMNS, columns):
+            table[column].extend(values)
+        self.dropped[name] = self.dropped.get(name, 0) + dropped
+        return len(columns[0])
+
+    def summary(self) -> dict[str, dict[str, Any]]:
+        return {name: summarize(table, self.dropped.get(name, 0)) for name, table in self.data.items()}
+
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, matching how frame-time budgets are usually quoted."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _present(values: list[Optional[float]]) -> list[float]:
+    return [v for v in values if v is not None]
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+def summarize(table: dict[str, list[Optional[float]]], dropped: int = 0) -> dict[str, Any]:
+    frames = _present(table["frameMs"])
+    particles = _present(table["particleCount"])
+    limits = table["particleLimit"]
+    load = [c / limit for c, limit in zip(table["particleCount"], limits) if c is not None and limit]
+    quality = table["quality"]
+    frame_ms_by_row = table["frameMs"]
+
+    quality_ms: dict[str, float] = {}
+    switches = 0
+    for index, level in enumerate(quality):
+        name = QUALITY_LEVELS[int(level)] if level is not None and 0 <= level < len(QUALITY_LEVELS) else "unknown"
+        quality_ms[name] = quality_ms.get(name, 0.0) + (frame_ms_by_row[index] or 0.0)
+        if index and level != quality[index - 1]:
+            switches += 1
+    total_ms = sum(quality_ms.values())
+
+    summary: dict[str, Any] = {"frames": len(table["t"]), "dropped": dropped}
+    for pct in PERCENTILES:
+        summary[f"frame_ms_p{pct}"] = _rounded(percentile(frames, pct))
+    summary["frame_ms_max"] = _rounded(max(frames, default=None))
+    summary["fps_mean"] = round(1000 * len(frames) / sum(frames), 1) if frames and sum(frames) else None
+    for pct in PERCENTILES:
+        summary[f"particles_p{pct}"] = percentile(particles, pct)
+    summary["particles_max"] = max(particles, default=None)
+    summary["particle_load_p95"] = _rounded(percentile(load, 95))
+    summary["quality_share"] = {k: round(v / total_ms, 3) for k, v in quality_ms.items()} if total_ms else {}
+    summary["quality_switches"] = switches
+    return summary
+
+
+def write_csv(path: Path, data: dict[str, dict[str, list[Optional[float]]]]) -> int:
+    """One row per sampled frame with a leading scenario column; returns the row count."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(("scenario", *COLUMNS))
+    rows = 0
+    for name, table in data.items():
+        for row in zip(*(table[column] for column in COLUMNS)):
+            writer.writerow((name, *("" if v is None else f"{v:g}" for v in row)))
+            rows += 1
+    payload = buffer.getvalue().encode("utf-8")
+    path.write_bytes(gzip.compress(payload, mtime=0) if path.suffix == ".gz" else payload)
+    return rows
+
+
+def read_csv(path: Path) -> dict[str, dict[str, list[Optional[float]]]]:
+    """The inverse of write_csv(), for comparing runs offline."""
+    raw = path.read_bytes()
+    text = (gzip.decompress(raw) if path.suffix == ".gz" else raw).decode("utf-8")
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader)
+    data: dict[str, dict[str, list[Optional[float]]]] = {}
+    for row in reader:
+        table = data.setdefault(row[0], {column: [] for column in header[1:]})
+        for column, value in zip(header[1:], row[1:]):
+            table[column].append(float(value) if value else None)
+    return data
+
+
+# -- scenarios ---------------------------------------------------------------
+
+
+def _start_game(page) -> None:
+    page.click("#startBtn")
+    page.wait_for_function("() => window.game?.state?.active === true")
+
+
+def _fire_for(page, seconds: float, interval_ms: int) -> None:
+    """Fire while walking the launcher across lanes, one keypress pair per interval."""
+    deadline = time.monotonic() + seconds
+    step = 0
+    while time.monotonic() < deadline:
+        page.keyboard.press("ArrowRight" if (step // 6) % 2 == 0 else "ArrowLeft")
+        page.keyboard.press("Space")
+        page.wait_for_timeout(interval_ms)
+        step += 1
+
+
+def scenario_menu(page, seconds: float) -> None:
+    """Title screen: background, dust and crystals only."""
+    page.wait_for_timeout(seconds * 1000)
+
+
+def scenario_gameplay(page, seconds: float) -> None:
+    """A session at a human firing rate."""
+    _start_game(page)
+    _fire_for(page, seconds, 400)
+
+
+def scenario_storm(page, seconds: float) -> None:
+    """As fast as the keyboard path allows, to push particles and quality adaptation."""
+    _start_game(page)
+    _fire_for(page, seconds, 30)
+
+
+SCENARIOS: dict[str, Callable[[Any, float], None]] = {
+    "menu": scenario_menu,
+    "gameplay": scenario_gameplay,
+    "storm": scenario_storm,
+}
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value:.1f}" if value is not None else "-"
+
+
+def print_summary(summary: dict[str, dict[str, Any]]) -> None:
+    print(f"  {'scenario':<12}{'frames':>8}{'p50':>8}{'p95':>8}{'p99':>8}{'particles p95':>15}{'load p95':>10}  quality")
+    for name, s in summary.items():
+        shares = ", ".join(f"{k} {v:.0%}" for k, v in s["quality_share"].items())
+        particles = s["particles_p95"] if s["particles_p95"] is not None else "-"
+        load = f"{s['particle_load_p95']:.0%}" if s["particle_load_p95"] is not None else "-"
+        print(
+            f"  {name:<12}{s['frames']:>8}{_ms(s['frame_ms_p50']):>8}{_ms(s['frame_ms_p95']):>8}{_ms(s['frame_ms_p99']):>8}"
+            f"{particles:>15}{load:>10}  {shares} ({s['quality_switches']} switches)"
+        )
+        if s["dropped"]:
+            print(f"    {s['dropped']} frame(s) dropped; drain more often or raise --capacity")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenarios", nargs="*", choices=list(SCENARIOS), default=list(SCENARIOS), help="default: all"
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=DEFAULT_SECONDS, help=f"per scenario (default: {DEFAULT_SECONDS})"
+    )
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help=f"output directory (default: {DEFAULT_OUT})")
+    parser.add_argument(
+        "--capacity", type=int, default=DEFAULT_CAPACITY, help=f"ring buffer rows (default: {DEFAULT_CAPACITY})"
+    )
+    parser.add_argument(
+        "--max-p95-ms", type=float, default=None, help="exit 1 when any scenario's p95 frame time is above this"
+    )
+    return parser.parse_args(argv)
+
+
+def run(argv=None) -> int:
+    from playwright.sync_api import sync_playwright
+
+    args = parse_args(argv)
+    telemetry = Telemetry(args.capacity)
+
+    with shared_dist_server(REPO_ROOT / "dist") as server:
+        with sync_playwright() as playwright:
+            browser = launch_browser(playwright)
+            try:
+                for name in args.scenarios:
+                    # A fresh page per scenario, so one scenario's particles do not leak into the next.
+                    context = browser.new_context(viewport={"width": 1280, "height": 800}, device_scale_factor=1)
+                    context.add_init_script(DETERMINISTIC_RNG_INIT)
+                    telemetry.install(context)
+                    page = context.new_page()
+                    page.goto(server.url)
+                    page.wait_for_selector("#gameCanvas")
+                    page.wait_for_function("() => Boolean(window.game?.state?.perfMetrics)")
+                    telemetry.discard(page)
+                    telemetry.scenario(page, name)
+                    SCENARIOS[name](page, args.seconds)
+                    telemetry.drain(page)
+                    context.close()
+            finally:
+                browser.close()
+
+    summary = telemetry.summary()
+    print_summary(summary)
+    rows = write_csv(args.out / "frames.csv.gz", telemetry.data)
+    (args.out / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(f"Telemetry: {rows} frame(s) -> {args.out / 'frames.csv.gz'}, {args.out / 'summary.json'}")
+
+    if args.max_p95_ms is not None:
+        over = {k: s["frame_ms_p95"] for k, s in summary.items() if (s["frame_ms_p95"] or 0) > args.max_p95_ms}
+        for name, p95 in over.items():
+            print(f"  OVER BUDGET — {name}: p95 {p95:.1f} ms > {args.max_p95_ms:.1f} ms")
+        if over:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -16,6 +16,8 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
+from baseline_cache import cache_available, store_baseline_array
+from server import shared_dist_server
 from visual_manifest import BASELINES_DIR, CANONICAL_VISUALS, REPO_ROOT
 
 
@@ -31,6 +33,17 @@ def run_script(script_name: str) -> bool:
 
 def update_baselines(only_scripts: set[str] | None = None) -> int:
     BASELINES_DIR.mkdir(parents=True, exist_ok=True)
+    with shared_dist_server(REPO_ROOT / "dist"):
+        updated, failures = _capture_and_copy(only_scripts)
+
+    print(f"\nUpdated {updated} baseline(s)")
+    if failures:
+        print(f"{failures} error(s) during baseline refresh")
+        return 1
+    return 0
+
+
+def _capture_and_copy(only_scripts: set[str] | None) -> tuple[int, int]:
     updated = 0
     failures = 0
 
@@ -53,14 +66,12 @@ def update_baselines(only_scripts: set[str] | None = None) -> int:
 
             baseline.parent.mkdir(parents=True, exist_ok=True)
             shutil.copy2(actual, baseline)
+            if cache_available():
+                store_baseline_array(baseline)
             print(f"[updated] {baseline.relative_to(REPO_ROOT)}")
             updated += 1
 
-    print(f"\nUpdated {updated} baseline(s)")
-    if failures:
-        print(f"{failures} error(s) during baseline refresh")
-        return 1
-    return 0
+    return updated, failures
 
 
 def main() -> int:
@@ -6,13 +6,13 @@ from playwright.sync_api import sync_playwright
 
 sys.path.insert(0, os.path.dirname(__file__))
 from screenshot_utils import advance, capture_deterministic_screenshot, new_deterministic_page
-from server import CHROMIUM_ARGS, DistServer
+from server import DistServer, launch_browser
 
 
 def run():
     with DistServer() as server:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = launch_browser(p)
             page = new_deterministic_page(browser, viewport={"width": 1280, "height": 800})
             page_errors = []
             page.on("pageerror", lambda exc: page_errors.append(str(exc)))
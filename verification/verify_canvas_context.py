@@ -9,7 +9,7 @@ import sys
 from playwright.sync_api import sync_playwright
 
 sys.path.insert(0, os.path.dirname(__file__))
-from server import CHROMIUM_ARGS, DistServer
+from server import DistServer, launch_browser
 
 
 def run():
@@ -17,7 +17,7 @@ def run():
     with DistServer() as server:
         print(f"verify_canvas_context: server at {server.url}")
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = launch_browser(p)
             page = browser.new_context(viewport={"width": 1280, "height": 800}).new_page()
             page.set_default_timeout(15000)
 
@@ -9,7 +9,7 @@ from screenshot_utils import (
     capture_deterministic_screenshot,
     new_deterministic_page,
 )
-from server import CHROMIUM_ARGS, DistServer
+from server import DistServer, launch_browser
 
 NORMALIZE_CRITICAL_JS = """
 () => {
@@ -29,7 +29,7 @@ NORMALIZE_CRITICAL_JS = """
 def run():
     with DistServer() as server:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = launch_browser(p)
             page = new_deterministic_page(browser, viewport={"width": 1280, "height": 800})
 
             page.on("console", lambda msg: print(f"Browser console: {msg.text}"))
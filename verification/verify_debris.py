@@ -5,13 +5,13 @@ import time
 from playwright.sync_api import sync_playwright
 
 sys.path.insert(0, os.path.dirname(__file__))
-from server import CHROMIUM_ARGS, DistServer, report_screenshot
+from server import DistServer, launch_browser, report_screenshot
 
 
 def run():
     with DistServer() as server:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = launch_browser(p)
             page = browser.new_page(viewport={"width": 1280, "height": 800})
 
             page.on("console", lambda msg: print(f"Browser console: {msg.text}"))
@@ -5,11 +5,11 @@ import time
 from playwright.sync_api import sync_playwright
 
 sys.path.insert(0, os.path.dirname(__file__))
-from server import CHROMIUM_ARGS, report_failure, report_screenshot
+from server import launch_browser, report_failure, report_screenshot
 
 def run():
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+        browser = launch_browser(p)
         # Create a new context with a larger viewport
         context = browser.new_context(viewport={"width": 1280, "height": 800})
         page = context.new_page()
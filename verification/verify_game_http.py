@@ -9,13 +9,13 @@ from screenshot_utils import (
     capture_deterministic_screenshot,
     new_deterministic_page,
 )
-from server import CHROMIUM_ARGS, DistServer, report_failure
+from server import DistServer, launch_browser, report_failure
 
 
 def run():
     with DistServer() as server:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = launch_browser(p)
             page = new_deterministic_page(browser, viewport={"width": 1280, "height": 800})
 
             print(f"Navigating to {server.url}")
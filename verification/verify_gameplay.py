@@ -5,14 +5,14 @@ import sys
 from playwright.async_api import async_playwright
 
 sys.path.insert(0, os.path.dirname(__file__))
-from server import CHROMIUM_ARGS, DistServer, report_screenshot
+from server import DistServer, launch_browser, report_screenshot
 
 
 async def run():
     server = DistServer().start()
     try:
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = await launch_browser(p)
             page = await browser.new_page()
 
             await page.goto(server.url)
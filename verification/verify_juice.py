@@ -7,16 +7,20 @@ sys.path.insert(0, os.path.dirname(__file__))
 from screenshot_utils import (
     advance,
     capture_deterministic_screenshot,
-    new_deterministic_page,
+    new_deterministic_context,
 )
-from server import CHROMIUM_ARGS, DistServer
+from server import DistServer, launch_browser
+from telemetry import Telemetry
 
 
 def run():
     with DistServer() as server:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
-            page = new_deterministic_page(browser, viewport={"width": 1280, "height": 800})
+            browser = launch_browser(p)
+            context = new_deterministic_context(browser, viewport={"width": 1280, "height": 800})
+            telemetry = Telemetry()
+            telemetry.install(context)
+            page = context.new_page()
             page_errors = []
 
             page.on("pageerror", lambda exc: page_errors.append(str(exc)))
@@ -62,6 +66,7 @@ def run():
             assert has_save is True
 
             page.click("#startBtn")
+            telemetry.scenario(page, "session")
             advance(page, 500)
 
             spores_before = page.evaluate("window.game.state.spores.length")
@@ -104,6 +109,13 @@ def run():
             soul_len = page.evaluate("window.game.state.soulParticles.length")
             print(f"Soul Particles count (snapshot): {soul_len}")
 
+            telemetry.drain(page)
+            load = telemetry.summary()["session"]
+            print(
+                f"Particle load over {load['frames']} frames: p95 {load['particles_p95']}, "
+                f"max {load['particles_max']} ({load['particle_load_p95']} of limit at p95)"
+            )
+
             capture_deterministic_screenshot(page, "verification/verify_juice.png")
 
             browser.close()
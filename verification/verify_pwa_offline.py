@@ -5,7 +5,7 @@ import time
 from playwright.sync_api import sync_playwright
 
 sys.path.insert(0, os.path.dirname(__file__))
-from server import CHROMIUM_ARGS, DistServer, report_screenshot
+from server import DistServer, launch_browser, report_screenshot
 
 
 def wait_for_service_worker(page, timeout_ms=15000):
@@ -31,7 +31,7 @@ def wait_for_service_worker(page, timeout_ms=15000):
 def run():
     with DistServer() as server:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = launch_browser(p)
             context = browser.new_context(
                 viewport={"width": 390, "height": 844},
                 service_workers="allow",
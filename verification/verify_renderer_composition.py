@@ -14,7 +14,7 @@ from screenshot_utils import (
     capture_deterministic_screenshot,
     new_deterministic_page,
 )
-from server import CHROMIUM_ARGS, DistServer
+from server import DistServer, launch_browser
 
 OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "verify_renderer_composition.png")
 
@@ -22,7 +22,7 @@ OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "verify_renderer_compositi
 def run():
     with DistServer() as server:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = launch_browser(p)
             page = new_deterministic_page(browser, viewport={"width": 1280, "height": 800})
 
             page.goto(server.url)
@@ -1,11 +1,11 @@
 import os
 import sys
-import json
 
 from playwright.sync_api import sync_playwright
 
 sys.path.insert(0, os.path.dirname(__file__))
-from server import CHROMIUM_ARGS, DistServer
+from replay_codec import load_replay
+from server import DistServer, launch_browser
 
 FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "golden_campaign_l1.ccreplay")
 
@@ -27,8 +27,7 @@ REPLAY_JS = """
 
 
 def run():
-    with open(FIXTURE_PATH, encoding="utf-8") as handle:
-        replay = json.load(handle)
+    replay = load_replay(FIXTURE_PATH)
 
     expect = replay.get("expect", {})
     final_score = expect.get("finalScore")
@@ -39,7 +38,7 @@ def run():
 
     with DistServer() as server:
         with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = launch_browser(playwright)
             page = browser.new_page(viewport={"width": 1280, "height": 800})
             page.goto(server.url)
             page.wait_for_selector("#gameCanvas")
@@ -5,7 +5,7 @@ from playwright.sync_api import sync_playwright
 
 sys.path.insert(0, os.path.dirname(__file__))
 from screenshot_utils import advance, new_deterministic_page
-from server import CHROMIUM_ARGS, DistServer, report_screenshot
+from server import DistServer, launch_browser, report_screenshot
 
 
 def screenshot_tutorial(page, path: str) -> None:
@@ -16,7 +16,7 @@ def screenshot_tutorial(page, path: str) -> None:
 def run():
     with DistServer() as server:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = launch_browser(p)
             page = new_deterministic_page(browser, viewport={"width": 1280, "height": 800})
 
             page.goto(server.url)
@@ -10,7 +10,7 @@ from screenshot_utils import (
     capture_deterministic_screenshot,
     new_deterministic_context,
 )
-from server import CHROMIUM_ARGS, DistServer
+from server import DistServer, launch_browser
 
 FORCE_WEBGL_INIT = "window.__FORCE_WEBGL_POSTFX__ = true;"
 
@@ -71,7 +71,7 @@ def _assert_canvas_fallback(page) -> None:
 def run_fallback_assertion():
     with DistServer() as server:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = launch_browser(p)
             context = new_deterministic_context(browser, viewport={"width": 1280, "height": 800})
             context.add_init_script(FORCE_CANVAS_INIT)
             page = context.new_page()
@@ -88,7 +88,7 @@ def run_fallback_assertion():
 def run_webgl_capture():
     with DistServer() as server:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+            browser = launch_browser(p)
             context = new_deterministic_context(browser, viewport={"width": 1280, "height": 800})
             context.add_init_script(FORCE_WEBGL_INIT)
             page = context.new_page()
@@ -1,8 +1,30 @@
-"""Shared pixel-diff utilities for visual regression baselines."""
+"""Shared pixel-diff utilities for visual regression baselines.
+
+Two diff engines are available: "numpy" works on whole-image arrays and is the
+default when NumPy is installed; "python" is the original per-pixel loop, kept
+as the reference implementation for parity tests.
+
+Each image pair is decoded once per comparison. The DiffResult keeps a
+write_diff callback bound to those decoded buffers, so a failing check can
+emit its diff artifact later without decoding or diffing again.
+
+With fast_paths=True a pair whose decoded pixel bytes hash identically
+("exact") passes without a per-pixel diff; every other pair runs the "full"
+diff. Only an exact match may short-circuit: a perceptual hash cannot see a
+small localized change, so it would hide regressions the pixel, tile and
+region checks are there to catch. DiffResult.tier records which tier decided.
+
+With tile_size set (numpy engine), the same pass also sums the diff mask into
+a grid of per-tile counts. check_regions() scores named canvas regions against
+their own budgets from that grid, and write_heatmap() renders it as an
+artifact next to the `_diff.png`.
+"""
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Any, Callable
 
 try:
     from PIL import Image, ImageChops
@@ -10,7 +32,16 @@ except ImportError:  # pragma: no cover - exercised via compare_images guard
     Image = None
     ImageChops = None
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - falls back to the reference engine
+    np = None
+
+from baseline_cache import load_baseline_array
+
 DEFAULT_PIXEL_THRESHOLD = 12
+DIFF_ENGINES = ("numpy", "python")
+DIFF_TIERS = ("exact", "full")
 
 
 @dataclass(frozen=True)
@@ -21,6 +52,14 @@ class DiffResult:
     width: int
     height: int
     diff_image_path: Path | None = None
+    tier: str = "full"
+    tile_size: int | None = None
+    # (rows, cols) array of differing-pixel counts per tile_size x tile_size tile.
+    tile_counts: Any = field(default=None, repr=False, compare=False)
+    # Writes the diff image from the already-decoded buffers (see check_within_threshold).
+    write_diff: Callable[[Path | str], Path | None] | None = field(
+        default=None, repr=False, compare=False
+    )
 
 
 def require_pillow() -> None:
@@ -30,15 +69,92 @@ def require_pillow() -> None:
         )
 
 
+def default_engine() -> str:
+    return "numpy" if np is not None else "python"
+
+
+def _diff_python(img_a, img_b, pixel_threshold: int):
+    """Reference engine: count differing pixels one at a time."""
+    pixels_a = img_a.load()
+    pixels_b = img_b.load()
+    width, height = img_a.size
+    diff_count = 0
+
+    for y in range(height):
+        for x in range(width):
+            r1, g1, b1 = pixels_a[x, y]
+            r2, g2, b2 = pixels_b[x, y]
+            if abs(r1 - r2) + abs(g1 - g2) + abs(b1 - b2) > pixel_threshold:
+                diff_count += 1
+
+    return diff_count, lambda: ImageChops.difference(img_a, img_b)
+
+
+def image_to_array(img):
+    """(height, width, 3) uint8 view over an RGB image's raw bytes."""
+    width, height = img.size
+    return np.frombuffer(img.tobytes(), dtype=np.uint8).reshape(height, width, 3)
+
+
+def _diff_numpy(a, b, pixel_threshold: int):
+    """Array engine: per-channel delta, summed delta and mask in one vectorized pass."""
+    delta = np.abs(a.astype(np.int16) - b.astype(np.int16))
+    mask = delta.sum(axis=2, dtype=np.int16) > pixel_threshold
+    diff_count = int(np.count_nonzero(mask))
+    return diff_count, lambda: Image.fromarray(delta.astype(np.uint8)), mask
+
+
+def _tile_edges(length: int, tile_size: int):
+    return np.arange(0, length, tile_size)
+
+
+def tile_counts(mask, tile_size: int):
+    """Sum a boolean diff mask into a (rows, cols) grid of per-tile counts."""
+    height, width = mask.shape
+    rows = np.add.reduceat(mask.view(np.uint8), _tile_edges(height, tile_size), axis=0, dtype=np.uint32)
+    return np.add.reduceat(rows, _tile_edges(width, tile_size), axis=1, dtype=np.uint32)
+
+
+def tile_pixel_counts(width: int, height: int, tile_size: int):
+    """Pixels covered by each tile; edge tiles may be partial."""
+    row_heights = np.diff(np.append(_tile_edges(height, tile_size), height))
+    col_widths = np.diff(np.append(_tile_edges(width, tile_size), width))
+    return np.outer(row_heights, col_widths)
+
+
+def pixel_digest(pixels) -> str:
+    """Hash of raw decoded pixel bytes (bytes or a contiguous uint8 array)."""
+    return hashlib.blake2b(pixels, digest_size=16).hexdigest()
+
+
+def _is_exact_match(baseline_pixels, img_b) -> bool:
+    return pixel_digest(baseline_pixels) == pixel_digest(img_b.tobytes())
+
+
 def compare_images(
     baseline_path: Path | str,
     actual_path: Path | str,
     *,
     pixel_threshold: int = DEFAULT_PIXEL_THRESHOLD,
     diff_output_path: Path | str | None = None,
+    engine: str | None = None,
+    baseline_cache: bool = False,
+    fast_paths: bool = False,
+    tile_size: int | None = None,
 ) -> DiffResult:
-    """Return the fraction of pixels that differ beyond the per-channel threshold."""
+    """Return the fraction of pixels that differ beyond the per-channel threshold.
+
+    With baseline_cache=True (numpy engine only) the baseline is read from the
+    decoded-pixel cache in baseline_cache.py instead of being decoded from PNG.
+    """
     require_pillow()
+    engine = engine or default_engine()
+    if engine not in DIFF_ENGINES:
+        raise ValueError(f"Unknown diff engine {engine!r}; expected one of {DIFF_ENGINES}")
+    if engine == "numpy" and np is None:
+        raise RuntimeError("NumPy is required for the numpy diff engine. Install with: pip install numpy")
+    if tile_size is not None and engine != "numpy":
+        raise ValueError("Tiled diffs require the numpy engine")
 
     baseline = Path(baseline_path)
     actual = Path(actual_path)
@@ -47,31 +163,55 @@ def compare_images(
     if not actual.is_file():
         raise FileNotFoundError(f"Actual screenshot not found: {actual}")
 
-    img_a = Image.open(baseline).convert("RGB")
+    baseline_array = None
+    if baseline_cache and engine == "numpy":
+        baseline_array = load_baseline_array(baseline)
+        height, width = baseline_array.shape[:2]
+    else:
+        img_a = Image.open(baseline).convert("RGB")
+        width, height = img_a.size
+
     img_b = Image.open(actual).convert("RGB")
-    if img_a.size != img_b.size:
-        img_b = img_b.resize(img_a.size, Image.Resampling.BILINEAR)
+    if img_b.size != (width, height):
+        img_b = img_b.resize((width, height), Image.Resampling.BILINEAR)
 
-    pixels_a = img_a.load()
-    pixels_b = img_b.load()
-    width, height = img_a.size
-    diff_count = 0
+    tier = None
+    if fast_paths:
+        baseline_pixels = baseline_array if baseline_array is not None else img_a.tobytes()
+        if _is_exact_match(baseline_pixels, img_b):
+            tier = "exact"
 
-    for y in range(height):
-        for x in range(width):
-            r1, g1, b1 = pixels_a[x, y]
-            r2, g2, b2 = pixels_b[x, y]
-            if abs(r1 - r2) + abs(g1 - g2) + abs(b1 - b2) > pixel_threshold:
-                diff_count += 1
+    counts = None
+    if tier is not None:
+        diff_count, make_diff_image = 0, None
+        if tile_size is not None:
+            counts = tile_counts(np.zeros((height, width), dtype=bool), tile_size)
+    elif engine == "numpy":
+        tier = "full"
+        if baseline_array is None:
+            baseline_array = image_to_array(img_a)
+        diff_count, make_diff_image, mask = _diff_numpy(
+            baseline_array, image_to_array(img_b), pixel_threshold
+        )
+        if tile_size is not None:
+            counts = tile_counts(mask, tile_size)
+    else:
+        tier = "full"
+        diff_count, make_diff_image = _diff_python(img_a, img_b, pixel_threshold)
 
     diff_ratio = diff_count / (width * height)
-    diff_image_path = None
 
-    if diff_output_path is not None and diff_count > 0:
-        diff_image_path = Path(diff_output_path)
-        diff_image_path.parent.mkdir(parents=True, exist_ok=True)
-        diff = ImageChops.difference(img_a, img_b)
-        diff.save(diff_image_path)
+    def write_diff(path: Path | str) -> Path | None:
+        if diff_count == 0:
+            return None
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        make_diff_image().save(out)
+        return out
+
+    diff_image_path = None
+    if diff_output_path is not None:
+        diff_image_path = write_diff(diff_output_path)
 
     return DiffResult(
         baseline_path=baseline,
@@ -80,22 +220,126 @@ def compare_images(
         width=width,
         height=height,
         diff_image_path=diff_image_path,
+        tier=tier,
+        tile_size=tile_size,
+        tile_counts=counts,
+        write_diff=write_diff,
     )
 
 
+@dataclass(frozen=True)
+class RegionCheck:
+    name: str
+    diff_ratio: float
+    max_diff_ratio: float
+
+    @property
+    def passed(self) -> bool:
+        return self.diff_ratio <= self.max_diff_ratio
+
+
+def _tile_centres(length: int, tile_size: int):
+    """Tile centres as fractions of length, accounting for a partial last tile."""
+    starts = _tile_edges(length, tile_size)
+    ends = np.minimum(starts + tile_size, length)
+    return (starts + ends) / 2 / length
+
+
+def _tile_budgets(result: DiffResult, regions, default_max_diff_ratio: float):
+    """Assign every tile to a region by its centre; later regions win overlaps.
+
+    Index 0 is the implicit "canvas" region (tiles outside every named region).
+    """
+    rows, cols = result.tile_counts.shape
+    centres_y = _tile_centres(result.height, result.tile_size)
+    centres_x = _tile_centres(result.width, result.tile_size)
+    owner = np.zeros((rows, cols), dtype=np.int16)
+    for index, region in enumerate(regions, start=1):
+        left, top, right, bottom = region.box
+        inside_y = (centres_y >= top) & (centres_y < bottom)
+        inside_x = (centres_x >= left) & (centres_x < right)
+        owner[np.outer(inside_y, inside_x)] = index
+    budgets = np.array([default_max_diff_ratio, *(r.max_diff_ratio for r in regions)])
+    return owner, budgets
+
+
+def check_regions(
+    result: DiffResult,
+    regions,
+    default_max_diff_ratio: float,
+) -> list[RegionCheck]:
+    """Score each named region (plus the remaining "canvas") against its budget.
+
+    Regions are (left, top, right, bottom) boxes in canvas fractions, snapped
+    to the tile grid of a compare_images(tile_size=...) result.
+    """
+    if result.tile_counts is None:
+        raise ValueError("check_regions needs a result from compare_images(tile_size=...)")
+    owner, budgets = _tile_budgets(result, regions, default_max_diff_ratio)
+    pixels = tile_pixel_counts(result.width, result.height, result.tile_size)
+    names = ["canvas", *(r.name for r in regions)]
+
+    checks = []
+    for index, name in enumerate(names):
+        selected = owner == index
+        covered = int(pixels[selected].sum())
+        if covered == 0:
+            continue
+        differing = int(result.tile_counts[selected].sum())
+        checks.append(RegionCheck(name, differing / covered, float(budgets[index])))
+    return checks
+
+
+def write_heatmap(
+    result: DiffResult,
+    regions,
+    default_max_diff_ratio: float,
+    path: Path | str,
+) -> Path:
+    """Render per-tile diff load (tile ratio / its region budget) as a PNG.
+
+    Green tiles are clean, shading to red at the budget; tiles over budget are
+    solid red so hotspots stand out at a glance.
+    """
+    owner, budgets = _tile_budgets(result, regions, default_max_diff_ratio)
+    ratios = result.tile_counts / tile_pixel_counts(result.width, result.height, result.tile_size)
+    load = np.clip(ratios / np.maximum(budgets[owner], 1e-9), 0.0, 1.0)
+
+    rgb = np.zeros((*load.shape, 3), dtype=np.uint8)
+    rgb[..., 0] = (load * 255).astype(np.uint8)
+    rgb[..., 1] = ((1.0 - load) * 160).astype(np.uint8)
+    rgb[load >= 1.0] = (255, 0, 0)
+
+    out = Path(path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    heatmap = Image.fromarray(rgb).resize(
+        (load.shape[1] * result.tile_size, load.shape[0] * result.tile_size),
+        Image.Resampling.NEAREST,
+    ).crop((0, 0, result.width, result.height))
+    heatmap.save(out)
+    return out
+
+
 def check_within_threshold(
     result: DiffResult,
     max_diff_ratio: float,
     *,
     diff_output_path: Path | str | None = None,
 ) -> tuple[bool, str]:
-    """Compare images and optionally write a diff artifact when they diverge."""
+    """Check a comparison and, only when it fails, write its diff artifact.
+
+    The artifact comes from the buffers decoded by compare_images; results
+    without a write_diff callback fall back to a fresh comparison.
+    """
     if diff_output_path is not None and result.diff_ratio > max_diff_ratio:
-        compare_images(
-            result.baseline_path,
-            result.actual_path,
-            diff_output_path=diff_output_path,
-        )
+        if result.write_diff is not None:
+            result.write_diff(diff_output_path)
+        else:
+            compare_images(
+                result.baseline_path,
+                result.actual_path,
+                diff_output_path=diff_output_path,
+            )
 
     pct = result.diff_ratio * 100
     limit_pct = max_diff_ratio * 100
@@ -8,6 +8,16 @@ VERIFICATION_DIR = Path(__file__).parent
 REPO_ROOT = VERIFICATION_DIR.parent
 BASELINES_DIR = VERIFICATION_DIR / "baselines"
 DIFFS_DIR = VERIFICATION_DIR / "diffs"
+BASELINE_CACHE_DIR = VERIFICATION_DIR / ".cache" / "baselines"
+
+
+@dataclass(frozen=True)
+class DiffRegion:
+    """Canvas area with its own diff budget; box is (left, top, right, bottom) in 0-1 fractions."""
+
+    name: str
+    box: tuple[float, float, float, float]
+    max_diff_ratio: float
 
 
 @dataclass(frozen=True)
@@ -16,6 +26,9 @@ class ScreenshotSpec:
     baseline: str
     max_diff_ratio: float
     pixel_threshold: int = 12
+    # Optional per-region budgets; max_diff_ratio then covers the remaining canvas.
+    regions: tuple[DiffRegion, ...] = ()
+    tile_size: int = 32
 
     def actual_path(self) -> Path:
         return REPO_ROOT / self.actual
@@ -27,6 +40,10 @@ class ScreenshotSpec:
         name = Path(self.baseline).name
         return DIFFS_DIR / name.replace(".png", "_diff.png")
 
+    def heatmap_path(self) -> Path:
+        name = Path(self.baseline).name
+        return DIFFS_DIR / name.replace(".png", "_heatmap.png")
+
 
 @dataclass(frozen=True)
 class ScriptSpec:
@@ -34,6 +51,15 @@ class ScriptSpec:
     screenshots: tuple[ScreenshotSpec, ...]
 
 
+# Crystal bands of verify_juice.png. Crystal heights breathe and grow between
+# captures, so these bands differ by 29-47% run to run while the playfield
+# between them stays under 0.5%. A whole-image 0.18 budget hid a changed
+# playfield render (0.118 overall, 5.1% of the playfield).
+JUICE_REGIONS: tuple[DiffRegion, ...] = (
+    DiffRegion("ceiling", (0.0, 0.0, 1.0, 0.16), 0.6),
+    DiffRegion("floor", (0.0, 0.76, 1.0, 1.0), 0.6),
+)
+
 # Six canonical scripts with canvas-only captures and calibrated thresholds.
 # verify_critical_vignette.py, verify_settings.py, and the game_spore_http frame
 # capture screenshots but are not gated yet (see AGENTS.md).
@@ -44,7 +70,8 @@ CANONICAL_VISUALS: tuple[ScriptSpec, ...] = (
             ScreenshotSpec(
                 "verification/verify_juice.png",
                 "verification/baselines/verify_juice.png",
-                max_diff_ratio=0.18,
+                max_diff_ratio=0.02,
+                regions=JUICE_REGIONS,
             ),
         ),
     ),
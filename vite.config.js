@@ -6,12 +6,15 @@ import { assemblyscriptWatchPlugin } from './scripts/assemblyscript-watch-plugin
 
 const rootDir = path.dirname(fileURLToPath(import.meta.url));
 const ascWatch = process.env.ASC_WATCH === '1';
+// Hidden maps (no sourceMappingURL comment) for verification/profiling.py.
+const sourcemap = process.env.VITE_SOURCEMAP === '1' ? 'hidden' : false;
 
 export default defineConfig({
   base: './',
   build: {
     target: 'esnext',
     assetsInlineLimit: 0, // Don't inline WASM files
+    sourcemap,
   },
   server: {
     fs: {